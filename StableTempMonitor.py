@@ -1,60 +1,857 @@
+import time
+inicio_programa = time.perf_counter()  # Para medir el arranque con --medir-inicio
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.ticker import MaxNLocator, AutoMinorLocator, ScalarFormatter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import ttkbootstrap as ttk
 import json
-import pandas as pd
+import os
+import io
+import glob
+import shutil
+import tempfile
+import gzip
+import zipfile
+import hashlib
+import sys
+import csv
+import argparse
+import subprocess
+import threading
+import queue
+import collections
+import itertools
+import re
+import cProfile
+from functools import partial, wraps
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
  
-def seleccionar_archivo():
+# Perfilado: con la variable de entorno STM_PERFILAR=1 o el argumento --perfilar se registra la
+# duración de cada fase (lectura, conversión, cálculo, dibujo y eventos del mouse) en un búfer
+# circular, que al salir se guarda como traza JSON. Con "cprofile" además se perfila todo con
+# cProfile. Desactivado, cada punto de medición solo consulta una variable global.
+TAMANO_BUFER_PERFILADO = 8192
+FASES_CUADRO = ('dibujo_lienzo', 'cuadro')  # Fases que cuentan como un cuadro en el indicador
+INTERVALO_INDICADOR_MS = 500
+perfilado_activo = False
+perfilador = None
+inicio_perfilado = time.perf_counter()
+registros_perfilado = collections.deque(maxlen=TAMANO_BUFER_PERFILADO)  # (fase, inicio, duración, hilo)
+
+def registrar_fase(fase, inicio):
+    """Guarda en el búfer circular la duración de una fase que empezó en el instante dado."""
+    registros_perfilado.append((fase, inicio, time.perf_counter() - inicio, threading.get_ident()))
+
+def perfilar(fase):
+    """Decorador que registra la duración de cada llamada a la función cuando el perfilado está activo."""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not perfilado_activo:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                registrar_fase(fase, inicio)
+        return envoltura
+    return decorador
+
+class FasePerfilada:
+    """Bloque with que registra su duración cuando el perfilado está activo."""
+    __slots__ = ('fase', 'inicio')
+
+    def __init__(self, fase):
+        self.fase = fase
+        self.inicio = None
+
+    def __enter__(self):
+        if perfilado_activo:
+            self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.inicio is not None:
+            registrar_fase(self.fase, self.inicio)
+
+def activar_perfilado(modo='fases'):
+    """Activa el registro de fases y, si el modo es "cprofile", también el perfilador de Python."""
+    global perfilado_activo, perfilador, inicio_perfilado
+    perfilado_activo = True
+    inicio_perfilado = time.perf_counter()
+    registros_perfilado.clear()
+    if modo == 'cprofile' and perfilador is None:
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+
+def resumir_perfilado():
+    """Devuelve, por fase, la cantidad de mediciones y su duración total, mediana, p95 y máxima en ms."""
+    duraciones = collections.defaultdict(list)
+    for fase, _, duracion, _ in list(registros_perfilado):
+        duraciones[fase].append(duracion * 1000)
+    return {fase: {'llamadas': len(valores), 'total_ms': round(float(np.sum(valores)), 3),
+                   'mediana_ms': round(float(np.median(valores)), 3), 'p95_ms': round(float(np.percentile(valores, 95)), 3),
+                   'max_ms': round(float(np.max(valores)), 3)}
+            for fase, valores in sorted(duraciones.items())}
+
+def guardar_perfil(prefijo='perfil_stm', final=True):
+    """Guarda la traza de fases (formato de Chrome/Perfetto) y, si se usó cProfile, sus estadísticas."""
+    global perfilador
+    eventos = [{'name': fase, 'cat': 'stm', 'ph': 'X', 'ts': round((inicio - inicio_perfilado) * 1e6, 1),
+                'dur': round(duracion * 1e6, 1), 'pid': os.getpid(), 'tid': hilo}
+               for fase, inicio, duracion, hilo in list(registros_perfilado)]
+    resumen = resumir_perfilado()
+    with open(prefijo + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': eventos, 'resumen': resumen}, f, ensure_ascii=False)
+    rutas = [prefijo + '.json']
+    if perfilador is not None:
+        perfilador.dump_stats(prefijo + '.prof')  # Detiene el perfilador
+        rutas.append(prefijo + '.prof')
+        if final:
+            perfilador = None
+        else:
+            perfilador.enable()
+
+    for fase, datos in resumen.items():
+        print(f"{fase:>24}: {datos['llamadas']:6d} llamadas, p95 {datos['p95_ms']:9.3f} ms, total {datos['total_ms']:10.1f} ms", file=sys.stderr)
+    print("Perfil guardado en " + ", ".join(rutas), file=sys.stderr)
+    return rutas
+
+def crear_indicador_perfilado():
+    """Muestra sobre la gráfica el último cuadro, el p95 de los cuadros y la cantidad de artistas."""
+    global indicador_perfilado
+    indicador_perfilado = tk.Label(frame_grafica, font=('TkFixedFont', 9), bg='black', fg='lime', justify=tk.LEFT)
+    indicador_perfilado.place(relx=1.0, rely=0.0, anchor='ne')
+    actualizar_indicador_perfilado()
+
+def actualizar_indicador_perfilado():
+    """Refresca el indicador de perfilado y se vuelve a agendar."""
+    cuadros = [duracion * 1000 for fase, _, duracion, _ in list(registros_perfilado) if fase in FASES_CUADRO]
+    artistas = sum(len(eje.get_children()) for eje in fig.axes) if fig is not None else 0
+    if cuadros:
+        texto = f"cuadro {cuadros[-1]:.1f} ms  p95 {np.percentile(cuadros, 95):.1f} ms  artistas {artistas}"
+    else:
+        texto = f"sin cuadros  artistas {artistas}"
+    indicador_perfilado.configure(text=texto)
+    indicador_perfilado.lift()  # El lienzo se crea después y quedaría encima
+    root.after(INTERVALO_INDICADOR_MS, actualizar_indicador_perfilado)
+
+def guardar_perfil_desde_menu():
+    """Guarda el perfil de la sesión hasta ahora en los archivos que elija el usuario."""
+    ruta = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Traza JSON", "*.json")], title="Guardar perfil")
+    if ruta:
+        rutas = guardar_perfil(os.path.splitext(ruta)[0], final=False)
+        messagebox.showinfo("Éxito", "Perfil guardado en:\n" + "\n".join(rutas))
+
+# Tareas en segundo plano: la lectura y escritura de archivos grandes corre en un hilo aparte para
+# que la ventana siga respondiendo. El hilo avisa su progreso por una cola que la interfaz revisa
+# con root.after, y solo se admite una tarea a la vez.
+INTERVALO_REVISION_TAREA_MS = 50
+
+class TareaCancelada(Exception):
+    """Se lanza dentro de una tarea en segundo plano cuando el usuario la cancela."""
+
+def avisar_progreso_tarea(cancelacion, cola, fraccion):
+    """Envía a la interfaz la fracción completada de la tarea, o la interrumpe si se pidió cancelarla."""
+    if cancelacion.is_set():
+        raise TareaCancelada()
+    cola.put(fraccion)
+
+def ejecutar_en_segundo_plano(descripcion, trabajo, al_terminar, mensaje_error="No se pudo completar la tarea."):
+    """Ejecuta trabajo(avisar_progreso=...) en el hilo de tareas y entrega su resultado a al_terminar en el hilo de Tk."""
+    global tarea_en_curso
+    if tarea_en_curso is not None:
+        messagebox.showwarning("Advertencia", f"Espera a que termine la tarea en curso ({tarea_en_curso['descripcion']}) o cancélala.")
+        return False
+
+    cancelacion = threading.Event()
+    cola = queue.Queue()
+    futuro = ejecutor_tareas.submit(trabajo, avisar_progreso=partial(avisar_progreso_tarea, cancelacion, cola))
+    tarea_en_curso = {'descripcion': descripcion, 'futuro': futuro, 'cancelacion': cancelacion, 'cola': cola,
+                      'al_terminar': al_terminar, 'mensaje_error': mensaje_error}
+
+    # Mientras no llegue el primer aviso de progreso la barra solo indica actividad
+    etiqueta_progreso.configure(text=descripcion)
+    barra_progreso.configure(mode='indeterminate', value=0)
+    barra_progreso.start()
+    boton_cancelar.configure(state=tk.NORMAL)
+    for widget in (boton_cancelar, barra_progreso, etiqueta_progreso):
+        widget.pack(side=tk.RIGHT, padx=5)
+    root.after(INTERVALO_REVISION_TAREA_MS, revisar_tarea)
+    return True
+
+def revisar_tarea():
+    """Actualiza la barra de progreso y, cuando la tarea termina, entrega su resultado o muestra el error."""
+    global tarea_en_curso
+    tarea = tarea_en_curso
+
+    # Solo interesa el último aviso de progreso
+    fraccion = None
+    while True:
+        try:
+            fraccion = tarea['cola'].get_nowait()
+        except queue.Empty:
+            break
+    if fraccion is not None:
+        if str(barra_progreso.cget('mode')) != 'determinate':
+            barra_progreso.stop()
+            barra_progreso.configure(mode='determinate')
+        barra_progreso.configure(value=100 * fraccion)
+
+    if not tarea['futuro'].done():
+        root.after(INTERVALO_REVISION_TAREA_MS, revisar_tarea)
+        return
+
+    tarea_en_curso = None
+    barra_progreso.stop()
+    for widget in (boton_cancelar, barra_progreso, etiqueta_progreso):
+        widget.pack_forget()
+    try:
+        tarea['al_terminar'](tarea['futuro'].result())
+    except TareaCancelada:
+        pass
+    except Exception as e:
+        messagebox.showerror("Error", f"{tarea['mensaje_error']} Error: {e}")
+
+def cancelar_tarea_en_curso():
+    """Pide a la tarea en curso que se detenga en su próximo aviso de progreso."""
+    if tarea_en_curso is not None:
+        tarea_en_curso['cancelacion'].set()
+        boton_cancelar.configure(state=tk.DISABLED)
+        etiqueta_progreso.configure(text="Cancelando...")
+
+def cerrar_ventana():
+    """Cancela la tarea en curso, si la hay, y cierra la aplicación."""
+    cancelar_tarea_en_curso()
+    ejecutor_tareas.shutdown(wait=False, cancel_futures=True)
+    root.destroy()
+
+# Exportación por flujo: las filas se escriben por bloques con un formateador vectorizado y, si la
+# extensión lo pide (.gz, .zst), se comprimen en un hilo aparte mientras se formatea el bloque
+# siguiente. Los destinos binarios (.npy, .npz, .stm) guardan también el tiempo y el cargador los
+# abre sin convertir texto. El .csv lleva el tiempo en su primera columna para poder volver a leerlo.
+FILAS_POR_BLOQUE_ESCRITURA = 65536
+DECIMALES_EXPORTACION = 1
+COLUMNA_TIEMPO_CSV = 'Tiempo (h)'
+NIVEL_COMPRESION_GZIP = 1  # Prioriza la velocidad: las temperaturas con un decimal igual se comprimen bien
+NIVEL_COMPRESION_ZSTD = 3
+COMPRESIONES = {'.gz': 'gzip', '.zst': 'zstd'}
+EXTENSIONES_DATOS = ('.txt', '.csv', '.stm', '.npy', '.npz')
+TIPOS_ARCHIVO_EXPORTACION = [
+    ("Archivo de texto", "*.txt"),
+    ("Archivo CSV", "*.csv"),
+    ("Archivo STM", "*.stm"),
+    ("Texto comprimido (gzip)", "*.txt.gz"),
+    ("Texto comprimido (zstd)", "*.txt.zst"),
+    ("Arreglo NumPy", "*.npy"),
+    ("Arreglo NumPy comprimido", "*.npz")
+]
+
+def extension_datos(ruta):
+    """Devuelve la extensión del formato de un archivo de datos y su compresión, p. ej. ('.txt', 'gzip') para datos.txt.gz."""
+    base, extension = os.path.splitext(ruta.lower())
+    compresion = COMPRESIONES.get(extension)
+    if compresion is not None:
+        extension = os.path.splitext(base)[1]
+    return extension, compresion
+
+def abrir_comprimido(f, compresion, modo):
+    """Envuelve el archivo binario abierto f para leerlo ('rb') o escribirlo ('wb') con la compresión indicada."""
+    if compresion == 'gzip':
+        return gzip.GzipFile(fileobj=f, mode=modo, compresslevel=NIVEL_COMPRESION_GZIP)
+    try:
+        from compression import zstd  # Incluido desde Python 3.14
+        return zstd.ZstdFile(f, mode='w', level=NIVEL_COMPRESION_ZSTD) if 'w' in modo else zstd.ZstdFile(f, mode='r')
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Para usar archivos .zst instale el paquete zstandard.") from None
+    if 'w' in modo:
+        return zstandard.ZstdCompressor(level=NIVEL_COMPRESION_ZSTD).stream_writer(f, closefd=False)
+    return zstandard.ZstdDecompressor().stream_reader(f, closefd=False)
+
+def formatear_bloque_decimal(bloque, decimales=DECIMALES_EXPORTACION, separador=b'\t'):
+    """Formatea un bloque de filas como texto con una cantidad fija de decimales, igual que '%.1f' pero sin recorrer celda por celda."""
+    bloque = np.asarray(bloque, dtype=np.float64)
+    num_filas, num_columnas = bloque.shape
+    escala = 10.0 ** decimales
+    finitos = np.isfinite(bloque)
+    absolutos = np.where(finitos, np.abs(bloque), 0.0)
+    maximo = absolutos.max(initial=0.0) * escala
+    if maximo >= 1e15:
+        # Fuera del rango de los enteros exactos se formatea con Python
+        formato = (separador.decode().join([f'%0.{decimales}f'] * num_columnas) + '\n') * num_filas
+        return (formato % tuple(bloque.ravel().tolist())).encode()
+
+    escalados = absolutos * escala
+    enteros = np.rint(escalados).astype(np.int64)
+    # En los empates de la multiplicación decide el valor exacto del número, como en printf
+    filas, cols = np.nonzero(np.abs(escalados - np.floor(escalados) - 0.5) < 1e-9)
+    enteros[filas, cols] = [int(('%.*f' % (decimales, valor)).replace('.', '')) for valor in absolutos[filas, cols].tolist()]
+
+    # Cada celda ocupa un ancho fijo (signo, dígitos, punto y separador) alineada a la derecha; al
+    # final se quitan los caracteres de relleno
+    max_digitos = max(len(str(int(enteros.max(initial=0)))), decimales + 1)
+    ancho = max_digitos + (3 if decimales else 2)
+    caracteres = np.zeros((num_filas, num_columnas, ancho), dtype=np.uint8)
+    conservar = np.zeros((num_filas, num_columnas, ancho), dtype=bool)
+
+    # Cantidad de dígitos de cada número, con al menos un dígito antes del punto
+    digitos = np.full(enteros.shape, decimales + 1, dtype=np.int64)
+    limite = 10 ** (decimales + 1)
+    for k in range(decimales + 1, max_digitos):
+        digitos[enteros >= limite] = k + 1
+        limite *= 10
+
+    restante = enteros
+    for k in range(max_digitos):
+        posicion = ancho - 2 - k - (1 if decimales and k >= decimales else 0)
+        caracteres[:, :, posicion] = restante % 10 + ord('0')
+        conservar[:, :, posicion] = k < digitos
+        restante = restante // 10
+    if decimales:
+        caracteres[:, :, ancho - 2 - decimales] = ord('.')
+        conservar[:, :, ancho - 2 - decimales] = True
+
+    # El signo va justo antes del primer dígito
+    negativos = np.signbit(bloque) & ~np.isnan(bloque)
+    filas, cols = np.nonzero(negativos & finitos)
+    posicion_signo = ancho - 2 - digitos[filas, cols] - (1 if decimales else 0)
+    caracteres[filas, cols, posicion_signo] = ord('-')
+    conservar[filas, cols, posicion_signo] = True
+
+    # nan e inf se escriben como lo hace Python
+    filas, cols = np.nonzero(~finitos)
+    if len(filas):
+        conservar[filas, cols, :-1] = False
+        palabras = np.frombuffer(b'naninf', dtype=np.uint8).reshape(2, 3)[np.isinf(bloque[filas, cols]).astype(np.intp)]
+        caracteres[filas, cols, ancho - 4:ancho - 1] = palabras
+        conservar[filas, cols, ancho - 4:ancho - 1] = True
+        filas, cols = np.nonzero(negativos & ~finitos)
+        caracteres[filas, cols, ancho - 5] = ord('-')
+        conservar[filas, cols, ancho - 5] = True
+
+    caracteres[:, :, -1] = separador[0]
+    caracteres[:, -1, -1] = ord('\n')
+    conservar[:, :, -1] = True
+    return caracteres[conservar].tobytes()
+
+def formatear_bloque_csv(bloque, tiempo=None):
+    """Formatea un bloque de filas como CSV con todos los decimales de cada valor y las celdas vacías para los datos faltantes; el tiempo, si se da, va primero."""
+    if bloque.dtype == np.float32:
+        # Un float32 pasado a float64 arrastra dígitos que no tenía: se escribe su representación más corta
+        textos = bloque.astype(str)
+        if tiempo is not None:
+            textos = np.column_stack((np.asarray(tiempo, dtype=np.float64).astype(str), textos))
+        return ''.join(','.join(fila) + '\n' for fila in textos.tolist()).encode().replace(b'nan', b'')
+    bloque = np.asarray(bloque, dtype=np.float64)
+    if tiempo is not None:
+        bloque = np.column_stack((np.asarray(tiempo, dtype=np.float64), bloque))
+    formato = (','.join(['%r'] * bloque.shape[1]) + '\n') * len(bloque)
+    return (formato % tuple(bloque.ravel().tolist())).encode().replace(b'nan', b'')
+
+class MatrizDeColumnas:
+    """Columnas de distinta longitud vistas como una matriz completada con NaN, que se arma solo por tramos de filas."""
+    __slots__ = ('columnas', 'shape')
+
+    def __init__(self, columnas):
+        self.columnas = columnas
+        self.shape = (max((len(columna) for columna in columnas), default=0), len(columnas))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, filas):
+        inicio, fin, _ = filas.indices(self.shape[0])
+        bloque = np.full((max(fin - inicio, 0), self.shape[1]), np.nan)
+        for j, columna in enumerate(self.columnas):
+            tramo = columna[inicio:fin]
+            bloque[:len(tramo), j] = tramo
+        return bloque
+
+def bloques_con_tiempo(tiempo, matriz, avisar_progreso=None):
+    """Recorre la matriz por bloques de filas y entrega cada bloque con la columna de tiempo al inicio."""
+    total = len(matriz)
+    for inicio in range(0, total, FILAS_POR_BLOQUE_ESCRITURA):
+        fin = min(inicio + FILAS_POR_BLOQUE_ESCRITURA, total)
+        yield np.column_stack((np.asarray(tiempo[inicio:fin], dtype=np.float64), np.asarray(matriz[inicio:fin], dtype=np.float64)))
+        if avisar_progreso is not None:
+            avisar_progreso(fin / total)
+
+def escribir_npy_por_bloques(f, tiempo, matriz, avisar_progreso=None):
+    """Escribe el tiempo y las series como un arreglo .npy, con las mismas columnas que el caché de los .txt."""
+    np.lib.format.write_array_header_1_0(f, {'descr': '<f8', 'fortran_order': False, 'shape': (len(matriz), matriz.shape[1] + 1)})
+    for bloque in bloques_con_tiempo(tiempo, matriz, avisar_progreso):
+        f.write(bloque.tobytes())
+
+def escribir_npz_por_bloques(f, tiempo, matriz, nombres=None, avisar_progreso=None):
+    """Escribe un .npz comprimido con el arreglo 'datos' (tiempo y series) y los nombres de las series."""
+    nombres = list(nombres) if nombres is not None else [f"Serie {i+1}" for i in range(matriz.shape[1])]
+    with zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED, compresslevel=NIVEL_COMPRESION_GZIP) as contenido:
+        with contenido.open('datos.npy', 'w', force_zip64=True) as miembro:
+            escribir_npy_por_bloques(miembro, tiempo, matriz, avisar_progreso)
+        with contenido.open('nombres.npy', 'w') as miembro:
+            np.lib.format.write_array(miembro, np.array(nombres, dtype=str))
+
+def escribir_texto_por_bloques(f, matriz, compresion=None, es_csv=False, nombres=None, avisar_progreso=None, tiempo=None):
+    """Formatea la matriz por bloques de filas y la escribe; la compresión y la escritura de un bloque se hacen mientras se formatea el siguiente. El .csv lleva el tiempo si se da."""
+    salida = abrir_comprimido(f, compresion, 'wb') if compresion else f
+    total = len(matriz)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as escritor:
+            pendiente = None
+            if es_csv:
+                encabezado = list(nombres) if nombres is not None else [f"Serie {i+1}" for i in range(matriz.shape[1])]
+                if tiempo is not None:
+                    encabezado = [COLUMNA_TIEMPO_CSV] + encabezado
+                pendiente = escritor.submit(salida.write, (','.join(str(nombre) for nombre in encabezado) + '\n').encode('utf-8'))
+            for inicio in range(0, total, FILAS_POR_BLOQUE_ESCRITURA):
+                filas = slice(inicio, inicio + FILAS_POR_BLOQUE_ESCRITURA)
+                bloque = matriz[filas]
+                if es_csv:
+                    texto = formatear_bloque_csv(bloque, None if tiempo is None else tiempo[filas])
+                else:
+                    texto = formatear_bloque_decimal(bloque)
+                # Solo un bloque formateado espera a ser escrito, así la memoria no depende del tamaño del archivo
+                if pendiente is not None:
+                    pendiente.result()
+                pendiente = escritor.submit(salida.write, texto)
+                if avisar_progreso is not None:
+                    avisar_progreso(min(inicio + FILAS_POR_BLOQUE_ESCRITURA, total) / total)
+            if pendiente is not None:
+                pendiente.result()
+    finally:
+        if salida is not f:
+            salida.close()
+
+@perfilar('exportacion')
+def escribir_matriz_por_bloques(ruta, matriz, avisar_progreso=None, nombres=None, tiempo=None):
+    """Exporta las series por bloques de filas al formato de la extensión: .txt o .csv (también .gz o .zst), .npy, .npz o .stm."""
+    extension, compresion = extension_datos(ruta)
+    if tiempo is None:
+        # Mismo tiempo que se generaría al volver a cargar el .txt
+        tiempo = TiempoUniforme(len(matriz))
+    if extension == '.stm':
+        escribir_archivo_stm(ruta, tiempo, matriz, nombres, avisar_progreso)
+        return
+
+    # Se escribe primero a un temporal para no dejar un archivo a medio escribir si se cancela
+    temporal = ruta + '.tmp'
+    try:
+        with open(temporal, 'wb') as f:
+            if extension == '.npy':
+                escribir_npy_por_bloques(f, tiempo, matriz, avisar_progreso)
+            elif extension == '.npz':
+                escribir_npz_por_bloques(f, tiempo, matriz, nombres, avisar_progreso)
+            else:
+                escribir_texto_por_bloques(f, matriz, compresion, extension == '.csv', nombres, avisar_progreso, tiempo)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+def seleccionar_archivo(tipos=(("Archivos de texto", "*.txt"),)):
     """Abre un cuadro de diálogo para seleccionar un archivo y devuelve su ruta."""
-    return filedialog.askopenfilename(filetypes=[("Archivos de texto", "*.txt")])
+    return filedialog.askopenfilename(filetypes=list(tipos))
+
+# Tabla de ingreso manual: los valores viven en una matriz de NumPy que crece por duplicación, con
+# NaN en las celdas vacías, y la vista solo dibuja las filas y columnas que se ven. Un pegado se
+# interpreta de una sola vez y editar una celda solo interpreta esa celda.
+COLUMNAS_INICIALES_TABLA = 5
+FILAS_VISIBLES_TABLA = 15
+ANCHO_CELDA_PX = 110
+ALTO_CELDA_PX = 22
+ANCHO_NUMERO_FILA_PX = 60
+MAXIMO_CELDAS_INVALIDAS_AVISO = 20
+# Una coma es decimal solo si es el único separador de la celda (5,3); en 1,234.5 separa los miles
+NUMERO_CON_COMA_DECIMAL = r'\s*[-+]?\d+,\d+\s*'
+NUMERO_CON_COMA_DE_MILES = r'\s*[-+]?\d{1,3}(?:,\d{3})+(?:\.\d*)?\s*'
+NOMBRES_COLUMNAS_INGRESO = [
+    "Inferior de la caja",
+    "Superior de la caja",
+    "Interior de la caja",
+    "Externa de la caja 1",
+    "Externa de la caja 2"
+]
+
+def crear_modelo_tabla(columnas=COLUMNAS_INICIALES_TABLA):
+    """Crea una tabla vacía: la matriz de valores, las filas y columnas en uso y el texto de las celdas inválidas."""
+    return {'valores': np.full((1024, columnas), np.nan), 'filas': 0, 'columnas': columnas, 'invalidos': {}}
+
+def asegurar_tamano_tabla(modelo, filas, columnas):
+    """Agranda la matriz de la tabla para que quepan las filas y columnas indicadas."""
+    valores = modelo['valores']
+    if filas > valores.shape[0] or columnas > valores.shape[1]:
+        nuevos = np.full((max(filas, 2 * valores.shape[0]) if filas > valores.shape[0] else valores.shape[0],
+                          max(columnas, valores.shape[1])), np.nan)
+        nuevos[:valores.shape[0], :valores.shape[1]] = valores
+        modelo['valores'] = nuevos
+    modelo['columnas'] = max(modelo['columnas'], columnas)
+
+def convertir_columna_tabla(columna):
+    """Convierte una columna de celdas de texto a números, aceptando la coma decimal y la coma de miles."""
+    import pandas as pd
+    con_coma = columna.str.contains(',', regex=False)
+    if not con_coma.any():
+        return pd.to_numeric(columna, errors='coerce')
+
+    # Cambiar todas las comas por puntos solo da un número si la coma era el único separador
+    numeros = pd.to_numeric(columna.str.replace(',', '.', regex=False), errors='coerce')
+    textos = columna[con_coma & numeros.isna()]
+    textos = textos[textos.str.fullmatch(NUMERO_CON_COMA_DE_MILES)]
+    numeros[textos.index] = pd.to_numeric(textos.str.replace(',', '', regex=False), errors='coerce')
+    return numeros
+
+def interpretar_texto_tabla(texto):
+    """Convierte un bloque pegado (filas por línea, celdas separadas por tabuladores) en valores y celdas inválidas."""
+    lineas = texto.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    if lineas and lineas[-1] == '':
+        lineas.pop()  # Excel termina la copia con un salto de línea
+    if not lineas:
+        return np.empty((0, 0)), np.zeros((0, 0), dtype=bool), np.empty((0, 0), dtype=object)
+
+    # Todas las celdas se leen como texto de una vez y cada columna se convierte a número en un solo
+    # paso; el texto se conserva tal cual para el aviso de celdas inválidas
+    import pandas as pd  # Solo se carga al pegar, leer CSV o exportar; no demora el arranque
+    num_campos = max(linea.count('\t') for linea in lineas) + 1
+    celdas = pd.read_csv(io.StringIO('\n'.join(lineas)), sep='\t', header=None, names=range(num_campos),
+                         dtype=str, keep_default_na=False, skip_blank_lines=False, quoting=csv.QUOTE_NONE).fillna('')
+    if len(celdas) < len(lineas):
+        # Una última línea en blanco no llega a ser fila para el lector
+        celdas = celdas.reindex(range(len(lineas)), fill_value='')
+    valores = celdas.apply(convertir_columna_tabla).to_numpy(dtype=np.float64)
+
+    # Es inválida la celda con texto que no es un número; las vacías y las "nan" quedan como NaN.
+    # Solo se revisan una por una las celdas que no se pudieron convertir
+    textos = celdas.to_numpy(dtype=object, copy=True)
+    invalidas = np.isnan(valores)
+    filas, cols = np.nonzero(invalidas)
+    textos[filas, cols] = [texto.strip() for texto in textos[filas, cols]]
+    invalidas[filas, cols] = [texto != '' and texto.lower() != 'nan' for texto in textos[filas, cols]]
+    return valores, invalidas, textos
+
+def pegar_en_tabla(modelo, fila, col, texto):
+    """Pega el bloque de texto a partir de la celda indicada y devuelve las posiciones de las celdas inválidas."""
+    valores, invalidas, textos = interpretar_texto_tabla(texto)
+    num_filas, num_columnas = valores.shape
+    if not num_filas:
+        return []
+    asegurar_tamano_tabla(modelo, fila + num_filas, col + num_columnas)
+    modelo['valores'][fila:fila + num_filas, col:col + num_columnas] = valores
+
+    # Las celdas pegadas reemplazan a las inválidas que hubiera en la zona
+    invalidos = modelo['invalidos']
+    for clave in [clave for clave in invalidos if fila <= clave[0] < fila + num_filas and col <= clave[1] < col + num_columnas]:
+        del invalidos[clave]
+    filas_invalidas, columnas_invalidas = np.nonzero(invalidas)
+    posiciones = list(zip((filas_invalidas + fila).tolist(), (columnas_invalidas + col).tolist()))
+    invalidos.update(zip(posiciones, textos[filas_invalidas, columnas_invalidas].tolist()))
+
+    modelo['filas'] = max(modelo['filas'], fila + num_filas)
+    recortar_filas_tabla(modelo)
+    return posiciones
+
+def editar_celda_tabla(modelo, fila, col, texto):
+    """Cambia el valor de una sola celda y devuelve False si el texto no es un número."""
+    texto = texto.strip()
+    asegurar_tamano_tabla(modelo, fila + 1, col + 1)
+    modelo['invalidos'].pop((fila, col), None)
+    valor = np.nan
+    if texto and texto.lower() != 'nan':
+        try:
+            if re.fullmatch(NUMERO_CON_COMA_DECIMAL, texto):
+                texto_numero = texto.replace(',', '.')
+            elif re.fullmatch(NUMERO_CON_COMA_DE_MILES, texto):
+                texto_numero = texto.replace(',', '')
+            else:
+                texto_numero = texto
+            valor = float(texto_numero)
+        except ValueError:
+            modelo['invalidos'][(fila, col)] = texto
+    modelo['valores'][fila, col] = valor
+
+    if texto:
+        modelo['filas'] = max(modelo['filas'], fila + 1)
+    else:
+        recortar_filas_tabla(modelo)
+    return (fila, col) not in modelo['invalidos']
+
+def recortar_filas_tabla(modelo):
+    """Descuenta las filas vacías del final de la tabla."""
+    filas_con_datos = np.flatnonzero(~np.isnan(modelo['valores'][:modelo['filas']]).all(axis=1))
+    ultima = filas_con_datos[-1] + 1 if len(filas_con_datos) else 0
+    if modelo['invalidos']:
+        ultima = max(ultima, max(fila for fila, _ in modelo['invalidos']) + 1)
+    modelo['filas'] = ultima
+
+def datos_de_tabla(modelo):
+    """Devuelve la matriz con las filas en uso y hasta la última columna con datos, y las celdas inválidas ordenadas."""
+    valores = modelo['valores'][:modelo['filas'], :modelo['columnas']]
+    columnas_con_datos = np.flatnonzero(~np.isnan(valores).all(axis=0))
+    ultima = columnas_con_datos[-1] + 1 if len(columnas_con_datos) else 0
+    if modelo['invalidos']:
+        ultima = max(ultima, max(col for _, col in modelo['invalidos']) + 1)
+    return valores[:, :ultima].copy(), sorted(modelo['invalidos'])
+
+def describir_celdas(posiciones):
+    """Describe las primeras celdas de la lista como "fila F, columna C"."""
+    texto = "\n".join(f"fila {fila + 1}, columna {col + 1}" for fila, col in posiciones[:MAXIMO_CELDAS_INVALIDAS_AVISO])
+    if len(posiciones) > MAXIMO_CELDAS_INVALIDAS_AVISO:
+        texto += f"\n... y {len(posiciones) - MAXIMO_CELDAS_INVALIDAS_AVISO} más"
+    return texto
+
+def leer_datos_ingresados():
+    """Devuelve la matriz de la tabla de ingreso, o None si está vacía o el usuario no acepta las celdas inválidas."""
+    matriz, invalidos = datos_de_tabla(tabla_ingreso)
+    if not matriz.size:
+        messagebox.showwarning("Advertencia", "No hay datos ingresados.")
+        return None
+    if invalidos and not messagebox.askyesno(
+            "Celdas inválidas", f"Hay {len(invalidos)} celdas que no son números:\n\n{describir_celdas(invalidos)}\n\n¿Continuar dejándolas vacías?"):
+        return None
+    return matriz
+
+# Vista de la tabla: un lienzo de Tk donde solo se dibujan las celdas visibles
+def crear_vista_tabla(padre):
+    """Crea el lienzo de la tabla con sus barras de desplazamiento y conecta el teclado y el mouse."""
+    global lienzo_tabla, barra_tabla_vertical, barra_tabla_horizontal, vista_tabla
+    vista_tabla = {'primera_fila': 0, 'primera_columna': 0, 'seleccion': (0, 0), 'editor': None}
+
+    marco = ttk.Frame(padre)
+    lienzo_tabla = tk.Canvas(marco, bg='white', highlightthickness=1, takefocus=1,
+                             width=ANCHO_NUMERO_FILA_PX + COLUMNAS_INICIALES_TABLA * ANCHO_CELDA_PX,
+                             height=(FILAS_VISIBLES_TABLA + 1) * ALTO_CELDA_PX)
+    barra_tabla_vertical = ttk.Scrollbar(marco, orient="vertical", command=desplazar_filas_tabla)
+    barra_tabla_horizontal = ttk.Scrollbar(marco, orient="horizontal", command=desplazar_columnas_tabla)
+    lienzo_tabla.grid(row=0, column=0, sticky="nsew")
+    barra_tabla_vertical.grid(row=0, column=1, sticky="ns")
+    barra_tabla_horizontal.grid(row=1, column=0, sticky="ew")
+    marco.columnconfigure(0, weight=1)
+    marco.rowconfigure(0, weight=1)
+
+    lienzo_tabla.bind('<Configure>', lambda event: dibujar_tabla())
+    lienzo_tabla.bind('<Button-1>', seleccionar_celda_con_mouse)
+    lienzo_tabla.bind('<Double-Button-1>', lambda event: abrir_editor_celda())
+    lienzo_tabla.bind('<Key>', tecla_en_tabla)
+    for secuencia in ('<Control-v>', '<Control-V>', '<<Paste>>'):
+        lienzo_tabla.bind(secuencia, pegar_portapapeles_en_tabla)
+    lienzo_tabla.bind('<MouseWheel>', lambda event: desplazar_filas_tabla('scroll', -1 if event.delta > 0 else 1, 'units'))
+    lienzo_tabla.bind('<Button-4>', lambda event: desplazar_filas_tabla('scroll', -1, 'units'))
+    lienzo_tabla.bind('<Button-5>', lambda event: desplazar_filas_tabla('scroll', 1, 'units'))
+    return marco
+
+def filas_columnas_visibles():
+    """Devuelve cuántas filas y columnas de celdas caben en el lienzo."""
+    alto = max(lienzo_tabla.winfo_height(), 1)
+    ancho = max(lienzo_tabla.winfo_width(), 1)
+    return max(alto // ALTO_CELDA_PX - 1, 1), max((ancho - ANCHO_NUMERO_FILA_PX) // ANCHO_CELDA_PX, 1)
+
+def total_filas_columnas_tabla():
+    """Devuelve las filas y columnas por las que se puede desplazar: las usadas más una página en blanco."""
+    filas_visibles, columnas_visibles = filas_columnas_visibles()
+    return tabla_ingreso['filas'] + filas_visibles, max(tabla_ingreso['columnas'], columnas_visibles)
+
+def texto_celda(fila, col):
+    """Devuelve el texto que muestra una celda: el valor, el texto inválido o nada."""
+    invalido = tabla_ingreso['invalidos'].get((fila, col))
+    if invalido is not None:
+        return invalido
+    valores = tabla_ingreso['valores']
+    if fila >= valores.shape[0] or col >= valores.shape[1] or np.isnan(valores[fila, col]):
+        return ''
+    return f"{valores[fila, col]:g}"
+
+def dibujar_tabla():
+    """Redibuja solo el encabezado y las celdas visibles, y ajusta las barras de desplazamiento."""
+    lienzo_tabla.delete('celda')
+    filas_visibles, columnas_visibles = filas_columnas_visibles()
+    total_filas, total_columnas = total_filas_columnas_tabla()
+    primera_fila, primera_columna = vista_tabla['primera_fila'], vista_tabla['primera_columna']
+    fila_seleccionada, columna_seleccionada = vista_tabla['seleccion']
+
+    for j in range(columnas_visibles):
+        col = primera_columna + j
+        x = ANCHO_NUMERO_FILA_PX + j * ANCHO_CELDA_PX
+        nombre = f"columna {col + 1}"
+        lienzo_tabla.create_rectangle(x, 0, x + ANCHO_CELDA_PX, ALTO_CELDA_PX, fill='#e6e6e6', outline='#b0b0b0', tags='celda')
+        lienzo_tabla.create_text(x + ANCHO_CELDA_PX / 2, ALTO_CELDA_PX / 2, text=nombre, tags='celda')
+
+    for i in range(filas_visibles):
+        fila = primera_fila + i
+        y = (i + 1) * ALTO_CELDA_PX
+        lienzo_tabla.create_rectangle(0, y, ANCHO_NUMERO_FILA_PX, y + ALTO_CELDA_PX, fill='#e6e6e6', outline='#b0b0b0', tags='celda')
+        lienzo_tabla.create_text(ANCHO_NUMERO_FILA_PX - 6, y + ALTO_CELDA_PX / 2, text=str(fila + 1), anchor='e', tags='celda')
+        for j in range(columnas_visibles):
+            col = primera_columna + j
+            x = ANCHO_NUMERO_FILA_PX + j * ANCHO_CELDA_PX
+            if (fila, col) == (fila_seleccionada, columna_seleccionada):
+                fondo = '#cce5ff'
+            elif (fila, col) in tabla_ingreso['invalidos']:
+                fondo = '#ffd6d6'
+            else:
+                fondo = 'white'
+            lienzo_tabla.create_rectangle(x, y, x + ANCHO_CELDA_PX, y + ALTO_CELDA_PX, fill=fondo, outline='#d0d0d0', tags='celda')
+            lienzo_tabla.create_text(x + ANCHO_CELDA_PX - 6, y + ALTO_CELDA_PX / 2, text=texto_celda(fila, col), anchor='e',
+                                     fill='black', tags='celda')
+
+    barra_tabla_vertical.set(primera_fila / total_filas, min((primera_fila + filas_visibles) / total_filas, 1.0))
+    barra_tabla_horizontal.set(primera_columna / total_columnas, min((primera_columna + columnas_visibles) / total_columnas, 1.0))
+
+def nueva_primera_posicion(args, actual, visibles, total):
+    """Interpreta los argumentos de una barra de desplazamiento de Tk y devuelve la nueva primera fila o columna."""
+    if args[0] == 'moveto':
+        nueva = int(float(args[1]) * total)
+    else:
+        paso = visibles if args[2] == 'pages' else 1
+        nueva = actual + int(args[1]) * paso
+    return min(max(nueva, 0), max(total - visibles, 0))
+
+def desplazar_filas_tabla(*args):
+    """Desplaza la tabla verticalmente según la barra o la rueda del mouse."""
+    filas_visibles, _ = filas_columnas_visibles()
+    total_filas, _ = total_filas_columnas_tabla()
+    vista_tabla['primera_fila'] = nueva_primera_posicion(args, vista_tabla['primera_fila'], filas_visibles, total_filas)
+    cerrar_editor_celda(guardar=True)
+    dibujar_tabla()
+
+def desplazar_columnas_tabla(*args):
+    """Desplaza la tabla horizontalmente según la barra."""
+    _, columnas_visibles = filas_columnas_visibles()
+    _, total_columnas = total_filas_columnas_tabla()
+    vista_tabla['primera_columna'] = nueva_primera_posicion(args, vista_tabla['primera_columna'], columnas_visibles, total_columnas)
+    cerrar_editor_celda(guardar=True)
+    dibujar_tabla()
+
+def mover_seleccion_tabla(fila, col):
+    """Selecciona la celda indicada y desplaza la vista si quedó fuera."""
+    fila, col = max(fila, 0), max(col, 0)
+    filas_visibles, columnas_visibles = filas_columnas_visibles()
+    vista_tabla['seleccion'] = (fila, col)
+    if fila < vista_tabla['primera_fila']:
+        vista_tabla['primera_fila'] = fila
+    elif fila >= vista_tabla['primera_fila'] + filas_visibles:
+        vista_tabla['primera_fila'] = fila - filas_visibles + 1
+    if col < vista_tabla['primera_columna']:
+        vista_tabla['primera_columna'] = col
+    elif col >= vista_tabla['primera_columna'] + columnas_visibles:
+        vista_tabla['primera_columna'] = col - columnas_visibles + 1
+    dibujar_tabla()
+
+def seleccionar_celda_con_mouse(event):
+    """Selecciona la celda bajo el puntero."""
+    cerrar_editor_celda(guardar=True)
+    lienzo_tabla.focus_set()
+    if event.x < ANCHO_NUMERO_FILA_PX or event.y < ALTO_CELDA_PX:
+        return
+    mover_seleccion_tabla(vista_tabla['primera_fila'] + event.y // ALTO_CELDA_PX - 1,
+                          vista_tabla['primera_columna'] + (event.x - ANCHO_NUMERO_FILA_PX) // ANCHO_CELDA_PX)
+
+def tecla_en_tabla(event):
+    """Mueve la selección con las flechas, borra con Supr y empieza a editar al escribir."""
+    fila, col = vista_tabla['seleccion']
+    movimientos = {'Up': (-1, 0), 'Down': (1, 0), 'Left': (0, -1), 'Right': (0, 1), 'Return': (1, 0), 'Tab': (0, 1)}
+    if event.keysym in movimientos:
+        df, dc = movimientos[event.keysym]
+        mover_seleccion_tabla(fila + df, col + dc)
+        return 'break'
+    if event.keysym in ('Delete', 'BackSpace'):
+        editar_celda_tabla(tabla_ingreso, fila, col, '')
+        dibujar_tabla()
+        return 'break'
+    if event.keysym == 'F2':
+        abrir_editor_celda()
+        return 'break'
+    if event.char and event.char.isprintable() and not event.state & 0x4:  # Sin Ctrl
+        abrir_editor_celda(event.char)
+        return 'break'
+
+def abrir_editor_celda(texto_inicial=None):
+    """Abre un campo de texto sobre la celda seleccionada."""
+    cerrar_editor_celda(guardar=True)
+    fila, col = vista_tabla['seleccion']
+    x = ANCHO_NUMERO_FILA_PX + (col - vista_tabla['primera_columna']) * ANCHO_CELDA_PX
+    y = (fila - vista_tabla['primera_fila'] + 1) * ALTO_CELDA_PX
+    editor = tk.Entry(lienzo_tabla, justify='right', relief='flat')
+    editor.insert(0, texto_celda(fila, col) if texto_inicial is None else texto_inicial)
+    editor.bind('<Return>', lambda event: confirmar_editor_celda(1, 0))
+    editor.bind('<Tab>', lambda event: confirmar_editor_celda(0, 1))
+    editor.bind('<Escape>', lambda event: cerrar_editor_celda(guardar=False))
+    editor.bind('<FocusOut>', lambda event: cerrar_editor_celda(guardar=True))
+    lienzo_tabla.create_window(x + 1, y + 1, window=editor, anchor='nw', width=ANCHO_CELDA_PX - 2, height=ALTO_CELDA_PX - 2, tags='editor')
+    editor.focus_set()
+    vista_tabla['editor'] = editor
+
+def cerrar_editor_celda(guardar=True):
+    """Cierra el campo de texto abierto y, si se pide, guarda su contenido en la celda."""
+    editor, vista_tabla['editor'] = vista_tabla['editor'], None
+    if editor is None:
+        return
+    if guardar:
+        fila, col = vista_tabla['seleccion']
+        editar_celda_tabla(tabla_ingreso, fila, col, editor.get())
+    lienzo_tabla.delete('editor')
+    editor.destroy()
+    lienzo_tabla.focus_set()
+    dibujar_tabla()
+    return 'break'
+
+def confirmar_editor_celda(df, dc):
+    """Guarda la celda editada y pasa a la siguiente."""
+    cerrar_editor_celda(guardar=True)
+    fila, col = vista_tabla['seleccion']
+    mover_seleccion_tabla(fila + df, col + dc)
+    return 'break'
+
+def pegar_portapapeles_en_tabla(event=None):
+    """Pega el portapapeles a partir de la celda seleccionada y avisa las celdas que no son números."""
+    try:
+        texto = root.clipboard_get()
+    except tk.TclError:
+        return 'break'
+    cerrar_editor_celda(guardar=True)
+    fila, col = vista_tabla['seleccion']
+    invalidas = pegar_en_tabla(tabla_ingreso, fila, col, texto)
+    dibujar_tabla()
+    if invalidas:
+        messagebox.showwarning("Celdas inválidas", f"{len(invalidas)} celdas pegadas no son números y quedaron marcadas:\n\n{describir_celdas(invalidas)}")
+    return 'break'
+
+def agregar_columna_tabla():
+    """Agrega una columna vacía al final de la tabla."""
+    asegurar_tamano_tabla(tabla_ingreso, 1, tabla_ingreso['columnas'] + 1)
+    dibujar_tabla()
+
+def limpiar_tabla():
+    """Vacía la tabla de ingreso."""
+    global tabla_ingreso
+    if messagebox.askyesno("Limpiar Tabla", "¿Borrar todos los datos ingresados?"):
+        cerrar_editor_celda(guardar=False)
+        tabla_ingreso = crear_modelo_tabla()
+        vista_tabla.update(primera_fila=0, primera_columna=0, seleccion=(0, 0))
+        dibujar_tabla()
 
 def crear_seccion_ingreso_datos():
-    """Crea una sección en la interfaz principal para ingresar datos manualmente en 5 columnas."""
-    global frame_ingreso_datos, entradas
+    """Crea una sección en la interfaz principal para ingresar datos manualmente en una tabla."""
+    global frame_ingreso_datos, tabla_ingreso
 
     # Frame para la sección de ingreso de datos
     frame_ingreso_datos = ttk.Frame(root, padding="10")
     frame_ingreso_datos.pack(side=tk.TOP, fill=tk.X, pady=10)
 
-    entradas = []
-    scrollbar_entradas = []
-
-    # Definir los nombres personalizados para las columnas
-    nombres_columnas_personalizados = [
-        "columna 1",
-        "columna 2",
-        "columna 3",
-        "columna 4",
-        "columna 5"
-    ]
-
-    for i in range(5):
-        columna_frame = ttk.Frame(frame_ingreso_datos)
-        columna_frame.grid(row=0, column=i, padx=5, pady=5, sticky="nsew")
-
-        etiqueta = ttk.Label(columna_frame, text=nombres_columnas_personalizados[i])
-        etiqueta.pack(side=tk.TOP, pady=5)
+    tabla_ingreso = crear_modelo_tabla()
+    crear_vista_tabla(frame_ingreso_datos).grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+    frame_ingreso_datos.columnconfigure(0, weight=1)
 
-        entrada = tk.Text(columna_frame, height=20, width=15, wrap="none")
-        entrada.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        scrollbar_vertical = ttk.Scrollbar(columna_frame, orient="vertical", command=entrada.yview)
-        scrollbar_vertical.pack(side=tk.RIGHT, fill=tk.Y)
-        entrada.config(yscrollcommand=scrollbar_vertical.set)
-
-        scrollbar_horizontal = ttk.Scrollbar(frame_ingreso_datos, orient="horizontal", command=entrada.xview)
-        scrollbar_horizontal.grid(row=1, column=i, sticky="ew")
-        entrada.config(xscrollcommand=scrollbar_horizontal.set)
-
-        entradas.append(entrada)
-        scrollbar_entradas.append((scrollbar_vertical, scrollbar_horizontal))
-
-    # Frame para los botones al lado de las columnas
+    # Frame para los botones al lado de la tabla
     frame_botones = ttk.Frame(frame_ingreso_datos)
-    frame_botones.grid(row=0, column=5, padx=10, pady=10, sticky="nsew")
+    frame_botones.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
 
     boton_visualizar = ttk.Button(frame_botones, text="Visualizar Gráfica", command=visualizar_datos_ingresados)
     boton_visualizar.pack(side=tk.TOP, pady=5)
@@ -62,151 +859,373 @@ def crear_seccion_ingreso_datos():
     boton_guardar = ttk.Button(frame_botones, text="Guardar como CSV/TXT", command=guardar_datos_ingresados)
     boton_guardar.pack(side=tk.TOP, pady=5)
 
-    frame_ingreso_datos.pack_forget()  # Ocultarlo inicialmente
+    boton_columna = ttk.Button(frame_botones, text="Agregar Columna", command=agregar_columna_tabla)
+    boton_columna.pack(side=tk.TOP, pady=5)
+
+    boton_limpiar = ttk.Button(frame_botones, text="Limpiar Tabla", command=limpiar_tabla)
+    boton_limpiar.pack(side=tk.TOP, pady=5)
 
 def toggle_seccion_ingreso_datos():
-    """Muestra u oculta la sección de ingreso de datos manualmente."""
-    if frame_ingreso_datos.winfo_ismapped():
+    """Muestra u oculta la sección de ingreso de datos manualmente; la primera vez la construye."""
+    if frame_ingreso_datos is None:
+        crear_seccion_ingreso_datos()
+        lienzo_tabla.focus_set()
+    elif frame_ingreso_datos.winfo_ismapped():
         frame_ingreso_datos.pack_forget()
     else:
         frame_ingreso_datos.pack(side=tk.TOP, fill=tk.X, pady=10)
+        lienzo_tabla.focus_set()
 
 def visualizar_datos_ingresados():
     """Toma los datos ingresados y los visualiza en la gráfica."""
-    global canvas, fig, ax, nombres_columnas
+    global conjunto_datos, num_columnas, seleccion_columnas, nombres_columnas, archivo_stm
 
-    # Recoger los datos de las entradas
-    columnas_datos = []
-    for entrada in entradas:
-        datos_texto = entrada.get("1.0", tk.END).strip().split('\n')
-        datos_fila = [float(valor) for valor in datos_texto if valor]
-        columnas_datos.append(datos_fila)
-
-    # Validar que todas las columnas tengan la misma longitud
-    max_length = max(len(col) for col in columnas_datos)
-    for i in range(len(columnas_datos)):
-        if len(columnas_datos[i]) < max_length:
-            columnas_datos[i].extend([0] * (max_length - len(columnas_datos[i])))  # Rellenar con ceros
-
-    # Definir los nombres personalizados para las columnas
-    nombres_columnas = [
-        "Inferior de la caja",
-        "Superior de la caja",
-        "Interior de la caja",
-        "Externa de la caja 1",
-        "Externa de la caja 2"
-    ]
-
-    # Graficar los datos
-    if canvas:
-        canvas.get_tk_widget().destroy()
-
-    fig, ax = plt.subplots(figsize=(10, 6))
-    colores = ['blue', 'orange', 'green', 'red', 'purple']
+    cerrar_editor_celda(guardar=True)
+    matriz = leer_datos_ingresados()
+    if matriz is None:
+        return
 
-    for idx, col in enumerate(columnas_datos):
-        ax.plot(range(len(col)), col, label=nombres_columnas[idx], color=colores[idx % len(colores)])
+    # Las primeras columnas conservan los nombres de la caja; las demás se numeran
+    num_columnas = matriz.shape[1]
+    nombres_columnas = NOMBRES_COLUMNAS_INGRESO[:num_columnas] + [f"Columna {i + 1}" for i in range(len(NOMBRES_COLUMNAS_INGRESO), num_columnas)]
 
-    # Añadir líneas punteadas y etiquetas de los ejes
-    ax.axhline(y=2, color='r', linestyle='--', label='Límite Inferior')
-    ax.axhline(y=8, color='r', linestyle='--', label='Límite Superior')
-    ax.set_xlabel('Horas')
-    ax.set_ylabel('Temperatura (°C)')
+    # Usar el número de fila como eje x y reutilizar la misma figura que los datos cargados
+    conjunto_datos = ConjuntoDatos(TiempoUniforme(len(matriz), paso=1), np.asfortranarray(matriz, dtype=TIPO_SERIES))
+    archivo_stm = None
+    seleccion_columnas = list(range(num_columnas))
+    lista_columnas['values'] = nombres_columnas
 
-    ax.legend(loc='upper right')
-    ax.grid(True)
-
-    canvas = FigureCanvasTkAgg(fig, master=frame_grafica)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    detener_seguimiento()
+    actualizar_grafica()
 
 def guardar_datos_ingresados():
     """Guarda los datos ingresados manualmente en un archivo .txt o .csv."""
-    columnas_datos = []
-    for entrada in entradas:
-        datos_texto = entrada.get("1.0", tk.END).strip().split('\n')
-        datos_fila = [float(valor) for valor in datos_texto if valor]
-        columnas_datos.append(datos_fila)
-
-    # Validar que todas las columnas tengan la misma longitud
-    max_length = max(len(col) for col in columnas_datos)
-    for i in range(len(columnas_datos)):
-        if len(columnas_datos[i]) < max_length:
-            columnas_datos[i].extend([0] * (max_length - len(columnas_datos[i])))  # Rellenar con ceros
+    cerrar_editor_celda(guardar=True)
+    matriz = leer_datos_ingresados()
+    if matriz is None:
+        return
 
     # Guardar los datos en un archivo
-    archivo_guardar = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Archivo de texto", "*.txt"), ("Archivo CSV", "*.csv")])
+    archivo_guardar = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=TIPOS_ARCHIVO_EXPORTACION)
+    if not archivo_guardar:
+        messagebox.showwarning("Advertencia", "No se seleccionó ningún archivo para guardar.")
+        return
 
-    if archivo_guardar.endswith(".txt"):
-        np.savetxt(archivo_guardar, np.column_stack(columnas_datos), delimiter='\t', fmt='%0.1f')
+    ejecutar_en_segundo_plano("Guardando datos", partial(escribir_matriz_por_bloques, archivo_guardar, matriz),
+                              lambda _: messagebox.showinfo("Éxito", f"Archivo guardado exitosamente en {archivo_guardar}."),
+                              "No se pudo guardar el archivo.")
+
+
+# Alineación por marcas de tiempo: los CSV de registradores con distinto intervalo, inicio o huecos
+# se llevan a una base de tiempo común. Las fechas se convierten por columna a datetime64 sin recorrer
+# fila por fila, y cada muestra se ubica en la grilla uniforme por aritmética en lugar de búsquedas,
+# así el costo es lineal en la cantidad total de muestras y de puntos de la grilla.
+PASO_TIEMPO_HORAS = 0.08  # Intervalo entre las filas de un .txt, que no guarda el tiempo
+NS_POR_HORA = 3_600_000_000_000
+PALABRAS_COLUMNA_TIEMPO = {'fecha', 'date', 'time', 'hora', 'tiempo', 'timestamp', 'datetime'}  # Palabras enteras del encabezado
+MAXIMO_CAMPOS_FECHA = 7  # Tres de la fecha, tres de la hora y las fracciones de segundo
+FACTOR_HUECO = 1.5  # Un intervalo mayor que 1.5 veces el habitual de la serie es un hueco
+MAXIMO_FILAS_ALINEADAS = 20_000_000
+
+def es_columna_tiempo(nombre, columna='°C'):
+    """Indica si el nombre de una columna de un CSV corresponde a la fecha o la hora."""
+    nombre = str(nombre).strip().lower()
+    # Se comparan palabras enteras: "Fecha/Hora" y "Date Time" cuentan, "runtime" y "Timer" no
+    palabras = re.findall(r'[^\W\d_]+', nombre)
+    return nombre != columna.lower() and not PALABRAS_COLUMNA_TIEMPO.isdisjoint(palabras)
+
+def campos_numericos(textos):
+    """Extrae de cada texto los números que contiene, en orden, y devuelve sus valores, cuántas cifras tiene cada uno y si dice a. m. o p. m."""
+    textos = np.asarray(textos, dtype=str)
+    num_textos = len(textos)
+    ancho = max(textos.dtype.itemsize // 4, 1)
+    caracteres = np.ascontiguousarray(textos).view(np.uint32).reshape(num_textos, ancho)
+    es_digito = (caracteres >= ord('0')) & (caracteres <= ord('9'))
+    es_pm = ((caracteres == ord('P')) | (caracteres == ord('p'))).any(axis=1)
+    es_am = ((caracteres == ord('A')) | (caracteres == ord('a'))).any(axis=1) & ~es_pm
+    valores = np.zeros((num_textos, MAXIMO_CAMPOS_FECHA), dtype=np.int64)
+    cifras = np.zeros((num_textos, MAXIMO_CAMPOS_FECHA), dtype=np.int64)
+
+    con_cifras = es_digito.any(axis=1)
+    if not con_cifras.any():
+        return valores, cifras, es_pm, es_am
+    primera = es_digito[np.argmax(con_cifras)]
+    if (es_digito[con_cifras] == primera).all():
+        # Fechas de ancho fijo: las cifras están en las mismas posiciones en todas las filas y cada
+        # número se arma columna por columna
+        bordes = np.flatnonzero(np.diff(np.concatenate(([0], primera.astype(np.int8), [0]))))
+        for campo, (desde, hasta) in enumerate(zip(bordes[0::2][:MAXIMO_CAMPOS_FECHA], bordes[1::2])):
+            for posicion in range(desde, hasta):
+                valores[:, campo] = valores[:, campo] * 10 + (caracteres[:, posicion] - ord('0'))
+            cifras[con_cifras, campo] = hasta - desde
+        valores[~con_cifras] = 0
+        return valores, cifras, es_pm, es_am
+
+    # Ancho variable: cada cifra vale 10 elevado a las cifras que le siguen en su número. Como la
+    # cuenta acumulada de cifras no decrece, la del final de cada número es la mínima entre los
+    # caracteres no numéricos que están a su derecha
+    inicios = es_digito.copy()
+    inicios[:, 1:] &= ~es_digito[:, :-1]
+    indice_campo = np.cumsum(inicios, axis=1, dtype=np.int16) - 1
+    cuenta = np.cumsum(es_digito, axis=1, dtype=np.int16)
+    cuenta_al_final = np.where(es_digito, np.int16(ancho), cuenta)
+    cuenta_al_final = np.minimum.accumulate(cuenta_al_final[:, ::-1], axis=1)[:, ::-1]
+    cuenta_al_final = np.minimum(cuenta_al_final, cuenta[:, -1:])
+    usar = es_digito & (indice_campo < MAXIMO_CAMPOS_FECHA)
+    potencias = 10.0 ** np.arange(ancho + 1)
+    aportes = (caracteres[usar] - ord('0')) * potencias[(cuenta_al_final - cuenta)[usar]]
+
+    # Se suman los aportes de cada número de cada fila de una vez
+    filas = np.broadcast_to(np.arange(num_textos)[:, np.newaxis], es_digito.shape)[usar]
+    claves = filas * MAXIMO_CAMPOS_FECHA + indice_campo[usar]
+    tamano = num_textos * MAXIMO_CAMPOS_FECHA
+    valores = np.rint(np.bincount(claves, weights=aportes, minlength=tamano)).astype(np.int64).reshape(num_textos, MAXIMO_CAMPOS_FECHA)
+    cifras = np.bincount(claves, minlength=tamano).reshape(num_textos, MAXIMO_CAMPOS_FECHA)
+    return valores, cifras, es_pm, es_am
+
+def convertir_fechas_numericas(textos):
+    """Convierte fechas como 01/03/2024 10:05:00 (día primero, o mes primero si el segundo campo pasa de 12) a datetime64[ns]."""
+    valores, cifras, es_pm, es_am = campos_numericos(textos)
+    hay_fecha = (cifras[:, :3] > 0).all(axis=1)
+    if not hay_fecha.any():
+        return np.full(len(valores), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    # El orden de los campos se decide para toda la columna: año primero si tiene cuatro cifras
+    if (cifras[hay_fecha, 0] == 4).all():
+        campos = (0, 1, 2)
+    elif valores[hay_fecha, 1].max() > 12:
+        campos = (2, 0, 1)
     else:
-        pd.DataFrame(np.column_stack(columnas_datos)).to_csv(archivo_guardar, index=False)
-
-    messagebox.showinfo("Éxito", f"Archivo guardado exitosamente en {archivo_guardar}.")
-
+        campos = (2, 1, 0)
+    anio, mes, dia = (valores[:, campo] for campo in campos)
+    anio = np.where(cifras[:, campos[0]] <= 2, anio + 2000, anio)
+    hora, minuto, segundo = valores[:, 3], valores[:, 4], valores[:, 5]
+    hora = np.where(es_pm & (hora < 12), hora + 12, np.where(es_am & (hora == 12), 0, hora))
+    fraccion_ns = valores[:, 6] * 10 ** np.clip(9 - cifras[:, 6], 0, 9)
+
+    validas = hay_fecha & (mes >= 1) & (mes <= 12) & (dia >= 1) & (dia <= 31) & (hora < 24) & (minuto < 60) & (segundo < 61)
+    meses = (anio - 1970) * 12 + mes - 1
+    dias = np.where(validas, meses, 0).astype('datetime64[M]').astype('datetime64[D]') + (dia - 1)
+    marcas = dias.astype('datetime64[ns]') + ((hora * 60 + minuto) * 60 + segundo) * 1_000_000_000 + fraccion_ns
+    marcas[~validas] = np.datetime64('NaT')
+    return marcas
+
+def convertir_marcas_tiempo(columnas):
+    """Convierte las columnas de fecha y hora de un CSV (una sola, o la fecha y la hora por separado) a datetime64[ns], o devuelve None."""
+    import pandas as pd
+    textos = [columnas[nombre] for nombre in columnas.columns if not pd.api.types.is_numeric_dtype(columnas[nombre])]
+    if not textos:
+        return None
+    texto = textos[0].astype(str)
+    if len(textos) > 1:
+        texto = texto.str.cat(textos[1].astype(str), sep=' ')
+
+    # ISO 8601, con o sin zona horaria, lo convierte pandas directamente; si no, se leen los campos
+    # numéricos. El formato se decide con las primeras filas
+    muestra = pd.to_datetime(texto.iloc[:1000], errors='coerce', format='ISO8601')
+    if muestra.notna().mean() >= 0.5:
+        marcas = pd.to_datetime(texto, errors='coerce', format='ISO8601')
+        if getattr(marcas.dt, 'tz', None) is not None:
+            marcas = marcas.dt.tz_convert(None)
+        marcas = marcas.to_numpy(dtype='datetime64[ns]')
+    else:
+        marcas = convertir_fechas_numericas(texto.to_numpy(dtype=str))
+    return marcas if not np.isnat(marcas).all() else None
+
+def intervalo_habitual(marcas):
+    """Devuelve la mediana de los intervalos positivos entre marcas ordenadas (en ns), o 0 si no hay."""
+    diferencias = np.diff(marcas)
+    diferencias = diferencias[diferencias > 0]
+    return int(np.median(diferencias)) if len(diferencias) else 0
+
+def llevar_a_grilla(relativas, valores, intervalo, paso, num_filas):
+    """Lleva una serie con marcas ordenadas (en ns desde el inicio de la grilla) a la grilla uniforme de paso dado."""
+    resultado = np.full(num_filas, np.nan)
+    if intervalo and 2 * intervalo <= paso:
+        # Serie más densa que la grilla: promedio de las muestras más cercanas a cada punto
+        puntos = np.minimum((relativas + paso // 2) // paso, num_filas - 1)
+        validos = ~np.isnan(valores)
+        sumas = np.bincount(puntos[validos], weights=valores[validos], minlength=num_filas)
+        cantidades = np.bincount(puntos[validos], minlength=num_filas)
+        np.divide(sumas, cantidades, out=resultado, where=cantidades > 0)
+        return resultado
+
+    # Los puntos de la grilla entre la muestra i (incluida) y la i+1 se interpolan con ese par; como la
+    # grilla es uniforme, el primer punto de cada tramo se calcula por división, sin búsquedas
+    primeros = -(-relativas // paso)
+    izquierda = np.repeat(np.arange(len(relativas) - 1), np.diff(primeros))
+    puntos = np.arange(primeros[0], primeros[-1])
+    desde = relativas[izquierda]
+    duracion = relativas[izquierda + 1] - desde
+    peso = (puntos * paso - desde) / duracion
+    interpolados = valores[izquierda] + peso * (valores[izquierda + 1] - valores[izquierda])
+    # A través de un hueco no se interpola: solo queda el punto que coincide con la muestra
+    hueco = (duracion > FACTOR_HUECO * intervalo) & (peso > 0)
+    resultado[puntos] = np.where(hueco, np.nan, interpolados)
+    if relativas[-1] % paso == 0:
+        resultado[relativas[-1] // paso] = valores[-1]
+    return resultado
+
+@perfilar('alineacion')
+def alinear_series(marcas_por_serie, valores_por_serie, paso_horas=None):
+    """Lleva series con marcas de tiempo propias a una grilla común y devuelve el tiempo en horas desde la primera muestra y la matriz de series, con NaN en los huecos."""
+    preparadas = []
+    for marcas, valores in zip(marcas_por_serie, valores_por_serie):
+        validas = ~np.isnat(marcas)
+        marcas = marcas[validas].astype('datetime64[ns]').view(np.int64)
+        valores = np.asarray(valores, dtype=np.float64)[validas]
+        if len(marcas) > 1 and (np.diff(marcas) < 0).any():
+            orden = np.argsort(marcas, kind='stable')
+            marcas, valores = marcas[orden], valores[orden]
+        preparadas.append((marcas, valores, intervalo_habitual(marcas)))
+
+    con_datos = [serie for serie in preparadas if len(serie[0])]
+    if not con_datos:
+        raise ValueError("Ninguna serie tiene marcas de tiempo válidas.")
+    inicio = min(marcas[0] for marcas, _, _ in con_datos)
+    fin = max(marcas[-1] for marcas, _, _ in con_datos)
+
+    # La base común usa el intervalo más corto de las series, salvo que se pida otro
+    if paso_horas is not None:
+        paso = int(round(paso_horas * NS_POR_HORA))
+    else:
+        paso = min((intervalo for _, _, intervalo in con_datos if intervalo), default=NS_POR_HORA)
+    paso = max(paso, -(-(fin - inicio) // MAXIMO_FILAS_ALINEADAS), 1)
+    num_filas = int((fin - inicio) // paso) + 1
+
+    series = np.full((num_filas, len(preparadas)), np.nan)
+    for j, (marcas, valores, intervalo) in enumerate(preparadas):
+        if len(marcas):
+            series[:, j] = llevar_a_grilla(marcas - inicio, valores, intervalo, paso, num_filas)
+    return TiempoUniforme(num_filas, paso=paso / NS_POR_HORA), series
+
+def alinear_columnas_csv(columnas_datos, paso_horas=None):
+    """Alinea por marcas de tiempo las columnas leídas de varios CSV; si a alguna le faltan, las alinea por número de fila como antes."""
+    if all(marcas is not None for marcas, _ in columnas_datos):
+        return alinear_series([marcas for marcas, _ in columnas_datos], [valores for _, valores in columnas_datos], paso_horas)
+    series = MatrizDeColumnas([valores for _, valores in columnas_datos])
+    return TiempoUniforme(len(series)), series
+
+@perfilar('lectura_csv')
+def leer_columna_csv(archivo, columna='°C'):
+    """Lee solo la columna indicada y las de fecha y hora de un archivo CSV, y devuelve las marcas de tiempo (o None) y los valores."""
+    import pandas as pd
+    df = pd.read_csv(archivo, usecols=lambda nombre: nombre == columna or es_columna_tiempo(nombre, columna))
+
+    # Verificar si la columna °C existe
+    if columna not in df.columns:
+        raise ValueError(f"no contiene una columna {columna}")
+
+    # Los valores que no son números quedan como NaN
+    valores = pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=np.float64)
+    return convertir_marcas_tiempo(df.drop(columns=columna)), valores
+
+def es_csv_exportado(archivo):
+    """Indica si el CSV fue exportado por esta aplicación, con el tiempo en la primera columna y una serie en cada una de las demás."""
+    import pandas as pd
+    columnas = pd.read_csv(archivo, nrows=0).columns
+    return len(columnas) > 1 and columnas[0] == COLUMNA_TIEMPO_CSV
+
+def leer_csv_exportado(archivo):
+    """Lee un CSV exportado por esta aplicación y devuelve su conjunto de datos y los nombres de las series."""
+    import pandas as pd
+    df = pd.read_csv(archivo)
+    tiempo = df.pop(COLUMNA_TIEMPO_CSV).to_numpy(dtype=np.float64)
+    series = np.asfortranarray(df.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64))
+    return ConjuntoDatos(tiempo, series), [str(nombre) for nombre in df.columns]
+
+def leer_columnas_csv(archivos, columna='°C', avisar_progreso=None):
+    """Lee la columna °C y las marcas de tiempo de varios archivos CSV en paralelo y reúne los errores de cada archivo."""
+    columnas_datos = []
+    nombres_archivos = []
+    errores = []
+
+    with ThreadPoolExecutor(max_workers=min(len(archivos), os.cpu_count() or 1)) as ejecutor:
+        futuros = [ejecutor.submit(leer_columna_csv, archivo, columna) for archivo in archivos]
+        # Recorrer los resultados en el orden de selección para conservar el orden de las columnas
+        for i, (archivo, futuro) in enumerate(zip(archivos, futuros)):
+            try:
+                columnas_datos.append(futuro.result())
+                nombres_archivos.append(os.path.basename(archivo))
+            except Exception as e:
+                errores.append(f"{os.path.basename(archivo)}: {e}")
+            if avisar_progreso is not None:
+                try:
+                    avisar_progreso((i + 1) / len(archivos))
+                except TareaCancelada:
+                    # No esperar a los archivos que aún no empiezan a leerse
+                    for pendiente in futuros:
+                        pendiente.cancel()
+                    raise
+
+    return columnas_datos, nombres_archivos, errores
 
 def seleccionar_y_procesar_csv():
-    """Permite seleccionar 5 archivos CSV, extrae los primeros 1000 datos de la columna °C y los guarda en un archivo .txt."""
-    archivos_csv = filedialog.askopenfilenames(filetypes=[("Archivos CSV", "*.csv")], title="Selecciona hasta 5 archivos CSV", multiple=True)
+    """Permite seleccionar archivos CSV, extrae completa la columna °C de cada uno y los guarda en un archivo .txt."""
+    archivos_csv = filedialog.askopenfilenames(filetypes=[("Archivos CSV", "*.csv")], title="Selecciona los archivos CSV", multiple=True)
     
     if not archivos_csv or len(archivos_csv) == 0:
         messagebox.showwarning("Advertencia", "No se seleccionaron archivos CSV.")
         return
 
-    # Limitar a 5 archivos
-    archivos_csv = archivos_csv[:5]
-    
-    # Para almacenar los datos extraídos
-    columnas_datos = []
-    nombres_archivos = []
-
-    for archivo in archivos_csv:
-        try:
-            # Leer el archivo CSV
-            df = pd.read_csv(archivo)
-            
-            # Verificar si la columna °C existe
-            if '°C' not in df.columns:
-                messagebox.showwarning("Advertencia", f"El archivo {archivo} no contiene una columna °C.")
-                continue
-            
-            # Extraer los primeros 1,000 datos de la columna °C
-            datos_c = df['°C'].head(1000).to_numpy()
+    ejecutar_en_segundo_plano("Leyendo archivos CSV", partial(leer_columnas_csv, list(archivos_csv)),
+                              lambda resultado: procesar_columnas_csv(*resultado), "No se pudieron leer los archivos CSV.")
 
-            # Si tiene menos de 1000 datos, rellenar con ceros
-            if len(datos_c) < 1000:
-                datos_c = np.pad(datos_c, (0, 1000 - len(datos_c)), 'constant')
-
-            columnas_datos.append(datos_c)
-            nombres_archivos.append(archivo.split("/")[-1])
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al procesar el archivo {archivo}: {e}")
-    
+def procesar_columnas_csv(columnas_datos, nombres_archivos, errores):
+    """Avisa los archivos que no se pudieron leer y guarda las columnas leídas en un archivo .txt."""
     if not columnas_datos:
-        messagebox.showwarning("Advertencia", "No se pudo procesar ningún archivo CSV.")
+        messagebox.showwarning("Advertencia", "No se pudo procesar ningún archivo CSV.\n\n" + "\n".join(errores))
         return
 
+    # Un solo aviso con todos los archivos que no se pudieron procesar
+    if errores:
+        messagebox.showwarning("Advertencia", "No se pudieron procesar algunos archivos:\n\n" + "\n".join(errores))
+
     # Combinar las columnas en un archivo TXT
     generar_archivo_txt(columnas_datos, nombres_archivos)
 
 def generar_archivo_txt(columnas_datos, nombres_archivos):
     """Genera un archivo .txt con las columnas de datos procesadas."""
-    archivo_guardar = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Archivo de texto", "*.txt")], title="Guardar archivo TXT")
+    archivo_guardar = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=TIPOS_ARCHIVO_EXPORTACION, title="Guardar archivo TXT")
     
     if  not archivo_guardar:
         messagebox.showwarning("Advertencia", "No se seleccionó ningún archivo para guardar.")
         return
     
-    # Guardar las columnas de datos en un archivo TXT
-    datos_combinados = np.column_stack(columnas_datos)
-    np.savetxt(archivo_guardar, datos_combinados, delimiter='\t', fmt='%0.1f')
-
+    # Guardar las columnas de datos en un archivo TXT; los datos faltantes se escriben como nan
+    ejecutar_en_segundo_plano("Generando archivo TXT", partial(guardar_columnas_txt, archivo_guardar, columnas_datos, nombres_archivos),
+                              lambda _: archivo_txt_generado(archivo_guardar, nombres_archivos), "No se pudo generar el archivo.")
+
+def guardar_columnas_txt(archivo_guardar, columnas_datos, nombres_archivos, avisar_progreso=None):
+    """Lleva las columnas a una base de tiempo común y las escribe en el archivo por bloques."""
+    # Los formatos de texto no guardan el tiempo: se alinean al intervalo con el que se vuelven a cargar
+    es_texto = extension_datos(archivo_guardar)[0] in ('.txt', '.csv')
+    tiempo, series = alinear_columnas_csv(columnas_datos, PASO_TIEMPO_HORAS if es_texto else None)
+    escribir_matriz_por_bloques(archivo_guardar, series, avisar_progreso, nombres_archivos, tiempo)
+
+def archivo_txt_generado(archivo_guardar, nombres_archivos):
+    """Avisa que el archivo .txt se generó y muestra los nombres y colores de los archivos."""
     messagebox.showinfo("Éxito", f"El archivo {archivo_guardar} ha sido generado exitosamente.")
     
     # Mostrar los nombres de los archivos y los colores de las gráficas
     mostrar_colores_y_nombres(nombres_archivos)
 
+def convertir_archivo_stm():
+    """Convierte en segundo plano un archivo .txt o .csv en un archivo .stm."""
+    origen = seleccionar_archivo([("Archivos de datos", "*.txt *.csv"), ("Archivos de texto", "*.txt"), ("Archivos CSV", "*.csv")])
+    if not origen:
+        messagebox.showwarning("Advertencia", "No se seleccionó ningún archivo.")
+        return
+    destino = filedialog.asksaveasfilename(defaultextension=".stm", filetypes=[("Archivo STM", "*.stm")], title="Guardar archivo STM",
+                                           initialfile=os.path.splitext(os.path.basename(origen))[0] + '.stm')
+    if not destino:
+        messagebox.showwarning("Advertencia", "No se seleccionó ningún archivo para guardar.")
+        return
+
+    ejecutar_en_segundo_plano("Convirtiendo a STM", partial(convertir_archivo_datos, origen, destino),
+                              lambda _: messagebox.showinfo("Éxito", f"El archivo {destino} ha sido generado exitosamente."),
+                              "No se pudo convertir el archivo.")
+
 def mostrar_colores_y_nombres(nombres_archivos):
     """Muestra los nombres de los archivos CSV seleccionados y sus colores asociados."""
     colores = ['blue', 'orange', 'green', 'red', 'purple']
@@ -230,7 +1249,11 @@ def cambiar_nombre_columna():
         if nuevo_nombre:
             nombres_columnas[seleccion] = nuevo_nombre
             lista_columnas['values'] = nombres_columnas  # Actualizar la lista
-            actualizar_grafica()
+            # Solo cambia la etiqueta de la línea y la leyenda; los datos no se vuelven a graficar
+            if seleccion in lineas_series:
+                lineas_series[seleccion].set_label(nuevo_nombre)
+                actualizar_leyenda()
+                canvas.draw_idle()
             guardar_nombres_json()
 
 
@@ -240,106 +1263,1063 @@ def configurar_lineas_punteadas():
     global min_punteado, max_punteado
     min_punteado = simpledialog.askfloat("Configurar Línea Punteada", "Ingrese el valor para la línea punteada mínima:", initialvalue=min_punteado)
     max_punteado = simpledialog.askfloat("Configurar Línea Punteada", "Ingrese el valor para la línea punteada máxima:", initialvalue=max_punteado)
-    if min_punteado is not None and max_punteado is not None:
-        actualizar_grafica()
+    if min_punteado is not None and max_punteado is not None and fig is not None:
+        # Solo se mueven las dos líneas punteadas y se recalcula el color; las series no se vuelven a graficar
+        actualizar_lineas_limite()
+        if lineas_series:
+            recalcular_conteos_rango()
+            actualizar_colores_cumplimiento()
+            actualizar_panel_rango()
+        actualizar_leyenda()
+        canvas.draw_idle()
+
+def configurar_ventana_evaluacion():
+    """Permite configurar las horas de inicio y fin de la ventana de evaluación."""
+    global ventana_evaluacion
+    inicio = simpledialog.askfloat("Configurar Ventana", "Ingrese la hora de inicio de la ventana de evaluación:", initialvalue=ventana_evaluacion[0])
+    fin = simpledialog.askfloat("Configurar Ventana", "Ingrese la hora de fin de la ventana de evaluación:", initialvalue=ventana_evaluacion[1])
+    if inicio is None or fin is None:
+        return
+    if fin <= inicio:
+        messagebox.showwarning("Advertencia", "La hora de fin debe ser mayor que la de inicio.")
+        return
+    ventana_evaluacion = (inicio, fin)
+    aplicar_ventana_evaluacion()
 
-def cargar_datos():
-    """Carga los datos desde un archivo .txt y actualiza la gráfica."""
-    global data, num_columnas, seleccion_columnas, nombres_columnas
+def aplicar_ventana_evaluacion():
+    """Recalcula el cumplimiento con la ventana de evaluación actual y mueve su franja en la gráfica."""
+    if fig is None:
+        return
+    actualizar_sombra_ventana()
+    if lineas_series:
+        recalcular_conteos_rango()
+        actualizar_colores_cumplimiento()
+        actualizar_leyenda()
+    canvas.draw_idle()
+
+def mostrar_metricas_excursion():
+    """Muestra en una ventana las métricas de excursión de cada serie con los límites y la ventana actuales."""
+    if not lineas_series:
+        messagebox.showwarning("Advertencia", "Primero carga datos para calcular las métricas.")
+        return
 
-    archivo = seleccionar_archivo()
+    limites = limites_actuales()
+    metricas = analisis_en_cache('metricas_excursion', lambda: calcular_metricas_excursion(conjunto_datos.tiempo, conjunto_datos.series, ventana_evaluacion, limites))
+
+    ventana = ttk.Toplevel(root)
+    ventana.title("Métricas de Excursión")
+    ttk.Label(ventana, padding="10",
+              text=f"Límites: {limites[0]:g} a {limites[1]:g} °C   Ventana: {ventana_evaluacion[0]:g} a {ventana_evaluacion[1]:g} h").pack(side=tk.TOP)
+
+    columnas = ['serie'] + list(NOMBRES_METRICAS)
+    tabla = ttk.Treeview(ventana, columns=columnas, show='headings', height=min(len(seleccion_columnas), 20))
+    tabla.heading('serie', text="Serie")
+    for clave, titulo in NOMBRES_METRICAS.items():
+        tabla.heading(clave, text=titulo)
+        tabla.column(clave, anchor=tk.E, width=150)
+    for col in seleccion_columnas:
+        valores = ['—' if np.isnan(metricas[clave][col]) else f"{metricas[clave][col]:.2f}" for clave in NOMBRES_METRICAS]
+        tabla.insert('', tk.END, values=[nombres_columnas[col]] + valores)
+    tabla.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+# Conjunto de datos: el tiempo se guarda aparte de las series y, si las filas son equiespaciadas,
+# ni siquiera se guarda (inicio + paso por fila). Las series de los .txt, del ingreso manual y del
+# seguimiento se guardan en float32 por columnas contiguas (orden Fortran), así cada serie es un
+# tramo seguido de la memoria o del caché mapeado. El mínimo y el máximo se calculan al cargar. El
+# origen identifica el archivo leído (ruta, tamaño y fecha de modificación) para el caché de
+# análisis; los datos sin archivo reciben un origen válido solo durante la sesión.
+TIPO_SERIES = np.dtype('<f4')
+ORIGEN_SESION = 'sesion:'
+contador_conjuntos = itertools.count()
+
+class TiempoUniforme:
+    """Columna de tiempo de filas equiespaciadas (inicio + paso * fila) que se calcula al pedirla en lugar de guardarse."""
+    __slots__ = ('filas', 'paso', 'inicio')
+
+    def __init__(self, filas, paso=PASO_TIEMPO_HORAS, inicio=0.0):
+        self.filas = filas
+        self.paso = paso
+        self.inicio = inicio
+
+    def __len__(self):
+        return self.filas
+
+    def __getitem__(self, indices):
+        if isinstance(indices, slice):
+            return self.inicio + np.arange(*indices.indices(self.filas)) * self.paso
+        indices = np.asarray(indices)
+        indices = np.where(indices < 0, indices + self.filas, indices)
+        return self.inicio + indices * self.paso if indices.ndim else float(self.inicio + int(indices) * self.paso)
+
+    def __array__(self, dtype=None, copy=None):
+        return self[:].astype(dtype or np.float64, copy=False)
+
+    def searchsorted(self, valor, side='left'):
+        """Devuelve la fila donde se insertaría el valor, igual que ndarray.searchsorted, sin generar la columna."""
+        posicion = (valor - self.inicio) / self.paso
+        fila = int(np.clip(np.ceil(posicion) if side == 'left' else np.floor(posicion) + 1, 0, self.filas))
+        # La división puede redondear hacia el lado equivocado: se corrige comparando con los tiempos vecinos
+        antes = (lambda t: t < valor) if side == 'left' else (lambda t: t <= valor)
+        while fila > 0 and not antes(self[fila - 1]):
+            fila -= 1
+        while fila < self.filas and antes(self[fila]):
+            fila += 1
+        return fila
+
+class ConjuntoDatos:
+    """Tiempo y series de un conjunto de datos, con el mínimo y el máximo de las series calculados una sola vez."""
+    __slots__ = ('tiempo', 'series', 'minimo', 'maximo', 'origen')
+
+    def __init__(self, tiempo, series, minimo=None, maximo=None, origen=None):
+        self.tiempo = tiempo
+        self.series = series
+        if minimo is None:
+            minimo, maximo = extremos_series(series)
+        self.minimo = minimo
+        self.maximo = maximo
+        self.origen = origen if origen is not None else f"{ORIGEN_SESION}{os.getpid()}:{next(contador_conjuntos)}"
+
+    def __len__(self):
+        return len(self.series)
+
+def extremos_series(series):
+    """Devuelve el mínimo y el máximo de todas las series sin contar los datos faltantes (NaN si no hay ninguno)."""
+    if not series.size:
+        return np.nan, np.nan
+    # fmin y fmax ignoran los NaN sin copiar las series ni avisar si una está vacía
+    return float(np.fmin.reduce(series, axis=None)), float(np.fmax.reduce(series, axis=None))
+
+def conjunto_de_archivo_stm(archivo):
+    """Devuelve el conjunto de datos de un archivo .stm abierto, con los extremos tomados de su índice."""
+    with np.errstate(all='ignore'):
+        minimo, maximo = np.fmin.reduce(archivo['minimos'], axis=None), np.fmax.reduce(archivo['maximos'], axis=None)
+    return ConjuntoDatos(archivo['tiempo'], archivo['series_datos'], float(minimo), float(maximo), huella_archivo(archivo['ruta']))
+
+def huella_archivo(ruta):
+    """Devuelve la huella de un archivo a partir de su ruta, tamaño y fecha de modificación, sin leer su contenido."""
+    ruta = os.path.abspath(ruta)
+    info = os.stat(ruta)
+    return hashlib.sha1(f"{ruta}|{info.st_size}|{info.st_mtime_ns}".encode()).hexdigest()
+
+# Lectura rápida de archivos .txt: el texto se convierte por bloques y el resultado se guarda
+# en un caché binario (.npy) en la carpeta de caché del usuario, con cada serie seguida en
+# float32; las carpetas de datos (a menudo compartidas, sincronizadas o de solo lectura) no se
+# tocan. Al volver a abrirlo sin cambios, el caché se abre como memoria mapeada y los datos se
+# leen del disco solo cuando se usan. La carpeta está acotada en tamaño: al pasarse se borran
+# los cachés menos usados.
+TAMANO_BLOQUE_LECTURA = 16 * 1024 * 1024  # Bytes de texto que se convierten por vez
+CARPETA_CACHE_USUARIO = os.path.join(os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                                     'StableTempMonitor')
+CARPETA_CACHE = os.path.join(CARPETA_CACHE_USUARIO, 'datos')
+MAXIMO_BYTES_CACHE_DATOS = 4 * 1024 * 1024 * 1024
+VERSION_CACHE = 2  # Cambia si cambia el contenido del caché, para no abrir cachés viejos
+
+def ruta_cache_datos(archivo):
+    """Devuelve la ruta del caché binario de un archivo según su ruta, tamaño y fecha de modificación."""
+    ruta = os.path.abspath(archivo)
+    info = os.stat(ruta)
+    clave = hashlib.sha1(f"{ruta}|{info.st_size}|{info.st_mtime_ns}|{VERSION_CACHE}".encode()).hexdigest()[:16]
+    # La carpeta es de todos los archivos: el prefijo distingue a los del mismo nombre en carpetas distintas
+    prefijo = f"{os.path.basename(ruta)}.{hashlib.sha1(ruta.encode()).hexdigest()[:8]}"
+    return os.path.join(CARPETA_CACHE, f"{prefijo}.{clave}.npy")
+
+def recortar_carpeta_cache(carpeta, maximo_bytes, extension, conservar=None):
+    """Borra de la carpeta los archivos con la extensión dada menos usados hasta que su total no pase del máximo."""
+    entradas = []
+    for nombre in os.listdir(carpeta):
+        ruta = os.path.join(carpeta, nombre)
+        if nombre.endswith(extension) and ruta != conservar:
+            try:
+                info = os.stat(ruta)
+            except OSError:
+                continue  # Otro proceso acaba de borrarlo
+            entradas.append((info.st_mtime_ns, info.st_size, ruta))
+    total = sum(tamano for _, tamano, _ in entradas) + (os.path.getsize(conservar) if conservar else 0)
+    for _, tamano, ruta in sorted(entradas):
+        if total <= maximo_bytes:
+            break
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue  # En Windows no se puede borrar un caché abierto
+        total -= tamano
+
+@perfilar('conversion_txt')
+def convertir_bloque_txt(texto):
+    """Convierte un bloque de líneas completas delimitadas por tabulaciones en una matriz."""
+    return np.loadtxt(io.BytesIO(texto), delimiter='\t', ndmin=2)
+
+def iterar_bloques_txt(archivo, avisar_progreso=None):
+    """Recorre un archivo .txt (o .txt.gz, .txt.zst) por bloques de texto y entrega cada bloque ya convertido a matriz."""
+    resto = b''
+    _, compresion = extension_datos(archivo)
+    with open(archivo, 'rb') as crudo, (abrir_comprimido(crudo, compresion, 'rb') if compresion else crudo) as f:
+        tamano = max(os.fstat(crudo.fileno()).st_size, 1)
+        while True:
+            with FasePerfilada('lectura_archivo'):
+                texto = f.read(TAMANO_BLOQUE_LECTURA)
+            if not texto:
+                break
+            if avisar_progreso is not None:
+                # El avance se mide sobre los bytes leídos del disco, aunque estén comprimidos
+                avisar_progreso(min(crudo.tell() / tamano, 1.0))
+            texto = resto + texto
+            # Convertir solo hasta la última línea completa; lo demás pasa al siguiente bloque
+            corte = texto.rfind(b'\n') + 1
+            resto = texto[corte:]
+            if corte:
+                yield convertir_bloque_txt(texto[:corte])
+    if resto.strip():
+        yield convertir_bloque_txt(resto)
+
+@perfilar('escribir_cache')
+def escribir_cache_txt(archivo, ruta_cache, avisar_progreso=None):
+    """Convierte el .txt directamente al archivo del caché, con un solo bloque de texto en memoria a la vez."""
+    carpeta = os.path.dirname(ruta_cache)
+    os.makedirs(carpeta, exist_ok=True)
+    prefijo = os.path.basename(ruta_cache).rsplit('.', 2)[0]
+    for anterior in glob.glob(os.path.join(glob.escape(carpeta), glob.escape(prefijo) + '.' + '?' * 16 + '.npy')):
+        os.remove(anterior)
+
+    # Cada serie se acumula en su propio temporal y al final se copian una tras otra, que es el
+    # orden por columnas del caché; así no hace falta saber de antemano cuántas filas hay
+    temporal = ruta_cache + '.tmp'
+    columnas = []
+    num_filas = 0
+    try:
+        for bloque in iterar_bloques_txt(archivo, avisar_progreso):
+            if not len(bloque):
+                continue
+            if not columnas:
+                columnas = [tempfile.TemporaryFile(dir=carpeta) for _ in range(bloque.shape[1])]
+            elif bloque.shape[1] != len(columnas):
+                raise ValueError("Las filas del archivo no tienen el mismo número de columnas.")
+            bloque = bloque.astype(TIPO_SERIES, order='F')
+            for j, columna in enumerate(columnas):
+                columna.write(bloque[:, j].tobytes())
+            num_filas += len(bloque)
+        if not num_filas:
+            raise ValueError("El archivo no contiene datos.")
+
+        # Se escribe primero a un temporal para no dejar un caché a medio escribir
+        with open(temporal, 'wb') as f:
+            np.lib.format.write_array_header_1_0(f, {'descr': TIPO_SERIES.str, 'fortran_order': True, 'shape': (num_filas, len(columnas))})
+            for columna in columnas:
+                columna.seek(0)
+                shutil.copyfileobj(columna, f, TAMANO_BLOQUE_LECTURA)
+        os.replace(temporal, ruta_cache)
+    finally:
+        for columna in columnas:
+            columna.close()
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+def leer_txt_en_memoria(archivo, avisar_progreso=None):
+    """Lee un archivo .txt completo a memoria, sin caché, con las series en columnas contiguas de float32."""
+    bloques = [bloque.astype(TIPO_SERIES) for bloque in iterar_bloques_txt(archivo, avisar_progreso)]
+    num_filas = sum(len(bloque) for bloque in bloques)
+    if not num_filas:
+        raise ValueError("El archivo no contiene datos.")
+    series = np.empty((num_filas, bloques[0].shape[1]), dtype=TIPO_SERIES, order='F')
+    fila = 0
+    for bloque in bloques:
+        series[fila:fila + len(bloque)] = bloque
+        fila += len(bloque)
+    return series
+
+def leer_datos_txt(archivo, usar_cache=True, avisar_progreso=None):
+    """Lee un archivo .txt de datos y devuelve su conjunto de datos, con el tiempo implícito según el número de fila."""
+    origen = huella_archivo(archivo)
+    if not usar_cache:
+        series = leer_txt_en_memoria(archivo, avisar_progreso)
+    else:
+        ruta_cache = ruta_cache_datos(archivo)
+        try:
+            if os.path.exists(ruta_cache):
+                os.utime(ruta_cache)  # Recién usado: es el último que se borra al recortar la carpeta
+            else:
+                escribir_cache_txt(archivo, ruta_cache, avisar_progreso)
+                recortar_carpeta_cache(CARPETA_CACHE, MAXIMO_BYTES_CACHE_DATOS, '.npy', conservar=ruta_cache)
+            series = np.load(ruta_cache, mmap_mode='r')
+        except OSError:
+            # Sin permiso de escritura: se lee todo a memoria sin caché
+            series = leer_txt_en_memoria(archivo, avisar_progreso)
+    return ConjuntoDatos(TiempoUniforme(len(series)), series, origen=origen)
+
+def leer_archivo_binario(ruta):
+    """Abre un .npy (como memoria mapeada) o un .npz exportado y devuelve su conjunto de datos y los nombres de las series."""
+    origen = huella_archivo(ruta)
+    if extension_datos(ruta)[0] == '.npz':
+        with np.load(ruta) as contenido:
+            datos = contenido['datos']
+            nombres = [str(nombre) for nombre in contenido['nombres']] if 'nombres' in contenido.files else None
+    else:
+        datos = np.load(ruta, mmap_mode='r')
+        nombres = None
+    if datos.ndim != 2 or datos.shape[1] < 2:
+        raise ValueError("El archivo no tiene una columna de tiempo y al menos una serie.")
+    if isinstance(datos, np.memmap):
+        # Mapeado: las series se usan tal como están en el disco, sin copiarlas
+        tiempo, series = datos[:, 0], datos[:, 1:]
+    else:
+        # Ya está en memoria: se reordena para que cada serie quede contigua
+        tiempo, series = datos[:, 0].copy(), np.asfortranarray(datos[:, 1:])
+    return ConjuntoDatos(tiempo, series, origen=origen), nombres or [f"Serie {i+1}" for i in range(datos.shape[1] - 1)]
+
+def cargar_datos():
+    """Carga los datos desde un archivo .txt, .stm, .npy o .npz en segundo plano y actualiza la gráfica al terminar."""
+    archivo = seleccionar_archivo([("Archivos de datos", "*.txt *.stm *.npy *.npz *.gz *.zst"), ("Archivos de texto", "*.txt *.txt.gz *.txt.zst"),
+                                   ("Archivo STM", "*.stm"), ("Arreglos NumPy", "*.npy *.npz")])
     
     if archivo:
-        try:
-            # Leer todos los datos del archivo .txt sin excluir la primera columna
-            datos = np.loadtxt(archivo, delimiter='\t')
-            
-            # Generar una columna de tiempo en función del número de filas
-            tiempos_generados = np.arange(0, len(datos) * 0.08, 0.08)  # Ajusta el rango y el incremento según sea necesario
-            
-            # Combinar la columna de tiempos con los datos
-            data = np.column_stack((tiempos_generados, datos))
-            
-            # Asegurarse de que todas las columnas se seleccionen
-            num_columnas = datos.shape[1]  # Cambia aquí para que se detecten todas las columnas
-            seleccion_columnas = list(range(num_columnas))
-            nombres_columnas = [f"Serie {i+1}" for i in range(num_columnas)]
-            
-            # Actualizar la lista de columnas en el combobox
-            lista_columnas['values'] = nombres_columnas
-            
-            # Llamar a la función para actualizar la gráfica
-            actualizar_grafica()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo leer el archivo. Error: {e}")
+        extension, _ = extension_datos(archivo)
+        if extension == '.stm':
+            # Solo se lee el índice; los datos quedan mapeados y se leen por bloques al dibujar
+            trabajo = lambda avisar_progreso: abrir_archivo_stm(archivo)
+        elif extension in ('.npy', '.npz'):
+            trabajo = lambda avisar_progreso: leer_archivo_binario(archivo)
+        else:
+            trabajo = partial(leer_datos_txt, archivo)
+        ejecutar_en_segundo_plano("Cargando datos", partial(leer_y_preparar, trabajo, *parametros_analisis()),
+                                  mostrar_datos_cargados, "No se pudo leer el archivo.")
     else:
         messagebox.showwarning("Advertencia", "No se seleccionó ningún archivo.")
-def actualizar_grafica():
-    """Actualiza la gráfica con los datos cargados y la configuración actual."""
-    global canvas, fig, ax
 
-    if canvas:
-        canvas.get_tk_widget().destroy()
+def leer_y_preparar(leer, limites, ventana, avisar_progreso):
+    """Lee los datos con leer (un conjunto de datos, solo o con sus nombres, o un archivo .stm abierto) y prepara su análisis, todo en el hilo de tareas."""
+    resultado = leer(avisar_progreso)
+    archivo = resultado if isinstance(resultado, dict) else None
+    nombres = None
+    if archivo is not None:
+        conjunto, nombres = conjunto_de_archivo_stm(archivo), archivo['nombres']
+    elif isinstance(resultado, tuple):
+        conjunto, nombres = resultado
+    else:
+        conjunto = resultado
+    return conjunto, nombres, archivo, preparar_analisis_grafica(conjunto, archivo, limites, ventana)
+
+def mostrar_datos_cargados(resultado):
+    """Reemplaza los datos actuales por los recién leídos y preparados en segundo plano y actualiza la gráfica."""
+    global conjunto_datos, num_columnas, seleccion_columnas, nombres_columnas, archivo_stm
+    conjunto_datos, nombres, archivo_stm, preparado = resultado
+
+    # Asegurarse de que todas las columnas se seleccionen
+    num_columnas = conjunto_datos.series.shape[1]  # Cambia aquí para que se detecten todas las columnas
+    seleccion_columnas = list(range(num_columnas))
+    if nombres is not None:
+        nombres_columnas = list(nombres)
+    else:
+        nombres_columnas = [f"Serie {i+1}" for i in range(num_columnas)]
+
+    # Actualizar la lista de columnas en el combobox
+    lista_columnas['values'] = nombres_columnas
+
+    # Llamar a la función para actualizar la gráfica
+    detener_seguimiento()
+    actualizar_grafica(preparado)
+
+# Seguimiento en vivo: el archivo de un registrador que sigue escribiendo se vuelve a leer
+# desde la última posición leída y solo las filas nuevas se agregan a la gráfica.
+INTERVALO_SEGUIMIENTO_MS = 2000
+
+def leer_filas_nuevas(archivo, posicion, resto):
+    """Lee el archivo desde la posición dada y devuelve las filas completas nuevas, la nueva posición y la línea parcial."""
+    bloques = []
+    with open(archivo, 'rb') as f:
+        f.seek(posicion)
+        while True:
+            texto = f.read(TAMANO_BLOQUE_LECTURA)
+            if not texto:
+                break
+            posicion += len(texto)
+            texto = resto + texto
+            # La última línea puede estar a medio escribir: se guarda hasta la próxima lectura
+            corte = texto.rfind(b'\n') + 1
+            resto = texto[corte:]
+            if texto[:corte].strip():
+                bloques.append(convertir_bloque_txt(texto[:corte]))
+    return bloques, posicion, resto
+
+def agregar_bloques(conjunto, bloques):
+    """Devuelve un conjunto de datos con las filas de los bloques agregadas al final, reservando espacio para crecer sin copiar todo."""
+    for bloque in bloques:
+        if conjunto is not None and bloque.shape[1] != conjunto.series.shape[1]:
+            raise ValueError(f"Las filas nuevas tienen {bloque.shape[1]} columnas y se esperaban {conjunto.series.shape[1]}.")
+        if conjunto is None:
+            conjunto = ConjuntoDatos(TiempoUniforme(0), np.empty((0, bloque.shape[1]), dtype=TIPO_SERIES, order='F'))
+        series = extender_arreglo(conjunto.series, len(conjunto), bloque)
+        # Los extremos se actualizan solo con las filas nuevas
+        minimo, maximo = extremos_series(series[len(conjunto):])
+        conjunto = ConjuntoDatos(TiempoUniforme(len(series)), series, np.fmin(conjunto.minimo, minimo), np.fmax(conjunto.maximo, maximo))
+    return conjunto
+
+def alternar_seguimiento():
+    """Empieza a seguir un archivo .txt que sigue creciendo, o detiene el seguimiento en curso."""
+    if archivo_seguido is not None:
+        if messagebox.askyesno("Seguimiento", f"¿Dejar de seguir {os.path.basename(archivo_seguido)}?"):
+            detener_seguimiento()
+        return
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    archivo = seleccionar_archivo()
+    if not archivo:
+        messagebox.showwarning("Advertencia", "No se seleccionó ningún archivo.")
+        return
+    iniciar_seguimiento(archivo)
+
+def leer_inicio_seguimiento(archivo, limites, ventana, avisar_progreso):
+    """Lee el archivo seguido completo y prepara su análisis en el hilo de tareas."""
+    bloques, posicion, resto = leer_filas_nuevas(archivo, 0, b'')
+    if not bloques:
+        raise ValueError("El archivo no contiene filas completas.")
+    # Los datos viven en un búfer con espacio de sobra; no se usa la caché porque el archivo cambia
+    conjunto = agregar_bloques(None, bloques)
+    return conjunto, posicion, resto, preparar_analisis_grafica(conjunto, None, limites, ventana)
+
+def iniciar_seguimiento(archivo):
+    """Carga el archivo completo en segundo plano; al terminar lo grafica y programa las lecturas de las filas nuevas."""
+    detener_seguimiento()
+    return ejecutar_en_segundo_plano("Cargando archivo seguido", partial(leer_inicio_seguimiento, archivo, *parametros_analisis()),
+                                     partial(mostrar_inicio_seguimiento, archivo), "No se pudo leer el archivo.")
+
+def mostrar_inicio_seguimiento(archivo, resultado):
+    """Grafica el archivo seguido recién leído y programa las lecturas periódicas de las filas nuevas."""
+    global conjunto_datos, num_columnas, seleccion_columnas, nombres_columnas, archivo_stm
+    global archivo_seguido, posicion_seguimiento, resto_seguimiento, id_seguimiento
+
+    detener_seguimiento()
+    conjunto_datos, posicion, resto, preparado = resultado
+    archivo_stm = None
+    num_columnas = conjunto_datos.series.shape[1]
+    seleccion_columnas = list(range(num_columnas))
+    nombres_columnas = [f"Serie {i+1}" for i in range(num_columnas)]
+    lista_columnas['values'] = nombres_columnas
+    actualizar_grafica(preparado)
+
+    archivo_seguido, posicion_seguimiento, resto_seguimiento = archivo, posicion, resto
+    id_seguimiento = root.after(INTERVALO_SEGUIMIENTO_MS, actualizar_seguimiento)
+
+def detener_seguimiento():
+    """Cancela la próxima lectura programada del archivo seguido."""
+    global archivo_seguido, id_seguimiento
+    if id_seguimiento is not None:
+        root.after_cancel(id_seguimiento)
+    archivo_seguido = None
+    id_seguimiento = None
+
+def actualizar_seguimiento():
+    """Lee las filas agregadas al archivo seguido y las suma a la gráfica sin volver a leer lo anterior."""
+    global conjunto_datos, posicion_seguimiento, resto_seguimiento, id_seguimiento
+    id_seguimiento = None
+    try:
+        if os.path.getsize(archivo_seguido) < posicion_seguimiento:
+            # El archivo se truncó o se reemplazó: se vuelve a cargar desde el comienzo, en cuanto
+            # el hilo de tareas quede libre
+            if tarea_en_curso is None:
+                iniciar_seguimiento(archivo_seguido)
+            else:
+                id_seguimiento = root.after(INTERVALO_SEGUIMIENTO_MS, actualizar_seguimiento)
+            return
+        bloques, posicion_seguimiento, resto_seguimiento = leer_filas_nuevas(archivo_seguido, posicion_seguimiento, resto_seguimiento)
+        filas_anteriores = len(conjunto_datos)
+        conjunto_datos = agregar_bloques(conjunto_datos, bloques)
+    except Exception as e:
+        archivo = archivo_seguido
+        detener_seguimiento()
+        messagebox.showerror("Error", f"Se detuvo el seguimiento de {archivo}. Error: {e}")
+        return
 
-    # Definir colores fijos
-    colores = ['blue', 'orange', 'red', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
+    if len(conjunto_datos) > filas_anteriores:
+        agregar_filas_a_grafica(filas_anteriores)
+    id_seguimiento = root.after(INTERVALO_SEGUIMIENTO_MS, actualizar_seguimiento)
+
+def agregar_filas_a_grafica(filas_anteriores):
+    """Extiende las líneas y los conteos en rango con las filas nuevas, sin recorrer las anteriores."""
+    global conteos_rango
+
+    tiempo, series = conjunto_datos.tiempo, conjunto_datos.series
+    for col in seleccion_columnas:
+        extender_piramide_minmax(piramides_lod[col], series[:, col], filas_anteriores)
+    extender_indice_rango(indice_rango, series, filas_anteriores)
+
+    # Sumar a los conteos acumulados solo las muestras nuevas
+    validos, en_rango = contar_en_rango(tiempo[filas_anteriores:], series[filas_anteriores:], ventana_evaluacion, limites_actuales())
+    conteos_rango = (conteos_rango[0] + validos, conteos_rango[1] + en_rango)
+    actualizar_colores_cumplimiento()
+
+    # Si el usuario no ha hecho zoom, la vista se amplía para mostrar las filas nuevas
+    if ax.get_autoscaley_on():
+        nuevas = series[filas_anteriores:, seleccion_columnas]
+        if np.isfinite(nuevas).any():
+            y0, y1 = ax.get_ylim()
+            ax.set_ylim(min(y0, np.nanmin(nuevas)), max(y1, np.nanmax(nuevas)), auto=None)
+    if ax.get_autoscalex_on():
+        ax.set_xlim(ax.get_xlim()[0], max(ax.get_xlim()[1], tiempo[-1]), auto=None)  # Dispara actualizar_nivel_detalle
+    else:
+        actualizar_nivel_detalle()
+        actualizar_panel_rango()
+    actualizar_leyenda()
+    solicitar_redibujo()
+
+# Evaluación de estabilidad: no depende de la interfaz para poder usarse desde la línea de
+# comandos. Se mide la fracción de muestras entre 2 y 8 °C en la ventana de 2 a 48 horas; una
+# serie cumple si esa fracción es de al menos 95 %.
+VENTANA_EVALUACION = (2, 48)  # Horas
+LIMITES_TEMPERATURA = (2, 8)  # °C
+UMBRAL_CUMPLIMIENTO = 0.95
+
+@perfilar('estadisticas_rango')
+def contar_en_rango(tiempo, series, ventana=VENTANA_EVALUACION, limites=LIMITES_TEMPERATURA):
+    """Devuelve, para cada columna de series, cuántas muestras válidas y cuántas en rango hay en la ventana."""
+    # El tiempo está ordenado: la ventana es un tramo contiguo y no hace falta copiar los datos
+    i0 = tiempo.searchsorted(ventana[0], side='left')
+    i1 = tiempo.searchsorted(ventana[1], side='right')
+    tramo = series[i0:i1]
+
+    # Los datos faltantes (NaN) no cuentan en el total
+    validos = np.sum(~np.isnan(tramo), axis=0)
+    en_rango = np.sum((tramo >= limites[0]) & (tramo <= limites[1]), axis=0)
+    return validos, en_rango
+
+def porcentaje_desde_conteos(validos, en_rango):
+    """Convierte los conteos de muestras en la fracción en rango; NaN si la serie no tiene muestras."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(validos > 0, en_rango / np.maximum(validos, 1), np.nan)
+
+def calcular_porcentaje_en_rango(tiempo, series, ventana=VENTANA_EVALUACION, limites=LIMITES_TEMPERATURA):
+    """Devuelve, para cada columna de series, la fracción de muestras dentro de los límites en la ventana."""
+    return porcentaje_desde_conteos(*contar_en_rango(tiempo, series, ventana, limites))
+
+# Métricas de excursión: se calculan para todas las series en una sola pasada por bloques de
+# filas. Cada muestra representa el intervalo hasta la siguiente; la última usa el intervalo
+# anterior. La temperatura cinética media (TCM) usa ΔH/R = 10000 K (ΔH = 83.144 kJ/mol).
+# Los datos faltantes (NaN) no cortan una excursión: conservan el estado de la última muestra
+# válida, pero su tiempo no se suma a la duración de la excursión, igual que en el tiempo fuera
+# de límites. Antes de la primera muestra válida la serie se considera dentro de los límites.
+ENERGIA_ACTIVACION_SOBRE_R = 10000.0  # K
+FILAS_POR_BLOQUE_METRICAS = 65536
+NOMBRES_METRICAS = {
+    'tcm': "Temperatura cinética media (°C)",
+    'horas_sobre_maximo': "Tiempo sobre el máximo (h)",
+    'horas_bajo_minimo': "Tiempo bajo el mínimo (h)",
+    'num_excursiones': "Excursiones",
+    'excursion_mas_larga_h': "Excursión más larga (h)",
+    'horas_hasta_primera_excursion': "Tiempo hasta la primera excursión (h)",
+}
+
+def bordes_de_tramos(mascara, anterior):
+    """Devuelve filas y columnas de los cambios de la máscara y si cada cambio inicia un tramo."""
+    cambios = np.empty_like(mascara)
+    np.not_equal(mascara[:1], anterior, out=cambios[:1])
+    np.not_equal(mascara[1:], mascara[:-1], out=cambios[1:])
+    posiciones = np.flatnonzero(cambios)
+    filas, cols = np.divmod(posiciones, mascara.shape[1])
+    return filas, cols, mascara.ravel()[posiciones]
+
+def arrastrar_estado(estado, validos, anterior):
+    """Da a cada fila sin dato el estado de la última fila válida, o el de antes del bloque si aún no hay ninguna."""
+    ultima = np.where(validos, np.arange(len(estado))[:, np.newaxis], -1)
+    np.maximum.accumulate(ultima, axis=0, out=ultima)
+    arrastrado = np.take_along_axis(estado, np.maximum(ultima, 0), axis=0)
+    return np.where(ultima >= 0, arrastrado, anterior)
+
+def emparejar_tramos(filas, cols, es_inicio, instantes, instantes_finales, num_series):
+    """Ordena por serie los inicios y fines de tramos con el instante de cada borde, cerrando en instantes_finales los que quedaron abiertos."""
+    cols_inicio, filas_inicio, instantes_inicio = cols[es_inicio], filas[es_inicio], instantes[es_inicio]
+    cols_fin, instantes_fin = cols[~es_inicio], instantes[~es_inicio]
+
+    # Los tramos sin fin terminan en la última fila: hay un fin por cada inicio sobrante
+    abiertos = np.bincount(cols_inicio, minlength=num_series) - np.bincount(cols_fin, minlength=num_series)
+    cols_abiertas = np.repeat(np.arange(num_series), abiertos)
+    instantes_fin = np.concatenate((instantes_fin, instantes_finales[cols_abiertas]))
+    cols_fin = np.concatenate((cols_fin, cols_abiertas))
+
+    # Orden estable por columna: dentro de cada serie los tramos quedan en orden temporal
+    orden_inicio = np.argsort(cols_inicio, kind='stable')
+    orden_fin = np.argsort(cols_fin, kind='stable')
+    return cols_inicio[orden_inicio], filas_inicio[orden_inicio], instantes_inicio[orden_inicio], instantes_fin[orden_fin]
+
+@perfilar('metricas_excursion')
+def calcular_metricas_excursion(tiempo, series, ventana=VENTANA_EVALUACION, limites=LIMITES_TEMPERATURA):
+    """Calcula TCM, tiempo fuera de límites, excursiones y primera excursión de todas las series a la vez."""
+    i0 = tiempo.searchsorted(ventana[0], side='left')
+    i1 = tiempo.searchsorted(ventana[1], side='right')
+    tiempo = np.asarray(tiempo[i0:i1], dtype=np.float64)
+    series = series[i0:i1]
+    num_filas, num_series = series.shape
+
+    metricas = {clave: np.full(num_series, np.nan) for clave in NOMBRES_METRICAS}
+    if num_filas == 0:
+        return metricas
+
+    # bordes[i] es el inicio del intervalo de la muestra i; bordes[num_filas] el fin de la última
+    paso_final = tiempo[-1] - tiempo[-2] if num_filas > 1 else 0.0
+    bordes = np.append(tiempo, tiempo[-1] + paso_final)
+    duraciones = np.diff(bordes).astype(np.float32)
+
+    # Las exponenciales se calculan en float32 relativas a 5 °C para mantenerlas cerca de 1
+    h = np.float32(ENERGIA_ACTIVACION_SOBRE_R)
+    referencia = np.float32(ENERGIA_ACTIVACION_SOBRE_R / 278.15)
+    suma_exponencial = np.zeros(num_series)
+    suma_duraciones = np.zeros(num_series)
+    horas_sobre = np.zeros(num_series)
+    horas_bajo = np.zeros(num_series)
+    horas_sin_datos = np.zeros(num_series)
+    cambios = []
+    anterior = np.zeros((1, num_series), dtype=bool)
+
+    for inicio in range(0, num_filas, FILAS_POR_BLOQUE_METRICAS):
+        bloque = np.asarray(series[inicio:inicio + FILAS_POR_BLOQUE_METRICAS], dtype=np.float32)
+        pesos = duraciones[inicio:inicio + FILAS_POR_BLOQUE_METRICAS]
+
+        # Suma ponderada por tiempo de exp(-ΔH/RT) como producto matriz-vector
+        exponencial = np.exp(referencia - h / (bloque + np.float32(273.15)))
+        parcial = pesos @ exponencial
+        duracion_valida = np.full(num_series, pesos.sum(dtype=np.float64))
+        con_faltantes = np.isnan(parcial)
+        if con_faltantes.any():
+            # Solo las series con datos faltantes se recalculan sin los NaN
+            validos = ~np.isnan(bloque[:, con_faltantes])
+            parcial[con_faltantes] = pesos @ np.where(validos, exponencial[:, con_faltantes], 0)
+            duracion_valida[con_faltantes] = pesos @ validos
+        suma_exponencial += parcial
+        suma_duraciones += duracion_valida
+
+        sobre = bloque > limites[1]
+        bajo = bloque < limites[0]
+        horas_sobre += pesos @ sobre
+        horas_bajo += pesos @ bajo
+
+        fuera = sobre | bajo
+        if con_faltantes.any():
+            fuera[:, con_faltantes] = arrastrar_estado(fuera[:, con_faltantes], validos, anterior[:, con_faltantes])
+        filas, cols, es_inicio = bordes_de_tramos(fuera, anterior)
+
+        # Cada borde se ubica en el tiempo con datos: se le resta el tiempo sin datos anterior de su serie
+        sin_datos_previo = horas_sin_datos[cols]
+        if con_faltantes.any():
+            acumulado = np.zeros((len(bloque) + 1, validos.shape[1]))
+            np.cumsum(pesos[:, np.newaxis] * ~validos, axis=0, out=acumulado[1:])
+            columna_faltante = np.full(num_series, -1)
+            columna_faltante[con_faltantes] = np.arange(validos.shape[1])
+            con_hueco = columna_faltante[cols] >= 0
+            sin_datos_previo[con_hueco] += acumulado[filas[con_hueco], columna_faltante[cols[con_hueco]]]
+            horas_sin_datos[con_faltantes] += acumulado[-1]
+        cambios.append((filas + inicio, cols, es_inicio, bordes[filas + inicio] - sin_datos_previo))
+        anterior = fuera[-1:]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metricas['tcm'] = ENERGIA_ACTIVACION_SOBRE_R / (ENERGIA_ACTIVACION_SOBRE_R / 278.15 - np.log(suma_exponencial / suma_duraciones)) - 273.15
+    metricas['horas_sobre_maximo'] = horas_sobre
+    metricas['horas_bajo_minimo'] = horas_bajo
+
+    filas, cols, es_inicio, instantes = (np.concatenate(partes) for partes in zip(*cambios))
+    cols, filas_inicio, instantes_inicio, instantes_fin = emparejar_tramos(filas, cols, es_inicio, instantes, bordes[-1] - horas_sin_datos, num_series)
+    duracion = instantes_fin - instantes_inicio
+    metricas['num_excursiones'] = np.bincount(cols, minlength=num_series).astype(np.float64)
+    mas_larga = np.zeros(num_series)
+    np.maximum.at(mas_larga, cols, duracion)
+    metricas['excursion_mas_larga_h'] = mas_larga
+    # Como los tramos están ordenados por tiempo, el primero de cada serie es la primera excursión
+    series_con_excursion, primera = np.unique(cols, return_index=True)
+    metricas['horas_hasta_primera_excursion'][series_con_excursion] = bordes[filas_inicio[primera]] - bordes[0]
+
+    # Series sin ningún dato válido en la ventana
+    sin_datos = suma_duraciones == 0
+    for clave in metricas:
+        metricas[clave][sin_datos] = np.nan
+    return metricas
+
+def leer_archivo_datos(ruta, usar_cache=True):
+    """Lee un archivo .txt, .csv, .stm, .npy o .npz y devuelve su conjunto de datos y los nombres de las series."""
+    extension, _ = extension_datos(ruta)
+    if extension == '.stm':
+        archivo = abrir_archivo_stm(ruta)
+        return conjunto_de_archivo_stm(archivo), archivo['nombres']
+    if extension in ('.npy', '.npz'):
+        return leer_archivo_binario(ruta)
+    if extension == '.csv':
+        if es_csv_exportado(ruta):
+            return leer_csv_exportado(ruta)
+        marcas, serie = leer_columna_csv(ruta)
+        if marcas is not None:
+            tiempo, series = alinear_series([marcas], [serie])
+            return ConjuntoDatos(tiempo, series), [os.path.basename(ruta)]
+        return ConjuntoDatos(TiempoUniforme(len(serie)), serie[:, np.newaxis]), [os.path.basename(ruta)]
+    conjunto = leer_datos_txt(ruta, usar_cache=usar_cache)
+    return conjunto, [f"Serie {i+1}" for i in range(conjunto.series.shape[1])]
+
+def evaluar_archivo(ruta, ventana=VENTANA_EVALUACION, limites=LIMITES_TEMPERATURA, umbral=UMBRAL_CUMPLIMIENTO, usar_cache=True):
+    """Evalúa la estabilidad de todas las series de un archivo y devuelve una fila de reporte por serie."""
+    inicio = time.perf_counter()
+    try:
+        if ruta.lower().endswith('.stm'):
+            archivo = abrir_archivo_stm(ruta)
+            num_muestras, nombres = archivo['filas'], archivo['nombres']
+        else:
+            conjunto, nombres = leer_archivo_datos(ruta, usar_cache=usar_cache)
+            num_muestras = len(conjunto)
+    except Exception as e:
+        return [{'archivo': ruta, 'serie': '', 'muestras': 0, 'porcentaje_en_rango': '', 'cumple': False,
+                 'tiempo_lectura_s': round(time.perf_counter() - inicio, 6), 'tiempo_calculo_s': 0, 'error': str(e)}]
+    tiempo_lectura = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    if ruta.lower().endswith('.stm'):
+        # El índice del archivo evita leer los bloques que ya se sabe que están dentro o fuera de los límites
+        porcentajes = porcentaje_desde_conteos(*contar_en_rango_archivo(archivo, ventana, limites))
+    else:
+        porcentajes = calcular_porcentaje_en_rango(conjunto.tiempo, conjunto.series, ventana, limites)
+    tiempo_calculo = time.perf_counter() - inicio
+
+    return [{'archivo': ruta, 'serie': nombre, 'muestras': num_muestras,
+             'porcentaje_en_rango': '' if np.isnan(porcentaje) else round(float(porcentaje) * 100, 3),
+             'cumple': bool(porcentaje >= umbral), 'tiempo_lectura_s': round(tiempo_lectura, 6),
+             'tiempo_calculo_s': round(tiempo_calculo, 6), 'error': ''}
+            for nombre, porcentaje in zip(nombres, porcentajes)]
+
+# Archivo .stm: formato binario propio para registros de varias semanas. Cada columna se guarda
+# completa y contigua, de modo que un bloque fijo de filas de una columna es un tramo seguido del
+# archivo. Antes de los datos va un índice con el tiempo inicial y final de cada bloque y, por
+# serie, su mínimo, máximo, cantidad de muestras válidas y la fila del mínimo y del máximo. Con
+# ese índice la gráfica solo lee los bloques visibles y la evaluación de cumplimiento se salta los
+# bloques que quedan enteros dentro o fuera de los límites. Desde la versión 2 el tiempo (float64)
+# y las series van en arreglos separados, y las series float32 se guardan como float32; en la
+# versión 1 el tiempo era la primera columna de un solo arreglo float64.
+MAGIA_ARCHIVO_STM = b'STMARCH1\n'
+VERSION_ARCHIVO_STM = 2
+FILAS_POR_BLOQUE_ARCHIVO = 2048
+BLOQUES_POR_LOTE_ARCHIVO = 128  # Bloques que se resumen y escriben a la vez al crear un archivo
+RESUMENES_ARCHIVO = {'tiempos': '<f8', 'minimos': '<f8', 'maximos': '<f8', 'conteos': '<i8', 'pos_minimos': '<i8', 'pos_maximos': '<i8'}
+
+def resumir_bloques(tiempo, series, fila_inicial, filas_por_bloque=FILAS_POR_BLOQUE_ARCHIVO):
+    """Resume cada bloque de filas: tiempo inicial y final y, por serie, mínimo, máximo, conteo y filas del mínimo y del máximo."""
+    num_filas, num_series = series.shape
+    num_bloques = -(-num_filas // filas_por_bloque)
+    relleno = num_bloques * filas_por_bloque - num_filas
+    if relleno:
+        series = np.concatenate([series, np.full((relleno, num_series), np.nan)])
+    valores = series.reshape(num_bloques, filas_por_bloque, num_series)
+    validos = ~np.isnan(valores)
+    conteos = validos.sum(axis=1)
+
+    # Los NaN no pueden ser mínimo ni máximo; un bloque sin muestras válidas queda con NaN
+    candidatos = np.where(validos, valores, np.inf)
+    pos_minimos = candidatos.argmin(axis=1)
+    minimos = np.take_along_axis(candidatos, pos_minimos[:, np.newaxis], axis=1)[:, 0]
+    candidatos = np.where(validos, valores, -np.inf)
+    pos_maximos = candidatos.argmax(axis=1)
+    maximos = np.take_along_axis(candidatos, pos_maximos[:, np.newaxis], axis=1)[:, 0]
+    minimos[conteos == 0] = np.nan
+    maximos[conteos == 0] = np.nan
+
+    primeras = np.arange(num_bloques) * filas_por_bloque
+    ultimas = np.minimum(primeras + filas_por_bloque, num_filas) - 1
+    desplazamiento = (fila_inicial + primeras)[:, np.newaxis]
+    return {'tiempos': np.column_stack((tiempo[primeras], tiempo[ultimas])), 'minimos': minimos, 'maximos': maximos,
+            'conteos': conteos, 'pos_minimos': pos_minimos + desplazamiento, 'pos_maximos': pos_maximos + desplazamiento}
+
+@perfilar('escribir_stm')
+def escribir_archivo_stm(ruta, tiempo, series, nombres=None, avisar_progreso=None):
+    """Escribe el tiempo y las series en un archivo .stm por lotes de bloques, junto con su índice."""
+    num_filas, num_series = series.shape
+    if not num_filas:
+        raise ValueError("No hay datos para guardar.")
+    num_bloques = -(-num_filas // FILAS_POR_BLOQUE_ARCHIVO)
+    # Las series float32 (las de los .txt) no se ensanchan: ocuparían el doble y guardarían valores como 5.099999904632568
+    tipo_series = np.dtype('<f4' if series.dtype == np.float32 else '<f8')
+    encabezado = {'version': VERSION_ARCHIVO_STM, 'filas': num_filas, 'series': num_series, 'filas_por_bloque': FILAS_POR_BLOQUE_ARCHIVO,
+                  'nombres': list(nombres) if nombres is not None else [f"Serie {i+1}" for i in range(num_series)]}
+    formas = {nombre: (num_bloques, 2 if nombre == 'tiempos' else num_series) for nombre in RESUMENES_ARCHIVO}
+
+    # Se escribe primero a un temporal para no dejar un archivo a medio escribir
+    temporal = ruta + '.tmp'
+    try:
+        with open(temporal, 'wb') as f:
+            f.write(MAGIA_ARCHIVO_STM)
+            f.write(json.dumps(encabezado).encode('utf-8') + b'\n')
+
+            # El índice se conoce recién al recorrer los datos: se reserva su lugar y se llena al final
+            posiciones = {}
+            for nombre, tipo in RESUMENES_ARCHIVO.items():
+                np.lib.format.write_array_header_1_0(f, {'descr': tipo, 'fortran_order': False, 'shape': formas[nombre]})
+                posiciones[nombre] = f.tell()
+                f.seek(posiciones[nombre] + formas[nombre][0] * formas[nombre][1] * 8)
+            np.lib.format.write_array_header_1_0(f, {'descr': '<f8', 'fortran_order': False, 'shape': (num_filas,)})
+            inicio_tiempo = f.tell()
+            f.seek(inicio_tiempo + num_filas * 8)
+            np.lib.format.write_array_header_1_0(f, {'descr': tipo_series.str, 'fortran_order': True, 'shape': (num_filas, num_series)})
+            inicio_series = f.tell()
+            f.truncate(inicio_series + num_filas * num_series * tipo_series.itemsize)
+
+            resumenes = {nombre: [] for nombre in RESUMENES_ARCHIVO}
+            filas_por_lote = FILAS_POR_BLOQUE_ARCHIVO * BLOQUES_POR_LOTE_ARCHIVO
+            for inicio in range(0, num_filas, filas_por_lote):
+                fin = min(inicio + filas_por_lote, num_filas)
+                tiempo_lote = np.asarray(tiempo[inicio:fin], dtype=np.float64)
+                series_lote = np.asarray(series[inicio:fin], dtype=tipo_series)
+
+                # El tiempo y cada serie del lote van a su propio tramo del archivo
+                f.seek(inicio_tiempo + inicio * 8)
+                f.write(tiempo_lote.tobytes())
+                for i in range(num_series):
+                    f.seek(inicio_series + (i * num_filas + inicio) * tipo_series.itemsize)
+                    f.write(np.ascontiguousarray(series_lote[:, i]).tobytes())
+                for nombre, valores in resumir_bloques(tiempo_lote, series_lote, inicio).items():
+                    resumenes[nombre].append(valores)
+                if avisar_progreso is not None:
+                    avisar_progreso(fin / num_filas)
+
+            for nombre, tipo in RESUMENES_ARCHIVO.items():
+                f.seek(posiciones[nombre])
+                f.write(np.concatenate(resumenes[nombre]).astype(tipo).tobytes())
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+def mapear_arreglo(f, ruta):
+    """Mapea sin leerlo el arreglo .npy que empieza en la posición actual de f y deja f al final de él."""
+    np.lib.format.read_magic(f)
+    forma, orden_fortran, tipo = np.lib.format.read_array_header_1_0(f)
+    arreglo = np.memmap(ruta, dtype=tipo, mode='r', offset=f.tell(), shape=forma, order='F' if orden_fortran else 'C')
+    f.seek(arreglo.nbytes, os.SEEK_CUR)
+    return arreglo
+
+@perfilar('abrir_stm')
+def abrir_archivo_stm(ruta):
+    """Lee el encabezado y el índice de un archivo .stm y mapea su tiempo y sus series sin leerlos."""
+    with open(ruta, 'rb') as f:
+        if f.read(len(MAGIA_ARCHIVO_STM)) != MAGIA_ARCHIVO_STM:
+            raise ValueError("no es un archivo .stm")
+        archivo = json.loads(f.readline())
+        if archivo['version'] > VERSION_ARCHIVO_STM:
+            raise ValueError(f"el archivo .stm es de una versión más nueva ({archivo['version']})")
+        for nombre in RESUMENES_ARCHIVO:
+            archivo[nombre] = np.lib.format.read_array(f)
+        if archivo['version'] == 1:
+            datos = mapear_arreglo(f, ruta)
+            archivo['tiempo'], archivo['series_datos'] = datos[:, 0], datos[:, 1:]
+        else:
+            archivo['tiempo'] = mapear_arreglo(f, ruta)
+            archivo['series_datos'] = mapear_arreglo(f, ruta)
+    archivo['ruta'] = ruta
+    return archivo
+
+def convertir_archivo_datos(origen, destino, avisar_progreso=None):
+    """Convierte un archivo de datos al formato que indica la extensión del destino (por ejemplo, un .txt en un .stm)."""
+    conjunto, nombres = leer_archivo_datos(origen)
+    escribir_matriz_por_bloques(destino, conjunto.series, avisar_progreso, nombres, conjunto.tiempo)
+
+@perfilar('estadisticas_rango_stm')
+def contar_en_rango_archivo(archivo, ventana=VENTANA_EVALUACION, limites=LIMITES_TEMPERATURA):
+    """Cuenta las muestras válidas y en rango de cada serie de un archivo .stm, leyendo solo los bloques indecisos."""
+    tiempos, minimos, maximos, conteos = archivo['tiempos'], archivo['minimos'], archivo['maximos'], archivo['conteos']
+    filas_por_bloque = archivo['filas_por_bloque']
+    tiempo, series = archivo['tiempo'], archivo['series_datos']
+
+    dentro_ventana = ((tiempos[:, 0] >= ventana[0]) & (tiempos[:, 1] <= ventana[1]))[:, np.newaxis]
+    fuera_ventana = ((tiempos[:, 1] < ventana[0]) | (tiempos[:, 0] > ventana[1]))[:, np.newaxis]
+    with np.errstate(invalid='ignore'):
+        todo_en_rango = (minimos >= limites[0]) & (maximos <= limites[1])
+        nada_en_rango = (maximos < limites[0]) | (minimos > limites[1])
+
+    # Un bloque entero dentro de la ventana se resuelve con el índice si todas sus muestras están
+    # dentro de los límites, si todas están fuera o si no tiene muestras válidas
+    resueltos = dentro_ventana & (todo_en_rango | nada_en_rango | (conteos == 0))
+    por_leer = ~fuera_ventana & ~resueltos
+    validos = np.where(resueltos, conteos, 0).sum(axis=0)
+    en_rango = np.where(resueltos & todo_en_rango, conteos, 0).sum(axis=0)
+
+    for j in range(archivo['series']):
+        # Los bloques por leer seguidos se leen de una vez
+        bordes = np.flatnonzero(np.diff(np.concatenate(([0], por_leer[:, j].astype(np.int8), [0]))))
+        for bloque_inicial, bloque_final in zip(bordes[0::2], bordes[1::2]):
+            filas = slice(bloque_inicial * filas_por_bloque, min(bloque_final * filas_por_bloque, archivo['filas']))
+            validos_tramo, en_rango_tramo = contar_en_rango(tiempo[filas], series[filas, j:j + 1], ventana, limites)
+            validos[j] += validos_tramo[0]
+            en_rango[j] += en_rango_tramo[0]
+    return validos, en_rango
+
+def indices_visibles_archivo(archivo, col, x0, x1, ancho_px):
+    """Devuelve los índices de las muestras de la columna a dibujar entre x0 y x1, leyendo solo los bloques visibles."""
+    tiempo = archivo['tiempo']
+    filas_por_bloque = archivo['filas_por_bloque']
+    i0, i1 = filas_visibles(tiempo, x0, x1)
+
+    if (i1 - i0) / max(ancho_px, 1) < filas_por_bloque / 2:
+        # Pocos bloques visibles: se leen sus filas y se reducen igual que los datos en memoria
+        serie = np.asarray(archivo['series_datos'][i0:i1, col])
+        return i0 + indices_visibles(construir_piramide_minmax(serie), tiempo[i0:i1], x0, x1, ancho_px)
+
+    # Muchos bloques visibles: el mínimo y el máximo de cada bloque del índice bastan
+    j0 = i0 // filas_por_bloque
+    j1 = -(-i1 // filas_por_bloque)
+    indices_min = archivo['pos_minimos'][j0:j1, col]
+    indices_max = archivo['pos_maximos'][j0:j1, col]
+    indices = np.empty(2 * len(indices_min), dtype=indices_min.dtype)
+    indices[0::2] = np.minimum(indices_min, indices_max)
+    indices[1::2] = np.maximum(indices_min, indices_max)
+    return indices
+
+# Nivel de detalle: cada serie guarda una pirámide de índices de mínimos y máximos para que
+# Agg solo reciba unos pocos puntos por píxel. Al conservar el mínimo y el máximo de cada
+# grupo, ninguna excursión fuera de los límites queda oculta por la reducción.
+def agrupar_nivel(valores_min, valores_max, indices_min, indices_max):
+    """Agrupa de a pares un nivel de la pirámide y devuelve los valores e índices del nivel siguiente."""
+    if len(valores_min) % 2:
+        # Duplicar el último grupo para poder agruparlos de a pares
+        valores_min = np.append(valores_min, valores_min[-1])
+        valores_max = np.append(valores_max, valores_max[-1])
+        indices_min = np.append(indices_min, indices_min[-1])
+        indices_max = np.append(indices_max, indices_max[-1])
+
+    derecha_min = valores_min[1::2] < valores_min[0::2]
+    derecha_max = valores_max[1::2] > valores_max[0::2]
+    indices_min = np.where(derecha_min, indices_min[1::2], indices_min[0::2])
+    indices_max = np.where(derecha_max, indices_max[1::2], indices_max[0::2])
+    valores_min = np.minimum(valores_min[0::2], valores_min[1::2])
+    valores_max = np.maximum(valores_max[0::2], valores_max[1::2])
+    return valores_min, valores_max, indices_min, indices_max
+
+def valores_para_comparar(serie, indices):
+    """Devuelve los valores de la serie en los índices, con NaN como +inf (mínimos) y -inf (máximos)."""
+    # Los NaN no deben ganar la comparación: se reemplazan por +inf/-inf solo para elegir
+    valores = serie[indices]
+    faltantes = np.isnan(valores)
+    return np.where(faltantes, np.inf, valores), np.where(faltantes, -np.inf, valores)
+
+@perfilar('piramide_lod')
+def construir_piramide_minmax(serie):
+    """Construye la pirámide min/max de una serie; el nivel k agrupa 2**(k+1) muestras."""
+    n = len(serie)
+    tipo_indice = np.int32 if n < 2**31 else np.int64
+
+    indices_min = indices_max = np.arange(n, dtype=tipo_indice)
+    valores_min, valores_max = valores_para_comparar(serie, indices_min)
+
+    niveles = []
+    while len(valores_min) > 1:
+        valores_min, valores_max, indices_min, indices_max = agrupar_nivel(valores_min, valores_max, indices_min, indices_max)
+        niveles.append((indices_min, indices_max))
+
+    return niveles
+
+def extender_arreglo(arreglo, inicio, valores):
+    """Escribe valores desde la fila inicio y devuelve el arreglo extendido, duplicando la capacidad si falta espacio."""
+    fin = inicio + len(valores)
+    base = arreglo.base
+    # Se reutiliza el búfer solo si el arreglo es una vista desde su comienzo y hay lugar
+    if (not isinstance(base, np.ndarray) or isinstance(base, np.memmap) or base.ndim != arreglo.ndim
+            or len(base) < fin or base.ctypes.data != arreglo.ctypes.data):
+        # Una matriz guardada por columnas sigue así, con cada columna seguida en el búfer
+        orden = 'F' if arreglo.ndim > 1 and (arreglo.flags.f_contiguous or arreglo.strides[0] == arreglo.itemsize) else 'C'
+        base = np.empty((max(2 * fin, 1024),) + arreglo.shape[1:], dtype=arreglo.dtype, order=orden)
+        base[:inicio] = arreglo[:inicio]
+    base[inicio:fin] = valores
+    return base[:fin]
+
+def extender_piramide_minmax(piramide, serie, n_anterior):
+    """Actualiza la pirámide después de agregar muestras al final de la serie, recalculando solo los grupos afectados."""
+    n = len(serie)
+    tipo_indice = np.int32 if n < 2**31 else np.int64
+    primero = n_anterior  # Primer elemento modificado del nivel anterior
+    largo_anterior = n
+    nivel = 0
+    while largo_anterior > 1:
+        # Un nivel nuevo se calcula completo; uno existente, desde el primer grupo afectado
+        inicio = primero // 2 if nivel < len(piramide) else 0
+        if nivel == 0:
+            indices_min = indices_max = np.arange(2 * inicio, n, dtype=tipo_indice)
+        else:
+            indices_min = piramide[nivel - 1][0][2 * inicio:]
+            indices_max = piramide[nivel - 1][1][2 * inicio:]
+        valores_min = valores_para_comparar(serie, indices_min)[0]
+        valores_max = valores_para_comparar(serie, indices_max)[1]
+        _, _, nuevos_min, nuevos_max = agrupar_nivel(valores_min, valores_max, indices_min, indices_max)
+
+        if nivel < len(piramide):
+            piramide[nivel] = (extender_arreglo(piramide[nivel][0], inicio, nuevos_min),
+                               extender_arreglo(piramide[nivel][1], inicio, nuevos_max))
+        else:
+            piramide.append((nuevos_min, nuevos_max))
+        largo_anterior = len(piramide[nivel][0])
+        primero = inicio
+        nivel += 1
+    del piramide[nivel:]
+
+def filas_visibles(tiempo, x0, x1):
+    """Devuelve el rango de filas entre x0 y x1, con una muestra extra a cada lado para que la línea llegue a los bordes."""
+    i0 = max(int(tiempo.searchsorted(x0, side='left')) - 1, 0)
+    i1 = min(int(tiempo.searchsorted(x1, side='right')) + 1, len(tiempo))
+    return i0, i1
+
+def indices_visibles(piramide, tiempo, x0, x1, ancho_px):
+    """Devuelve los índices de las muestras a dibujar entre x0 y x1 para un ancho en píxeles."""
+    i0, i1 = filas_visibles(tiempo, x0, x1)
+
+    # Elegir el nivel más grueso que todavía deja al menos un grupo por píxel
+    muestras_por_pixel = (i1 - i0) / max(ancho_px, 1)
+    nivel = int(np.floor(np.log2(muestras_por_pixel))) - 1 if muestras_por_pixel >= 4 else -1
+    nivel = min(nivel, len(piramide) - 1)
+    if nivel < 0:
+        # Pocas muestras visibles: se dibujan a resolución completa
+        return np.arange(i0, i1)
+
+    tam_grupo = 2 ** (nivel + 1)
+    j0 = i0 // tam_grupo
+    j1 = -(-i1 // tam_grupo)
+    indices_min, indices_max = piramide[nivel]
+    indices_min = indices_min[j0:j1]
+    indices_max = indices_max[j0:j1]
+
+    # Mínimo y máximo de cada grupo en orden temporal
+    indices = np.empty(2 * len(indices_min), dtype=indices_min.dtype)
+    indices[0::2] = np.minimum(indices_min, indices_max)
+    indices[1::2] = np.maximum(indices_min, indices_max)
+    return indices
+
+@perfilar('nivel_detalle')
+def actualizar_nivel_detalle(*args):
+    """Recalcula las muestras visibles de cada línea según los límites actuales y el ancho de los ejes."""
+    if not lineas_series:
+        return
+    x0, x1 = ax.get_xlim()
+    ancho_px = ax.bbox.width
+    tiempo, series = conjunto_datos.tiempo, conjunto_datos.series
+    for col, linea in lineas_series.items():
+        indices = indices_a_dibujar(col, x0, x1, ancho_px)
+        linea.set_data(tiempo[indices], series[indices, col])
+
+def indices_a_dibujar(col, x0, x1, ancho_px):
+    """Devuelve los índices de la columna a dibujar, desde el archivo .stm abierto o desde la pirámide en memoria."""
+    if archivo_stm is not None:
+        return indices_visibles_archivo(archivo_stm, col, x0, x1, ancho_px)
+    return indices_visibles(piramides_lod[col], conjunto_datos.tiempo, x0, x1, ancho_px)
+
+def extremos_datos():
+    """Devuelve el tiempo final y las temperaturas mínima y máxima, calculadas una sola vez al cargar los datos."""
+    return conjunto_datos.tiempo[-1], conjunto_datos.minimo, conjunto_datos.maximo
+
+def asegurar_figura():
+    """Crea una sola vez la figura, los ejes y el lienzo de Tk, y conecta los eventos del mouse."""
+    global fig, ax, canvas
+
+    if fig is not None:
+        return
+    # El lienzo de Tk se importa recién aquí: la ventana aparece antes y los lotes no lo cargan
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-    # Graficar los datos
-    for idx, col in enumerate(seleccion_columnas):
-        serie = data[:, col + 1]
-        tiempo = data[:, 0]
-        
-        # Filtrar los datos para considerar el rango de horas de 2 a 48
-        serie_hasta_hora_45 = serie[(tiempo >= 2) & (tiempo <= 48)]
-
-        # Calcular el porcentaje de valores dentro del rango de 2 a 8°C en ese intervalo de tiempo
-        porcentaje_en_rango = np.sum((serie_hasta_hora_45 >= 2) & (serie_hasta_hora_45 <= 8)) / len(serie_hasta_hora_45)
-
-        # Asignar color verde si el porcentaje es mayor o igual al 95%
-        color = 'green' if porcentaje_en_rango >= 0.95 else colores[idx % len(colores)]
-        
-        # Graficar la serie con el color asignado
-        ax.plot(tiempo, serie, label=nombres_columnas[col], color=color)
-
-
-    if min_punteado is not None:
-        ax.axhline(y=min_punteado, color='r', linestyle='--', label='Mínimo')
-    if max_punteado is not None:
-        ax.axhline(y=max_punteado, color='r', linestyle='--', label='Máximo')
-        
-    ax.set_xlabel('Tiempo (horas)')
-    ax.set_ylabel('Temperatura (°C)')
-    
-    # Configurar los ticks del eje x de 1 en 1
-    max_tiempo = max(data[:, 0])
-    ticks_x = np.arange(0, max_tiempo + 1, 1)
-    ax.set_xticks(ticks_x)
-    ax.set_xticklabels([f'{tick:.0f}' if tick % 5 == 0 else '' for tick in ticks_x])
-    
-    # Añadir marcas en los ticks que no tienen etiqueta (los múltiplos de 5 tienen etiqueta)
-    for tick in ticks_x:
-        if tick % 5 != 0:
-            ax.axvline(x=tick, color='gray', linestyle='--', linewidth=0.5)
-    
-    # Configurar los ticks del eje y de 1 en 1
-    min_temp, max_temp = np.min(data[:, 1:]), np.max(data[:, 1:])
-    ticks_y = np.arange(np.floor(min_temp), np.ceil(max_temp) + 1, 1)
-    ax.set_yticks(ticks_y)
-    ax.set_yticklabels([f'{tick:.0f}' if tick % 2 == 0 else '' for tick in ticks_y])
-    
-    # Añadir marcas en los ticks que no tienen etiqueta (los múltiplos de 2 tienen etiqueta)
-    for tick in ticks_y:
-        if tick % 2 != 0:
-            ax.axhline(y=tick, color='gray', linestyle='--', linewidth=0.5)
-    
-    ax.legend(loc='upper right')
-    ax.grid(True)
+    # La figura no se registra en pyplot, así no se acumulan figuras durante la sesión
+    with FasePerfilada('crear_figura'):
+        fig = Figure(figsize=TAMANO_FIGURA)
+        ax = fig.add_subplot()
+        configurar_ejes()
 
-    canvas = FigureCanvasTkAgg(fig, master=frame_grafica)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas = FigureCanvasTkAgg(fig, master=frame_grafica)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    if perfilado_activo:
+        # Medir cada dibujo completo del lienzo, lo pida quien lo pida
+        canvas.draw = perfilar('dibujo_lienzo')(canvas.draw)
 
     # Conectar eventos de mouse para zoom y movimiento
     canvas.mpl_connect('button_press_event', on_mouse_press)
@@ -347,6 +2327,453 @@ def actualizar_grafica():
     canvas.mpl_connect('motion_notify_event', on_mouse_move)
     canvas.mpl_connect('scroll_event', on_mouse_scroll)  # Conectar el evento de scroll
 
+    canvas.mpl_connect('resize_event', actualizar_nivel_detalle)
+
+    # Cursor en cruz: la imagen de fondo se renueva con cada dibujo completo
+    canvas.mpl_connect('draw_event', guardar_fondo_cursor)
+    canvas.mpl_connect('figure_leave_event', ocultar_cursor)
+
+# Marcas y cuadrícula adaptables: los localizadores eligen las marcas según los límites visibles y
+# la cuadrícula (mayor continua, menor punteada) es una sola colección de segmentos que se recalcula
+# al cambiar los límites, con una cantidad de líneas acotada sin importar la duración de los datos.
+PASOS_MARCAS = [1, 2, 5, 10]
+ESTILO_CUADRICULA_MAYOR = ('#b0b0b0', 0.8, '-')
+ESTILO_CUADRICULA_MENOR = ('gray', 0.5, '--')
+
+def estilizar_ejes(ejes):
+    """Pone los títulos, los localizadores de marcas en horas y °C y una colección vacía para la cuadrícula; devuelve la colección."""
+    ejes.set_xlabel('Tiempo (horas)')
+    ejes.set_ylabel('Temperatura (°C)')
+    for eje in (ejes.xaxis, ejes.yaxis):
+        eje.set_major_locator(MaxNLocator(nbins='auto', steps=PASOS_MARCAS))
+        eje.set_minor_locator(AutoMinorLocator())
+        eje.set_major_formatter(ScalarFormatter(useOffset=False))
+
+    coleccion = LineCollection([], zorder=1)
+    ejes.add_collection(coleccion, autolim=False)
+    return coleccion
+
+def configurar_ejes():
+    """Configura los títulos, los localizadores de marcas, la cuadrícula y el cursor de los ejes, y conecta los cambios de límites."""
+    global cuadricula
+    cuadricula = estilizar_ejes(ax)
+
+    # Recalcular el nivel de detalle y la cuadrícula cuando cambian los límites
+    ax.callbacks.connect('xlim_changed', actualizar_nivel_detalle)
+    ax.callbacks.connect('xlim_changed', actualizar_cuadricula)
+    ax.callbacks.connect('ylim_changed', actualizar_cuadricula)
+    ax.callbacks.connect('xlim_changed', actualizar_panel_rango)
+
+    # Los artistas del cursor se crean con los ejes: agregarlos después dejaría la figura sin dibujar
+    crear_cursor()
+
+def segmentos_cuadricula(posiciones, desde, hasta, vertical):
+    """Devuelve los segmentos de las líneas de cuadrícula en las posiciones dadas, de un borde al otro de la vista."""
+    segmentos = np.empty((len(posiciones), 2, 2))
+    segmentos[:, :, 0 if vertical else 1] = np.asarray(posiciones)[:, np.newaxis]
+    segmentos[:, 0, 1 if vertical else 0] = desde
+    segmentos[:, 1, 1 if vertical else 0] = hasta
+    return segmentos
+
+def actualizar_cuadricula(_=None):
+    """Recalcula los segmentos de la cuadrícula a partir de las marcas de los límites visibles."""
+    ajustar_cuadricula(ax, cuadricula)
+
+def ajustar_cuadricula(ejes, coleccion):
+    """Pone en la colección los segmentos de la cuadrícula mayor y menor de las marcas visibles de los ejes."""
+    x0, x1 = sorted(ejes.get_xlim())
+    y0, y1 = sorted(ejes.get_ylim())
+    grupos = []
+    for eje, desde, hasta, inicio, fin, vertical in ((ejes.xaxis, y0, y1, x0, x1, True), (ejes.yaxis, x0, x1, y0, y1, False)):
+        for posiciones, estilo in ((eje.get_majorticklocs(), ESTILO_CUADRICULA_MAYOR), (eje.get_minorticklocs(), ESTILO_CUADRICULA_MENOR)):
+            posiciones = posiciones[(posiciones >= inicio) & (posiciones <= fin)]
+            grupos.append((segmentos_cuadricula(posiciones, desde, hasta, vertical), estilo))
+
+    coleccion.set_segments(np.concatenate([segmentos for segmentos, _ in grupos]))
+    estilos = [estilo for segmentos, estilo in grupos for _ in range(len(segmentos))]
+    coleccion.set_colors([color for color, _, _ in estilos])
+    coleccion.set_linewidths([ancho for _, ancho, _ in estilos])
+    coleccion.set_linestyles([linea for _, _, linea in estilos])
+
+def actualizar_leyenda():
+    """Vuelve a generar la leyenda a partir de las etiquetas actuales de las líneas."""
+    ax.legend(loc='upper right')
+
+def agregar_linea_limite(ejes, valor, etiqueta):
+    """Dibuja una línea punteada horizontal de límite de temperatura."""
+    return ejes.axhline(y=valor, color='r', linestyle='--', label=etiqueta)
+
+def actualizar_lineas_limite():
+    """Crea, mueve o retira las líneas punteadas de mínimo y máximo sin tocar las series."""
+    for clave, valor, etiqueta in (('min', min_punteado, 'Mínimo'), ('max', max_punteado, 'Máximo')):
+        linea = lineas_limite.get(clave)
+        if valor is None:
+            if linea is not None:
+                lineas_limite.pop(clave).remove()
+        elif linea is None:
+            lineas_limite[clave] = agregar_linea_limite(ax, valor, etiqueta)
+        else:
+            linea.set_ydata([valor, valor])
+
+def limites_actuales():
+    """Devuelve los límites de temperatura de las líneas punteadas, o los predeterminados si falta alguno."""
+    if min_punteado is None or max_punteado is None:
+        return LIMITES_TEMPERATURA
+    return (min_punteado, max_punteado)
+
+# Caché de resultados de análisis: los conteos en rango y las métricas de excursión se guardan con
+# una clave formada por el origen de los datos (la ruta, el tamaño y la fecha de modificación del
+# archivo leído, sin recorrer su contenido), los límites y la ventana. Hay un nivel en memoria (LRU)
+# y otro en disco en la carpeta de caché del usuario, acotado en tamaño: al pasarse se borran los
+# menos usados. Los datos sin archivo (ingreso manual, CSV alineados, seguimiento) solo usan la memoria.
+CARPETA_CACHE_ANALISIS = os.path.join(CARPETA_CACHE_USUARIO, 'analisis')
+ENTRADAS_CACHE_MEMORIA = 64
+MAXIMO_BYTES_CACHE_DISCO = 4 * 1024 * 1024
+VERSION_CACHE_ANALISIS = 2  # Cambia si cambia algún cálculo, para no usar resultados viejos del disco
+candado_cache_analisis = threading.Lock()  # El hilo de tareas también usa el nivel en memoria
+
+def leer_analisis_disco(clave):
+    """Lee un resultado del nivel en disco del caché y lo marca como recién usado; devuelve None si no está."""
+    ruta = os.path.join(CARPETA_CACHE_ANALISIS, clave + '.npz')
+    try:
+        with np.load(ruta) as contenido:
+            resultado = {nombre: contenido[nombre] for nombre in contenido.files}
+        os.utime(ruta)
+        return resultado
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, zipfile.BadZipFile):
+        # Un archivo dañado se descarta y el resultado se vuelve a calcular
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+        return None
+
+def guardar_analisis_disco(clave, resultado):
+    """Guarda un resultado en el nivel en disco del caché y borra los menos usados si se pasa del tamaño máximo."""
+    ruta = os.path.join(CARPETA_CACHE_ANALISIS, clave + '.npz')
+    temporal = ruta + '.tmp'
+    try:
+        os.makedirs(CARPETA_CACHE_ANALISIS, exist_ok=True)
+        with open(temporal, 'wb') as f:
+            np.savez(f, **resultado)
+        os.replace(temporal, ruta)
+        recortar_carpeta_cache(CARPETA_CACHE_ANALISIS, MAXIMO_BYTES_CACHE_DISCO, '.npz')
+    except OSError:
+        # Sin permiso de escritura el caché queda solo en memoria
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+def parametros_analisis():
+    """Devuelve los límites y la ventana actuales tal como se usan en las claves del caché."""
+    return tuple(map(float, limites_actuales())), tuple(map(float, ventana_evaluacion))
+
+def analisis_en_cache(operacion, calcular, origen=None, limites=None, ventana=None):
+    """Devuelve el resultado (un diccionario de arreglos) de un análisis, buscándolo primero en memoria y después en disco; por omisión son los datos, los límites y la ventana actuales."""
+    # Los datos nunca se modifican en su lugar: se reemplazan o crecen en un conjunto nuevo, con otro origen
+    if origen is None:
+        origen = conjunto_datos.origen
+    if limites is None or ventana is None:
+        limites, ventana = parametros_analisis()
+    clave = hashlib.sha1(repr((operacion, origen, limites, ventana, VERSION_CACHE_ANALISIS)).encode()).hexdigest()
+    en_disco = not origen.startswith(ORIGEN_SESION)
+
+    with candado_cache_analisis:
+        resultado = cache_analisis.get(clave)
+        if resultado is not None:
+            cache_analisis.move_to_end(clave)
+            return resultado
+    resultado = leer_analisis_disco(clave) if en_disco else None
+    if resultado is None:
+        resultado = calcular()
+        if en_disco:
+            guardar_analisis_disco(clave, resultado)
+    with candado_cache_analisis:
+        cache_analisis[clave] = resultado
+        if len(cache_analisis) > ENTRADAS_CACHE_MEMORIA:
+            cache_analisis.popitem(last=False)
+    return resultado
+
+def calcular_conteos_rango(conjunto, archivo, limites, ventana):
+    """Cuenta las muestras válidas y en rango de cada serie del conjunto (o del archivo .stm), o las toma del caché."""
+    if archivo is not None:
+        calcular = lambda: contar_en_rango_archivo(archivo, ventana, limites)
+    else:
+        calcular = lambda: contar_en_rango(conjunto.tiempo, conjunto.series, ventana, limites)
+    resultado = analisis_en_cache('conteos_rango', lambda: dict(zip(('validos', 'en_rango'), calcular())), conjunto.origen, limites, ventana)
+    return resultado['validos'], resultado['en_rango']
+
+def recalcular_conteos_rango():
+    """Cuenta las muestras válidas y en rango de cada serie con los límites y la ventana actuales, o las toma del caché."""
+    global conteos_rango
+    conteos_rango = calcular_conteos_rango(conjunto_datos, archivo_stm, *parametros_analisis())
+
+def color_serie(idx, porcentaje, umbral=UMBRAL_CUMPLIMIENTO):
+    """Devuelve verde si la serie cumple el umbral y, si no, el color fijo de su posición."""
+    # Definir colores fijos
+    colores = ['blue', 'orange', 'red', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
+
+    # Asignar color verde si el porcentaje es mayor o igual al 95%
+    return 'green' if porcentaje >= umbral else colores[idx % len(colores)]
+
+def actualizar_colores_cumplimiento():
+    """Colorea de verde las series que cumplen con los límites y la ventana actuales, sin volver a graficarlas."""
+    # Porcentaje de valores dentro de los límites en la ventana de evaluación, a partir de los conteos acumulados
+    porcentajes_en_rango = porcentaje_desde_conteos(*conteos_rango)
+
+    for idx, col in enumerate(seleccion_columnas):
+        lineas_series[col].set_color(color_serie(idx, porcentajes_en_rango[col]))
+
+# Estadísticas del rango visible: al cargar los datos se resume cada bloque de filas con la suma de
+# sus valores, la cantidad de muestras válidas y la de muestras en rango, y se guardan las sumas
+# acumuladas de esos resúmenes. Un tramo cualquiera sale de dos restas más los bloques parciales de
+# sus bordes, y el mínimo y el máximo salen de la pirámide min/max, que se recorre como un árbol de
+# segmentos. Así el panel y la ventana de evaluación se actualizan en cada paso de un arrastre sin
+# recorrer todas las filas. Un archivo .stm usa su propio índice de bloques.
+FILAS_POR_BLOQUE_INDICE = 2048
+BLOQUES_POR_LOTE_INDICE = 64  # Bloques que se resumen a la vez al construir el índice
+COLUMNAS_PANEL_RANGO = {'serie': "Serie", 'minimo': "Mínimo (°C)", 'maximo': "Máximo (°C)", 'media': "Media (°C)", 'porcentaje': "En rango (%)"}
+FILAS_PANEL_RANGO = 5
+
+def resumir_tramo_rango(tramo, limites):
+    """Devuelve, por columna del tramo, la suma de los valores válidos, la cantidad de válidos y la de muestras en rango."""
+    validos = ~np.isnan(tramo)
+    sumas = np.where(validos, tramo, 0).sum(axis=0, dtype=np.float64)
+    en_rango = ((tramo >= limites[0]) & (tramo <= limites[1])).sum(axis=0)
+    return sumas, validos.sum(axis=0), en_rango
+
+def resumir_bloques_rango(series, fila_inicial, limites, filas_por_bloque=FILAS_POR_BLOQUE_INDICE):
+    """Resume cada bloque de filas desde fila_inicial (inicio de un bloque) con la suma, los válidos y los en rango de cada serie."""
+    num_filas, num_series = series.shape
+    num_bloques = -(-(num_filas - fila_inicial) // filas_por_bloque)
+    sumas = np.zeros((num_bloques, num_series))
+    validos = np.zeros((num_bloques, num_series), dtype=np.int64)
+    en_rango = np.zeros((num_bloques, num_series), dtype=np.int64)
+
+    # Se resume por lotes de bloques para no copiar todas las filas de una vez
+    for lote in range(0, num_bloques, BLOQUES_POR_LOTE_INDICE):
+        inicio = fila_inicial + lote * filas_por_bloque
+        tramo = series[inicio:inicio + BLOQUES_POR_LOTE_INDICE * filas_por_bloque]
+        bordes = np.arange(0, len(tramo), filas_por_bloque)
+        validos_tramo = ~np.isnan(tramo)
+        fin = lote + len(bordes)
+        sumas[lote:fin] = np.add.reduceat(np.where(validos_tramo, tramo, 0).astype(np.float64), bordes, axis=0)
+        validos[lote:fin] = np.add.reduceat(validos_tramo, bordes, axis=0, dtype=np.int64)
+        en_rango[lote:fin] = np.add.reduceat((tramo >= limites[0]) & (tramo <= limites[1]), bordes, axis=0, dtype=np.int64)
+    return sumas, validos, en_rango
+
+def acumular_resumenes(resumenes, anteriores=None):
+    """Convierte los resúmenes por bloque en sumas acumuladas con una fila inicial en cero, continuando las anteriores si se dan."""
+    acumulados = []
+    for i, resumen in enumerate(resumenes):
+        base = np.zeros((1, resumen.shape[1]), dtype=resumen.dtype) if anteriores is None else anteriores[i]
+        acumulados.append(np.concatenate((base, base + np.cumsum(resumen, axis=0))))
+    return acumulados
+
+@perfilar('indice_rango')
+def construir_indice_rango(series, limites):
+    """Construye el índice de sumas acumuladas por bloque de las series para los límites dados."""
+    sumas, validos, en_rango = acumular_resumenes(resumir_bloques_rango(series, 0, limites))
+    return {'limites': tuple(limites), 'filas': len(series), 'sumas': sumas, 'validos': validos, 'en_rango': en_rango}
+
+def extender_indice_rango(indice, series, filas_anteriores):
+    """Actualiza el índice después de agregar filas al final, recalculando desde el último bloque incompleto."""
+    if indice is None:
+        return
+    bloque = filas_anteriores // FILAS_POR_BLOQUE_INDICE
+    resumenes = resumir_bloques_rango(series, bloque * FILAS_POR_BLOQUE_INDICE, indice['limites'])
+    anteriores = [indice[clave][bloque:bloque + 1] for clave in ('sumas', 'validos', 'en_rango')]
+    acumulados = acumular_resumenes(resumenes, anteriores)
+    for clave, acumulado in zip(('sumas', 'validos', 'en_rango'), acumulados):
+        indice[clave] = np.concatenate((indice[clave][:bloque], acumulado))
+    indice['filas'] = len(series)
+
+def sumas_de_filas(indice, series, i0, i1, limites):
+    """Devuelve la suma de los valores válidos, los válidos y los en rango de cada serie en las filas [i0, i1)."""
+    if indice['limites'] != tuple(limites):
+        # Cambiaron los límites: los conteos en rango de todos los bloques se recalculan una vez
+        indice.update(construir_indice_rango(series, limites))
+    j0 = -(-i0 // FILAS_POR_BLOQUE_INDICE)  # Primer bloque completo del tramo
+    j1 = i1 // FILAS_POR_BLOQUE_INDICE  # Fin de los bloques completos
+    if j0 >= j1:
+        return resumir_tramo_rango(series[i0:i1], limites)
+
+    # Bloques completos desde las sumas acumuladas; los bordes se leen fila por fila
+    resultado = [indice[clave][j1] - indice[clave][j0] for clave in ('sumas', 'validos', 'en_rango')]
+    for tramo in (series[i0:j0 * FILAS_POR_BLOQUE_INDICE], series[j1 * FILAS_POR_BLOQUE_INDICE:i1]):
+        if len(tramo):
+            resultado = [total + parcial for total, parcial in zip(resultado, resumir_tramo_rango(tramo, limites))]
+    return tuple(resultado)
+
+def nodos_de_filas(i0, i1):
+    """Devuelve los grupos (nivel, posición) de la pirámide que cubren exactamente las filas [i0, i1); el nivel -1 es una fila."""
+    # Como en un árbol de segmentos: se sube de nivel tomando los extremos sueltos de cada lado
+    nodos = []
+    nivel = -1
+    while i0 < i1:
+        if i0 & 1:
+            nodos.append((nivel, i0))
+            i0 += 1
+        if i1 & 1:
+            i1 -= 1
+            nodos.append((nivel, i1))
+        i0 >>= 1
+        i1 >>= 1
+        nivel += 1
+    return nodos
+
+def extremos_de_filas(piramide, serie, nodos):
+    """Devuelve el mínimo y el máximo de la serie en los grupos de la pirámide dados por nodos_de_filas."""
+    indices_min = [j if nivel < 0 else piramide[nivel][0][j] for nivel, j in nodos]
+    indices_max = [j if nivel < 0 else piramide[nivel][1][j] for nivel, j in nodos]
+    return np.fmin.reduce(serie[indices_min]), np.fmax.reduce(serie[indices_max])
+
+def extremos_de_filas_archivo(archivo, col, i0, i1):
+    """Devuelve el mínimo y el máximo de una serie de un archivo .stm en las filas [i0, i1), leyendo solo los bloques de los bordes."""
+    filas_por_bloque = archivo['filas_por_bloque']
+    j0 = -(-i0 // filas_por_bloque)
+    j1 = i1 // filas_por_bloque
+    if j0 >= j1:
+        tramos = [archivo['series_datos'][i0:i1, col]]
+    else:
+        tramos = [archivo['series_datos'][i0:j0 * filas_por_bloque, col], archivo['series_datos'][j1 * filas_por_bloque:i1, col],
+                  archivo['minimos'][j0:j1, col], archivo['maximos'][j0:j1, col]]
+    valores = np.concatenate(tramos)
+    return np.fmin.reduce(valores), np.fmax.reduce(valores)
+
+def estadisticas_rango(x0, x1):
+    """Devuelve el mínimo, el máximo, la media y el porcentaje en rango de cada serie entre las horas x0 y x1."""
+    tiempo, series = conjunto_datos.tiempo, conjunto_datos.series
+    i0 = int(tiempo.searchsorted(x0, side='left'))
+    i1 = int(tiempo.searchsorted(x1, side='right'))
+    limites = limites_actuales()
+    estadisticas = {clave: np.full(num_columnas, np.nan) for clave in ('minimo', 'maximo', 'media', 'porcentaje')}
+    if i0 >= i1:
+        return estadisticas
+
+    if archivo_stm is not None:
+        # El índice del .stm no guarda sumas: la media queda sin calcular
+        for col in seleccion_columnas:
+            estadisticas['minimo'][col], estadisticas['maximo'][col] = extremos_de_filas_archivo(archivo_stm, col, i0, i1)
+        validos, en_rango = contar_en_rango_archivo(archivo_stm, (x0, x1), limites)
+    else:
+        nodos = nodos_de_filas(i0, i1)
+        for col in seleccion_columnas:
+            estadisticas['minimo'][col], estadisticas['maximo'][col] = extremos_de_filas(piramides_lod[col], series[:, col], nodos)
+        sumas, validos, en_rango = sumas_de_filas(indice_rango, series, i0, i1, limites)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            estadisticas['media'] = np.where(validos > 0, sumas / np.maximum(validos, 1), np.nan)
+    estadisticas['porcentaje'] = porcentaje_desde_conteos(validos, en_rango) * 100
+    return estadisticas
+
+def crear_panel_rango():
+    """Crea debajo de la gráfica la tabla con las estadísticas de cada serie en el rango visible."""
+    global tabla_rango, etiqueta_rango
+    marco = ttk.Frame(root, padding="10")
+    marco.pack(side=tk.BOTTOM, fill=tk.X)
+    etiqueta_rango = ttk.Label(marco, text="Rango visible")
+    etiqueta_rango.pack(side=tk.TOP, anchor=tk.W)
+    tabla_rango = ttk.Treeview(marco, columns=list(COLUMNAS_PANEL_RANGO), show='headings', height=FILAS_PANEL_RANGO)
+    for clave, titulo in COLUMNAS_PANEL_RANGO.items():
+        tabla_rango.heading(clave, text=titulo)
+        tabla_rango.column(clave, anchor=tk.W if clave == 'serie' else tk.E, width=150)
+    tabla_rango.pack(side=tk.TOP, fill=tk.X)
+
+def mostrar_estadisticas_rango(x0, x1):
+    """Llena el panel con las estadísticas de cada serie entre las horas x0 y x1."""
+    if tabla_rango is None or not lineas_series:
+        return
+    x0, x1 = min(x0, x1), max(x0, x1)
+    estadisticas = estadisticas_rango(x0, x1)
+    etiqueta_rango.configure(text=f"Rango visible: {x0:.2f} a {x1:.2f} h")
+
+    # Se reutiliza la fila de cada serie; solo se cambian sus valores
+    filas = {str(col) for col in seleccion_columnas}
+    for fila in tabla_rango.get_children():
+        if fila not in filas:
+            tabla_rango.delete(fila)
+    for col in seleccion_columnas:
+        valores = [nombres_columnas[col]] + ['—' if np.isnan(estadisticas[clave][col]) else f"{estadisticas[clave][col]:.2f}"
+                                             for clave in ('minimo', 'maximo', 'media', 'porcentaje')]
+        if tabla_rango.exists(str(col)):
+            tabla_rango.item(str(col), values=valores)
+        else:
+            tabla_rango.insert('', tk.END, iid=str(col), values=valores)
+
+def actualizar_panel_rango(_=None):
+    """Actualiza el panel con los límites visibles de los ejes."""
+    if tabla_rango is not None:
+        mostrar_estadisticas_rango(*ax.get_xlim())
+
+@perfilar('actualizar_grafica')
+def preparar_analisis_grafica(conjunto, archivo, limites, ventana):
+    """Construye lo que la gráfica necesita de un conjunto de datos nuevo: la pirámide de cada serie, el índice de rango y los conteos en rango."""
+    # Un archivo .stm ya trae en su índice lo necesario y no se recorre completo
+    if archivo is None:
+        piramides = {col: construir_piramide_minmax(conjunto.series[:, col]) for col in range(conjunto.series.shape[1])}
+        indice = construir_indice_rango(conjunto.series, limites)
+    else:
+        piramides, indice = {}, None
+    return {'piramides': piramides, 'indice_rango': indice, 'conteos': calcular_conteos_rango(conjunto, archivo, limites, ventana),
+            'parametros': (limites, ventana)}
+
+def actualizar_grafica(preparado=None):
+    """Actualiza la gráfica con los datos cargados reutilizando la figura y las líneas existentes; sin preparado, su análisis se construye aquí."""
+    global piramides_lod, indice_rango, conteos_rango
+
+    asegurar_figura()
+
+    # Retirar las líneas de columnas que ya no están seleccionadas
+    for col in list(lineas_series):
+        if col not in seleccion_columnas:
+            lineas_series.pop(col).remove()
+
+    # Las cargas en segundo plano ya traen las pirámides, el índice de rango y los conteos; si los
+    # límites o la ventana cambiaron mientras tanto, los conteos se vuelven a pedir (el índice se
+    # reconstruye solo al consultarlo)
+    if preparado is None:
+        preparado = preparar_analisis_grafica(conjunto_datos, archivo_stm, *parametros_analisis())
+    piramides_lod, indice_rango = preparado['piramides'], preparado['indice_rango']
+    if preparado['parametros'] == parametros_analisis():
+        conteos_rango = preparado['conteos']
+    else:
+        recalcular_conteos_rango()
+    tiempo, series = conjunto_datos.tiempo, conjunto_datos.series
+
+    # Graficar los datos
+    with FasePerfilada('graficar_series'):
+        for col in seleccion_columnas:
+            serie = series[:, col]
+
+            # Reutilizar la línea de la columna si ya existe; solo se reemplazan sus datos.
+            # Se grafica la vista completa reducida al ancho de los ejes.
+            indices = indices_a_dibujar(col, -np.inf, np.inf, ax.bbox.width)
+            linea = lineas_series.get(col)
+            if linea is None:
+                linea, = ax.plot(tiempo[indices], serie[indices], label=nombres_columnas[col])
+                lineas_series[col] = linea
+            else:
+                linea.set_data(tiempo[indices], serie[indices])
+                linea.set_label(nombres_columnas[col])
+
+    actualizar_colores_cumplimiento()
+    actualizar_lineas_limite()
+    actualizar_sombra_ventana()
+
+    # Volver a ajustar la vista a los datos nuevos (un zoom previo desactiva el autoescalado)
+    ax.relim()
+    ax.autoscale(True)
+
+    with FasePerfilada('cuadricula'):
+        # Las marcas y sus etiquetas las eligen los localizadores al dibujar; solo se ajusta la cuadrícula
+        actualizar_cuadricula()
+
+    actualizar_panel_rango()
+    actualizar_leyenda()
+
+    canvas.draw_idle()
+
 # Función para guardar la gráfica en un archivo
 def guardar_grafica():
     """Guarda la gráfica en un archivo."""
@@ -372,17 +2799,19 @@ def zoom_salida():
 def restaurar_vista():
     """Restablece la vista original de la gráfica y limpia los modos."""
     global ax, canvas
-    ax.set_xlim(0, max(data[:, 0]))
-    ax.set_ylim(np.min(data[:, 1:]), np.max(data[:, 1:]))
-    canvas.draw()
+    max_tiempo, min_temp, max_temp = extremos_datos()
+    ax.set_xlim(0, max_tiempo, auto=True)
+    ax.set_ylim(min_temp, max_temp, auto=True)
     boton_zoom_in.configure(style='default.TButton')
     boton_zoom_out.configure(style='default.TButton')
-    global modo_zoom, zoom_rect, zoom_start
+    global modo_zoom, zoom_rect, zoom_start, evento_pendiente
     modo_zoom = None
     if zoom_rect is not None:
         zoom_rect.remove()  # Elimina el rectángulo de zoom si existe
     zoom_rect = None
     zoom_start = None
+    evento_pendiente = None
+    solicitar_redibujo()
 
 # Función para guardar nombres en un archivo JSON
 def guardar_nombres_json():
@@ -390,21 +2819,273 @@ def guardar_nombres_json():
     with open('nombres_columnas.json', 'w') as f:
         json.dump(nombres_columnas, f)
 
+# Interacción con blitting: durante un arrastre solo se redibuja el rectángulo de zoom, la
+# imagen desplazada de los ejes o la franja de la ventana de evaluación (y las series que cambian
+# de color), y los eventos de movimiento se agrupan en un cuadro por vez. Sin arrastre, el cursor
+# en cruz se pinta sobre la imagen guardada en el último dibujo completo.
+# Objetivo: menos de 16 ms por evento de movimiento con 1M de puntos en 5 series.
+INTERVALO_CUADRO_MS = 16  # Duración de un cuadro (~60 Hz)
+BORDE_IMAGEN_PX = 2  # Margen de la imagen de los ejes que se descarta para no arrastrar los bordes
+TOLERANCIA_BORDE_VENTANA_PX = 6  # Distancia a un borde de la ventana de evaluación que permite arrastrarlo
+DESPLAZAMIENTO_CURSOR_PT = 12  # Separación entre el puntero y el recuadro del cursor
+
+def programar_cuadro():
+    """Agenda el procesamiento del siguiente cuadro si todavía no hay uno pendiente."""
+    global cuadro_programado
+    if not cuadro_programado:
+        cuadro_programado = True
+        canvas.get_tk_widget().after(INTERVALO_CUADRO_MS, procesar_cuadro)
+
+def solicitar_redibujo():
+    """Pide un redibujo completo; varios pedidos en el mismo cuadro producen un solo draw_idle."""
+    global redibujo_pendiente
+    redibujo_pendiente = True
+    programar_cuadro()
+
+@perfilar('cuadro')
+def procesar_cuadro():
+    """Atiende el último evento de movimiento del cuadro y, si se pidió, un único redibujo completo."""
+    global cuadro_programado, evento_pendiente, redibujo_pendiente
+    cuadro_programado = False
+    evento, evento_pendiente = evento_pendiente, None
+    if evento is not None:
+        if zoom_rect is not None and modo_zoom:
+            dibujar_rectangulo_zoom(evento)
+        elif modo_movimiento and inicio_movimiento_px is not None:
+            dibujar_desplazamiento(evento.x - inicio_movimiento_px[0], evento.y - inicio_movimiento_px[1])
+            mostrar_estadisticas_desplazadas(evento.x - inicio_movimiento_px[0])
+        elif arrastre_ventana is not None:
+            dibujar_ventana_arrastrada(evento)
+        elif cursor_activo:
+            dibujar_cursor(evento)
+    if redibujo_pendiente:
+        redibujo_pendiente = False
+        canvas.draw_idle()
+
+def capturar_ejes():
+    """Dibuja la figura completa y guarda la imagen de los ejes para usarla durante el arrastre."""
+    global imagen_ejes
+    canvas.draw()
+    imagen_ejes = canvas.copy_from_bbox(ax.bbox)
+
+def dibujar_rectangulo_zoom(event):
+    """Redibuja solo el rectángulo de zoom sobre la imagen guardada de los ejes."""
+    x0, y0 = zoom_start
+    x1, y1 = event.xdata, event.ydata
+    if x1 < x0:
+        x0, x1 = x1, x0
+    if y1 < y0:
+        y0, y1 = y1, y0
+    zoom_rect.set_width(x1 - x0)
+    zoom_rect.set_height(y1 - y0)
+    zoom_rect.set_xy((x0, y0))
+    canvas.restore_region(imagen_ejes)
+    ax.draw_artist(zoom_rect)
+    canvas.blit(ax.bbox)
+
+def dibujar_desplazamiento(dx, dy):
+    """Muestra la imagen guardada de los ejes desplazada (dx, dy) píxeles, recortada a los ejes."""
+    # Las coordenadas de la región tienen el origen arriba, por eso el eje y se invierte
+    x1, y1, x2, y2 = imagen_ejes.get_extents()
+    fx1 = x1 + BORDE_IMAGEN_PX + max(0, -dx)
+    fx2 = x2 - BORDE_IMAGEN_PX - max(0, dx)
+    fy1 = y1 + BORDE_IMAGEN_PX + max(0, dy)
+    fy2 = y2 - BORDE_IMAGEN_PX - max(0, -dy)
+    ax.draw_artist(ax.patch)  # Limpia el área de los ejes con su color de fondo
+    if fx2 > fx1 and fy2 > fy1:
+        canvas.restore_region(imagen_ejes, bbox=(fx1, fy1, fx2, fy2), xy=(x1 + dx, y1 - dy))
+    for borde in ax.spines.values():
+        ax.draw_artist(borde)
+    canvas.blit(ax.bbox)
+
+def mostrar_estadisticas_desplazadas(dx):
+    """Muestra en el panel las estadísticas del rango que quedará visible al soltar un arrastre de dx píxeles."""
+    if tabla_rango is not None:
+        x0, x1 = ax.get_xlim()
+        desplazamiento = dx * (x1 - x0) / ax.bbox.width
+        mostrar_estadisticas_rango(x0 - desplazamiento, x1 - desplazamiento)
+
+def vertices_ventana(ventana):
+    """Devuelve el rectángulo de la franja de la ventana, en horas en x y en fracción de los ejes en y."""
+    return [[(ventana[0], 0), (ventana[1], 0), (ventana[1], 1), (ventana[0], 1)]]
+
+def actualizar_sombra_ventana():
+    """Crea o mueve la franja sombreada que marca la ventana de evaluación."""
+    global sombra_ventana
+    if sombra_ventana is None:
+        # Una colección no cuenta para el autoescalado, así la franja no agranda la vista
+        sombra_ventana = PolyCollection(vertices_ventana(ventana_evaluacion), transform=ax.get_xaxis_transform(),
+                                        facecolor='green', edgecolor='green', alpha=0.1, zorder=0)
+        ax.add_collection(sombra_ventana, autolim=False)
+    else:
+        sombra_ventana.set_verts(vertices_ventana(ventana_evaluacion))
+
+def empezar_arrastre_ventana(event):
+    """Empieza a mover la ventana de evaluación, o uno de sus bordes si se presionó cerca de él."""
+    global arrastre_ventana
+    borde_inicio, borde_fin = ax.transData.transform([(ventana_evaluacion[0], 0), (ventana_evaluacion[1], 0)])[:, 0]
+    if abs(event.x - borde_inicio) <= TOLERANCIA_BORDE_VENTANA_PX:
+        parte = 'inicio'
+    elif abs(event.x - borde_fin) <= TOLERANCIA_BORDE_VENTANA_PX:
+        parte = 'fin'
+    elif borde_inicio < event.x < borde_fin:
+        parte = 'mover'
+    else:
+        return
+    arrastre_ventana = (parte, event.xdata, ventana_evaluacion)
+
+    # La franja se pinta aparte durante el arrastre, sobre la imagen guardada de los ejes
+    sombra_ventana.set_animated(True)
+    capturar_ejes()
+
+def ventana_arrastrada(event):
+    """Devuelve la ventana de evaluación que resulta de arrastrar hasta la posición del evento."""
+    parte, x_presion, (inicio, fin) = arrastre_ventana
+    # Fuera de los ejes el evento no trae xdata: se convierte desde los píxeles
+    dx = ax.transData.inverted().transform((event.x, event.y))[0] - x_presion
+    ancho_minimo = abs(np.diff(ax.get_xlim())[0]) / max(ax.bbox.width, 1)  # Un píxel
+    if parte == 'inicio':
+        return (min(inicio + dx, fin - ancho_minimo), fin)
+    if parte == 'fin':
+        return (inicio, max(fin + dx, inicio + ancho_minimo))
+    return (inicio + dx, fin + dx)
+
+def conteos_en_ventana(ventana):
+    """Cuenta las muestras válidas y en rango de cada serie en la ventana con el índice de rangos o el del archivo .stm."""
+    if archivo_stm is not None:
+        return contar_en_rango_archivo(archivo_stm, ventana, limites_actuales())
+    tiempo = conjunto_datos.tiempo
+    i0 = int(tiempo.searchsorted(ventana[0], side='left'))
+    i1 = int(tiempo.searchsorted(ventana[1], side='right'))
+    _, validos, en_rango = sumas_de_filas(indice_rango, conjunto_datos.series, i0, i1, limites_actuales())
+    return validos, en_rango
+
+def dibujar_ventana_arrastrada(event):
+    """Mueve la franja de la ventana de evaluación y recolorea las series según el cumplimiento en la ventana nueva."""
+    global conteos_rango, imagen_ejes
+    ventana = ventana_arrastrada(event)
+    sombra_ventana.set_verts(vertices_ventana(ventana))
+    colores = {col: linea.get_color() for col, linea in lineas_series.items()}
+    conteos_rango = conteos_en_ventana(ventana)
+    actualizar_colores_cumplimiento()
+    canvas.restore_region(imagen_ejes)
+
+    # Solo las series que cambiaron de color se repintan, y quedan en la imagen guardada
+    cambiadas = [linea for col, linea in lineas_series.items() if linea.get_color() != colores[col]]
+    if cambiadas:
+        for linea in cambiadas:
+            ax.draw_artist(linea)
+        imagen_ejes = canvas.copy_from_bbox(ax.bbox)
+    ax.draw_artist(sombra_ventana)
+    canvas.blit(ax.bbox)
+
+def terminar_arrastre_ventana(event):
+    """Fija la ventana de evaluación arrastrada y vuelve a dibujar la gráfica completa."""
+    global arrastre_ventana, ventana_evaluacion
+    ventana_evaluacion = ventana_arrastrada(event)
+    arrastre_ventana = None
+    sombra_ventana.set_animated(False)
+    aplicar_ventana_evaluacion()
+
+def muestra_mas_cercana(tiempo, x):
+    """Devuelve la fila cuyo tiempo es el más cercano a x, con una búsqueda binaria (aritmética si el tiempo es uniforme)."""
+    i = int(tiempo.searchsorted(x, side='left'))
+    if i >= len(tiempo):
+        return len(tiempo) - 1
+    if i > 0 and x - tiempo[i - 1] <= tiempo[i] - x:
+        return i - 1
+    return i
+
+def crear_cursor():
+    """Crea la línea vertical, los marcadores y el recuadro del cursor, animados para pintarlos con blitting."""
+    global linea_cursor, marcadores_cursor, texto_cursor
+    # Colecciones y texto no cuentan para el autoescalado, así el cursor no agranda la vista
+    linea_cursor = LineCollection([], colors='gray', linewidths=0.8, transform=ax.get_xaxis_transform(), animated=True)
+    ax.add_collection(linea_cursor, autolim=False)
+    marcadores_cursor = ax.scatter([], [], s=30, edgecolors='white', zorder=3, animated=True)
+    texto_cursor = ax.annotate('', (0, 0), xytext=(0, 0), textcoords='offset points', animated=True, fontsize=9, multialignment='left',
+                               bbox=dict(boxstyle='round', facecolor='white', alpha=0.9))
+
+def guardar_fondo_cursor(_=None):
+    """Guarda la imagen de los ejes después de cada dibujo completo, para pintar el cursor encima."""
+    global imagen_cursor, cursor_visible
+    imagen_cursor = canvas.copy_from_bbox(ax.bbox)
+    cursor_visible = False  # Los artistas animados no entran en el dibujo completo
+
+def dibujar_cursor(event):
+    """Pinta el cursor en la muestra más cercana al puntero con el tiempo y la temperatura de cada serie visible."""
+    global cursor_visible
+    # Con cambios sin dibujar la imagen guardada ya no corresponde a la gráfica
+    if imagen_cursor is None or fig.stale:
+        return
+    if event.inaxes is not ax or not lineas_series:
+        if cursor_visible:
+            canvas.restore_region(imagen_cursor)
+            canvas.blit(ax.bbox)
+            cursor_visible = False
+        return
+
+    tiempo, series = conjunto_datos.tiempo, conjunto_datos.series
+    fila = muestra_mas_cercana(tiempo, event.xdata)
+    t = float(tiempo[fila])
+    columnas = list(lineas_series)
+    valores = np.asarray(series[fila, columnas], dtype=np.float64)
+    validos = ~np.isnan(valores)
+
+    linea_cursor.set_segments([[(t, 0), (t, 1)]])
+    marcadores_cursor.set_offsets(np.column_stack((np.full(validos.sum(), t), valores[validos])))
+    marcadores_cursor.set_facecolors([lineas_series[col].get_color() for col, valido in zip(columnas, validos) if valido])
+    renglones = [f"{t:.2f} h"] + [f"{nombres_columnas[col]}: " + (f"{valor:.2f} °C" if valido else '—')
+                                  for col, valor, valido in zip(columnas, valores, validos)]
+    texto_cursor.set_text('\n'.join(renglones))
+    texto_cursor.xy = (t, event.ydata)
+
+    # El recuadro se pone del lado del puntero con más espacio libre
+    derecha = event.x > ax.bbox.x0 + ax.bbox.width / 2
+    arriba = event.y > ax.bbox.y0 + ax.bbox.height / 2
+    texto_cursor.set_position((-DESPLAZAMIENTO_CURSOR_PT if derecha else DESPLAZAMIENTO_CURSOR_PT,
+                               -DESPLAZAMIENTO_CURSOR_PT if arriba else DESPLAZAMIENTO_CURSOR_PT))
+    texto_cursor.set_horizontalalignment('right' if derecha else 'left')
+    texto_cursor.set_verticalalignment('top' if arriba else 'bottom')
+
+    canvas.restore_region(imagen_cursor)
+    for artista in (linea_cursor, marcadores_cursor, texto_cursor):
+        ax.draw_artist(artista)
+    canvas.blit(ax.bbox)
+    cursor_visible = True
+
+def ocultar_cursor(_=None):
+    """Borra el cursor de la gráfica si está pintado."""
+    global cursor_visible
+    if cursor_visible and imagen_cursor is not None:
+        canvas.restore_region(imagen_cursor)
+        canvas.blit(ax.bbox)
+    cursor_visible = False
+
 # Funciones para manejo de eventos del mouse
+@perfilar('evento_presionar')
 def on_mouse_press(event):
     """Maneja los eventos de presionar el mouse para zoom, movimiento y selección."""
-    global zoom_start, zoom_rect, modo_zoom, modo_movimiento
+    global zoom_start, zoom_rect, modo_zoom, modo_movimiento, inicio_movimiento_px
     if modo_zoom and event.inaxes:
         zoom_start = (event.xdata, event.ydata)
-        zoom_rect = plt.Rectangle((event.xdata, event.ydata), 0, 0, edgecolor='blue', facecolor='none')
+        # El rectángulo es animado: no entra en los redibujos completos, se pinta con blitting
+        zoom_rect = Rectangle((event.xdata, event.ydata), 0, 0, edgecolor='blue', facecolor='none', animated=True)
         event.inaxes.add_patch(zoom_rect)
+        capturar_ejes()
     elif event.inaxes and modo_movimiento:
         zoom_start = (event.xdata, event.ydata)
+        inicio_movimiento_px = (event.x, event.y)
         canvas.get_tk_widget().focus_set()
+        capturar_ejes()
+    elif event.inaxes and modo_ventana and lineas_series:
+        empezar_arrastre_ventana(event)
 
+@perfilar('evento_soltar')
 def on_mouse_release(event):
     """Maneja los eventos de soltar el mouse para aplicar zoom o mover."""
-    global zoom_start, zoom_rect, modo_zoom, modo_movimiento
+    global zoom_start, zoom_rect, modo_zoom, modo_movimiento, inicio_movimiento_px, evento_pendiente
+    evento_pendiente = None  # El redibujo completo reemplaza cualquier movimiento sin procesar
     if modo_zoom and event.inaxes:
         if zoom_rect:
             x0, y0 = zoom_start
@@ -417,45 +3098,42 @@ def on_mouse_release(event):
             ax.set_ylim(y0, y1)
             zoom_rect.remove()
             zoom_rect = None
-            canvas.draw()
+            solicitar_redibujo()
         modo_zoom = None
-    elif modo_movimiento and event.inaxes:
-        if zoom_start is not None:
-            dx = event.xdata - zoom_start[0]
-            dy = event.ydata - zoom_start[1]
-            xlim = ax.get_xlim()
-            ylim = ax.get_ylim()
-            ax.set_xlim(xlim[0] - dx, xlim[1] - dx)
-            ax.set_ylim(ylim[0] - dy, ylim[1] - dy)
-            zoom_start = (event.xdata, event.ydata)
-            canvas.draw()
+    elif modo_movimiento and inicio_movimiento_px is not None:
+        # Aplicar de una vez el desplazamiento total del arrastre, medido en píxeles
+        inversa = ax.transData.inverted()
+        x0, y0 = inversa.transform(inicio_movimiento_px)
+        x1, y1 = inversa.transform((event.x, event.y))
+        dx = x1 - x0
+        dy = y1 - y0
+        xlim = ax.get_xlim()
+        ylim = ax.get_ylim()
+        ax.set_xlim(xlim[0] - dx, xlim[1] - dx)
+        ax.set_ylim(ylim[0] - dy, ylim[1] - dy)
+        zoom_start = None
+        inicio_movimiento_px = None
+        solicitar_redibujo()
         modo_movimiento = False
+    elif arrastre_ventana is not None:
+        terminar_arrastre_ventana(event)
 
+@perfilar('evento_mover')
 def on_mouse_move(event):
-    """Maneja los eventos de mover el mouse para zoom y movimiento."""
-    global zoom_start, zoom_rect, modo_movimiento
+    """Maneja los eventos de mover el mouse para zoom, movimiento, la ventana de evaluación y el cursor."""
+    global evento_pendiente
+    # Solo se guarda el último evento; se dibuja como mucho una vez por cuadro
     if zoom_rect and event.inaxes and modo_zoom:
-        x0, y0 = zoom_start
-        x1, y1 = event.xdata, event.ydata
-        if x1 < x0:
-            x0, x1 = x1, x0
-        if y1 < y0:
-            y0, y1 = y1, y0
-        zoom_rect.set_width(x1 - x0)
-        zoom_rect.set_height(y1 - y0)
-        zoom_rect.set_xy((x0, y0))
-        canvas.draw()
-    elif modo_movimiento and event.inaxes:
-        if zoom_start is not None:
-            dx = event.xdata - zoom_start[0]
-            dy = event.ydata - zoom_start[1]
-            xlim = ax.get_xlim()
-            ylim = ax.get_ylim()
-            ax.set_xlim(xlim[0] - dx, xlim[1] - dx)
-            ax.set_ylim(ylim[0] - dy, ylim[1] - dy)
-            zoom_start = (event.xdata, event.ydata)
-            canvas.draw()
-
+        evento_pendiente = event
+        programar_cuadro()
+    elif (modo_movimiento and inicio_movimiento_px is not None) or arrastre_ventana is not None:
+        evento_pendiente = event
+        programar_cuadro()
+    elif cursor_activo and (event.inaxes or cursor_visible):
+        evento_pendiente = event
+        programar_cuadro()
+
+@perfilar('evento_rueda')
 def on_mouse_scroll(event):
     """Maneja el evento de desplazamiento del mouse para zoom con la tecla Ctrl."""
     global ax, canvas
@@ -477,12 +3155,14 @@ def on_mouse_scroll(event):
         height = (ylim[1] - ylim[0]) * scale
         ax.set_xlim(x_center - width / 2, x_center + width / 2)
         ax.set_ylim(y_center - height / 2, y_center + height / 2)
-        canvas.draw()
+        solicitar_redibujo()
 
 # Funciones para activar y desactivar el movimiento de la gráfica
 def activar_mover():
     """Activa el modo de mover la gráfica con el mouse."""
     global modo_movimiento
+    if modo_ventana:
+        desactivar_modo_ventana()
     modo_movimiento = True
     boton_mover.configure(style='success.TButton')
 
@@ -492,34 +3172,365 @@ def desactivar_mover():
     modo_movimiento = None
     boton_mover.configure(style='default.TButton')
 
+def activar_modo_ventana():
+    """Activa el modo de arrastrar la ventana de evaluación o sus bordes con el mouse."""
+    global modo_ventana
+    if modo_movimiento is not None:
+        desactivar_mover()
+    modo_ventana = True
+    boton_ventana.configure(style='success.TButton')
+
+def desactivar_modo_ventana():
+    """Desactiva el modo de arrastrar la ventana de evaluación."""
+    global modo_ventana
+    modo_ventana = None
+    boton_ventana.configure(style='default.TButton')
+
+def alternar_cursor():
+    """Muestra u oculta el cursor con la lectura de las series bajo el puntero."""
+    global cursor_activo
+    cursor_activo = not cursor_activo
+    if not cursor_activo and canvas is not None:
+        ocultar_cursor()
+    boton_cursor.configure(style='success.TButton' if cursor_activo else 'default.TButton')
+
 # Función para crear el menú de opciones
 def crear_menu_opciones():
     """Crea el menú de opciones para cargar datos, cambiar nombre y configurar líneas punteadas."""
     menu_opciones = tk.Menu(root, tearoff=0)
     menu_opciones.add_command(label="Cargar Datos TXT", command=cargar_datos)
+    menu_opciones.add_command(label="Seguir Archivo TXT en Vivo", command=alternar_seguimiento)
     menu_opciones.add_command(label="Seleccionar y Procesar CSV", command=seleccionar_y_procesar_csv)
+    menu_opciones.add_command(label="Convertir TXT/CSV a STM", command=convertir_archivo_stm)
     menu_opciones.add_command(label="Cambiar Nombre", command=cambiar_nombre_columna)
     menu_opciones.add_command(label="Configurar Líneas Punteadas", command=configurar_lineas_punteadas)
+    menu_opciones.add_command(label="Configurar Ventana de Evaluación", command=configurar_ventana_evaluacion)
+    menu_opciones.add_command(label="Métricas de Excursión", command=mostrar_metricas_excursion)
+    if perfilado_activo:
+        menu_opciones.add_command(label="Guardar Perfil", command=guardar_perfil_desde_menu)
     return menu_opciones
 
-# Función principal para iniciar la aplicación
-def main():
-    global root, frame_grafica, frame_toolbar, lista_columnas, canvas
-    global boton_zoom_in, boton_zoom_out, boton_reset, boton_guardar, boton_mover
-    global modo_zoom, modo_movimiento, min_punteado, max_punteado
-
-    root = ttk.Window(themename="cyborg")
-    root.title("Gráfico de Datos")
+# Evaluación por lotes sin interfaz gráfica
+COLUMNAS_REPORTE = ['archivo', 'serie', 'muestras', 'porcentaje_en_rango', 'cumple', 'tiempo_lectura_s', 'tiempo_calculo_s', 'error']
+
+def buscar_archivos_datos(carpeta, recursivo=False):
+    """Devuelve, ordenados, los archivos de datos de una carpeta (.txt, .csv, .stm, .npy y .npz, también comprimidos)."""
+    if recursivo:
+        rutas = []
+        for raiz, carpetas, nombres in os.walk(carpeta):
+            # Las carpetas ocultas (como los .stm_cache de versiones anteriores) no contienen datos del usuario
+            carpetas[:] = [nombre for nombre in carpetas if not nombre.startswith('.')]
+            rutas += [os.path.join(raiz, nombre) for nombre in nombres]
+    else:
+        rutas = [os.path.join(carpeta, nombre) for nombre in os.listdir(carpeta)]
+    return sorted(ruta for ruta in rutas if os.path.isfile(ruta) and extension_datos(ruta)[0] in EXTENSIONES_DATOS)
+
+def ejecutar_lote(carpeta, salida='-', formato='csv', procesos=None, recursivo=False, usar_cache=True,
+                  ventana=VENTANA_EVALUACION, limites=LIMITES_TEMPERATURA, umbral=UMBRAL_CUMPLIMIENTO):
+    """Evalúa todos los archivos de una carpeta en varios procesos y escribe el reporte a medida que avanza."""
+    archivos = buscar_archivos_datos(carpeta, recursivo)
+    evaluar = partial(evaluar_archivo, ventana=ventana, limites=limites, umbral=umbral, usar_cache=usar_cache)
+
+    destino = sys.stdout if salida == '-' else open(salida, 'w', newline='', encoding='utf-8')
+    total_series = fallidas = errores = 0
+    inicio = time.perf_counter()
+    try:
+        if formato == 'csv':
+            escritor = csv.DictWriter(destino, fieldnames=COLUMNAS_REPORTE)
+            escritor.writeheader()
+        else:
+            destino.write('[')
+        primera = True
+
+        # map conserva el orden de los archivos y entrega cada resultado apenas está listo
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for filas in ejecutor.map(evaluar, archivos, chunksize=max(1, len(archivos) // (8 * (procesos or os.cpu_count() or 1)))):
+                for fila in filas:
+                    total_series += 1
+                    errores += bool(fila['error'])
+                    fallidas += not fila['cumple']
+                    if formato == 'csv':
+                        escritor.writerow(fila)
+                    else:
+                        destino.write(('\n' if primera else ',\n') + json.dumps(fila, ensure_ascii=False))
+                    primera = False
+                destino.flush()
+
+        if formato != 'csv':
+            destino.write('\n]\n')
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+
+    print(f"{len(archivos)} archivos, {total_series} series: {total_series - fallidas} cumplen, "
+          f"{fallidas} no cumplen ({errores} con error) en {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+    return 0 if fallidas == 0 else 1
+
+# Gráficas por lotes sin interfaz: cada proceso dibuja con Agg en una sola figura que limpia y
+# reutiliza de un archivo al siguiente, con el mismo estilo que la gráfica de la interfaz (series
+# verdes si cumplen, líneas de límite y marcas en horas y °C). Se escribe un índice con la imagen,
+# las series que cumplen y el tiempo de cada archivo.
+TAMANO_FIGURA = (10, 6)  # Pulgadas
+FORMATOS_GRAFICA = ('png', 'pdf')
+COLUMNAS_INDICE_GRAFICAS = ['archivo', 'imagenes', 'series', 'series_cumplen', 'tiempo_s', 'error']
+figura_lote = None  # Figura y ejes que reutiliza cada proceso de dibujo por lotes
+
+def ejes_de_lote():
+    """Devuelve los ejes de la figura del proceso, ya limpios; la figura se crea la primera vez."""
+    global figura_lote
+    if figura_lote is None:
+        figura = Figure(figsize=TAMANO_FIGURA)
+        FigureCanvasAgg(figura)
+        figura_lote = (figura, figura.add_subplot())
+    figura, ejes = figura_lote
+    ejes.cla()
+    return figura, ejes
+
+def dibujar_grafica_lote(ejes, conjunto, nombres, porcentajes, limites, umbral, archivo=None):
+    """Dibuja todas las series de un archivo reducidas al ancho de los ejes, con el estilo de la interfaz."""
+    tiempo, series = conjunto.tiempo, conjunto.series
+    coleccion = estilizar_ejes(ejes)
+    ancho_px = ejes.bbox.width
+    for col, nombre in enumerate(nombres):
+        if archivo is not None:
+            indices = indices_visibles_archivo(archivo, col, -np.inf, np.inf, ancho_px)
+        else:
+            indices = indices_visibles(construir_piramide_minmax(series[:, col]), tiempo, -np.inf, np.inf, ancho_px)
+        ejes.plot(tiempo[indices], series[indices, col], label=nombre, color=color_serie(col, porcentajes[col], umbral))
+    agregar_linea_limite(ejes, limites[0], 'Mínimo')
+    agregar_linea_limite(ejes, limites[1], 'Máximo')
+    ejes.autoscale_view()
+    ajustar_cuadricula(ejes, coleccion)
+    ejes.legend(loc='upper right')
+
+def graficar_archivo(ruta, carpeta, carpeta_salida, formatos=('png',), dpi=100, ventana=VENTANA_EVALUACION,
+                     limites=LIMITES_TEMPERATURA, umbral=UMBRAL_CUMPLIMIENTO, usar_cache=True):
+    """Dibuja la gráfica de un archivo de datos, la guarda en cada formato y devuelve su fila del índice."""
+    inicio = time.perf_counter()
+    fila = {'archivo': ruta, 'imagenes': '', 'series': 0, 'series_cumplen': 0, 'tiempo_s': 0, 'error': ''}
+    try:
+        if extension_datos(ruta)[0] == '.stm':
+            # Del archivo .stm solo se leen el índice y los bloques con pocas muestras por píxel
+            archivo = abrir_archivo_stm(ruta)
+            conjunto, nombres = conjunto_de_archivo_stm(archivo), archivo['nombres']
+            porcentajes = porcentaje_desde_conteos(*contar_en_rango_archivo(archivo, ventana, limites))
+        else:
+            archivo = None
+            conjunto, nombres = leer_archivo_datos(ruta, usar_cache=usar_cache)
+            porcentajes = calcular_porcentaje_en_rango(conjunto.tiempo, conjunto.series, ventana, limites)
+
+        figura, ejes = ejes_de_lote()
+        ejes.set_title(os.path.relpath(ruta, carpeta))
+        dibujar_grafica_lote(ejes, conjunto, nombres, porcentajes, limites, umbral, archivo)
+
+        # Las subcarpetas y el nombre completo (con su extensión) se repiten en la salida: d0.txt y
+        # d0.stm de una misma carpeta quedan en d0.txt.png y d0.stm.png
+        base = os.path.join(carpeta_salida, os.path.relpath(ruta, carpeta))
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        imagenes = [f"{base}.{formato}" for formato in formatos]
+        for imagen in imagenes:
+            figura.savefig(imagen, dpi=dpi)
+        fila.update(imagenes=';'.join(imagenes), series=len(nombres), series_cumplen=int(np.sum(porcentajes >= umbral)))
+    except Exception as e:
+        fila['error'] = str(e)
+    fila['tiempo_s'] = round(time.perf_counter() - inicio, 6)
+    return fila
+
+def ejecutar_graficas_lote(carpeta, carpeta_salida='graficas', formatos=('png',), dpi=100, procesos=None, recursivo=False,
+                           usar_cache=True, ventana=VENTANA_EVALUACION, limites=LIMITES_TEMPERATURA, umbral=UMBRAL_CUMPLIMIENTO):
+    """Dibuja en varios procesos la gráfica de cada archivo de una carpeta y escribe el índice a medida que avanza."""
+    archivos = buscar_archivos_datos(carpeta, recursivo)
+    graficar = partial(graficar_archivo, carpeta=carpeta, carpeta_salida=carpeta_salida, formatos=formatos, dpi=dpi,
+                       ventana=ventana, limites=limites, umbral=umbral, usar_cache=usar_cache)
+
+    os.makedirs(carpeta_salida, exist_ok=True)
+    errores = 0
+    inicio = time.perf_counter()
+    with open(os.path.join(carpeta_salida, 'indice.csv'), 'w', newline='', encoding='utf-8') as destino:
+        escritor = csv.DictWriter(destino, fieldnames=COLUMNAS_INDICE_GRAFICAS)
+        escritor.writeheader()
+
+        # Cada archivo es una tarea independiente: el rendimiento crece con la cantidad de núcleos
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for fila in ejecutor.map(graficar, archivos, chunksize=max(1, len(archivos) // (8 * (procesos or os.cpu_count() or 1)))):
+                errores += bool(fila['error'])
+                escritor.writerow(fila)
+                destino.flush()
+
+    print(f"{len(archivos)} gráficas en {carpeta_salida} ({errores} con error) en {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+    return 0 if errores == 0 else 1
+
+def analizar_argumentos(argv=None):
+    """Interpreta los argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Monitor de estabilidad de temperatura. Sin argumentos abre la interfaz gráfica.")
+    parser.add_argument('--lote', metavar='CARPETA', help="evalúa sin interfaz todos los archivos de datos (.txt/.csv/.stm/.npy/.npz) de la carpeta")
+    parser.add_argument('--convertir', nargs=2, metavar=('ORIGEN', 'DESTINO'), help="convierte un archivo de datos al formato de la extensión del destino (.stm, .npy, .npz, .txt, .csv; .gz o .zst para comprimir)")
+    parser.add_argument('--graficar', metavar='CARPETA', help="dibuja sin interfaz una gráfica por cada archivo de datos de la carpeta")
+    parser.add_argument('--salida', default=None, help="archivo del reporte (por defecto, la salida estándar) o, con --graficar, carpeta de las imágenes (por defecto, graficas)")
+    parser.add_argument('--formatos', nargs='+', choices=FORMATOS_GRAFICA, default=['png'], help="formatos de las gráficas")
+    parser.add_argument('--dpi', type=int, default=100, help="resolución de las gráficas en puntos por pulgada")
+    parser.add_argument('--formato', choices=['csv', 'json'], default='csv', help="formato del reporte")
+    parser.add_argument('--procesos', type=int, default=None, help="cantidad de procesos (por defecto, todos los núcleos)")
+    parser.add_argument('--recursivo', action='store_true', help="incluye las subcarpetas")
+    parser.add_argument('--sin-cache', action='store_true', help="no crea ni usa el caché binario de los .txt")
+    parser.add_argument('--ventana', nargs=2, type=float, default=VENTANA_EVALUACION, metavar=('INICIO', 'FIN'), help="ventana de evaluación en horas")
+    parser.add_argument('--limites', nargs=2, type=float, default=LIMITES_TEMPERATURA, metavar=('MIN', 'MAX'), help="límites de temperatura en °C")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_CUMPLIMIENTO, help="fracción mínima de muestras en rango para cumplir")
+    parser.add_argument('--perfilar', nargs='?', const='fases', choices=['fases', 'cprofile'],
+                        help="mide la duración de cada fase (también con STM_PERFILAR=1 o STM_PERFILAR=cprofile)")
+    parser.add_argument('--perfil-salida', default='perfil_stm', metavar='PREFIJO', help="prefijo de los archivos del perfil")
+    parser.add_argument('--medir-inicio', action='store_true',
+                        help="informa el tiempo de importación de cada módulo (como -X importtime) y cuánto tarda en aparecer la ventana")
+    return parser.parse_args(argv)
+
+# Arranque: pandas se importa solo al leer CSV, pegar en la tabla o exportar, pyplot no se usa, el
+# lienzo de Tk se importa al crear la figura y la sección de ingreso manual se construye la primera
+# vez que se muestra. Con --medir-inicio se informa cuánto tarda cada importación, medido como con
+# python -X importtime en un intérprete nuevo, y cuánto tarda en aparecer la ventana.
+MODULOS_DIFERIDOS = ('pandas', 'matplotlib.pyplot', 'matplotlib.backends.backend_tkagg')
+IMPORTACIONES_INFORME = 15  # Importaciones directas más lentas que se listan
+
+def medir_importacion():
+    """Importa el programa en un intérprete nuevo con -X importtime y devuelve (módulo, propio_us, acumulado_us) por módulo."""
+    carpeta, archivo = os.path.split(os.path.abspath(__file__))
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {os.path.splitext(archivo)[0]}'],
+                             cwd=carpeta, capture_output=True, text=True, check=True)
+    modulos = []
+    for linea in proceso.stderr.splitlines():
+        # Cada línea es "import time: propio | acumulado | módulo", con el módulo sangrado según la profundidad
+        campos = linea.removeprefix('import time:').split('|')
+        if len(campos) == 3 and campos[0].strip().isdigit():
+            modulos.append((campos[2].rstrip(), int(campos[0]), int(campos[1])))
+    return modulos
+
+def informe_importacion(modulos, cantidad=IMPORTACIONES_INFORME):
+    """Devuelve las líneas del informe: el total, las importaciones directas más lentas y si se cargaron los módulos diferidos."""
+    programa = os.path.splitext(os.path.basename(__file__))[0]
+    posicion = next(i for i in reversed(range(len(modulos))) if modulos[i][0].strip() == programa)
+    total = modulos[posicion][2]
+    # Cada módulo aparece después de lo que importa: las importaciones directas del programa son las
+    # de un nivel más de sangría entre el módulo anterior de primer nivel y el programa
+    directas = []
+    for nombre, propio, acumulado in reversed(modulos[:posicion]):
+        sangria = len(nombre) - len(nombre.lstrip())
+        if sangria <= 1:
+            break
+        if sangria == 3:
+            directas.append((nombre, propio, acumulado))
+    directas.sort(key=lambda modulo: modulo[2], reverse=True)
+    cargados = {nombre.strip() for nombre, _, _ in modulos}
+
+    lineas = [f"Importación de {programa}: {total / 1000:.1f} ms", f"{'propio':>10} | {'acumulado':>10} | módulo"]
+    lineas += [f"{propio / 1000:7.1f} ms | {acumulado / 1000:7.1f} ms | {nombre.strip()}" for nombre, propio, acumulado in directas[:cantidad]]
+    lineas += [f"{modulo}: {'se carga al iniciar' if modulo in cargados else 'diferido'}" for modulo in MODULOS_DIFERIDOS]
+    return lineas
+
+def informar_primera_ventana():
+    """Informa cuánto tardó en aparecer la ventana desde que empezó a cargarse el programa y el tiempo de cada importación."""
+    root.update_idletasks()
+    print(f"Primera ventana: {(time.perf_counter() - inicio_programa) * 1000:.1f} ms desde el inicio del programa")
+    if perfilado_activo:
+        registrar_fase('primera_ventana', inicio_programa)
+    # Se mide después de que aparece la ventana para no sumarlo al tiempo anterior
+    print('\n'.join(informe_importacion(medir_importacion())))
 
-    root.configure(bg="white")
+# Función principal para iniciar la aplicación
+def main(argv=None):
+    """Convierte, evalúa o grafica por lotes si se pidió; si no, abre la interfaz gráfica."""
+    args = analizar_argumentos(argv)
+    modo_perfilado = args.perfilar or os.environ.get('STM_PERFILAR', '')
+    if modo_perfilado not in ('', '0'):
+        activar_perfilado(modo_perfilado)
+    try:
+        return ejecutar_comando(args)
+    finally:
+        if perfilado_activo:
+            guardar_perfil(args.perfil_salida)
+
+def ejecutar_comando(args):
+    """Ejecuta la conversión, la evaluación o las gráficas por lotes, o la interfaz gráfica, según los argumentos."""
+    if args.convertir:
+        try:
+            convertir_archivo_datos(*args.convertir)
+        except Exception as e:
+            print(f"No se pudo convertir {args.convertir[0]}: {e}", file=sys.stderr)
+            return 1
+        return 0
+    if args.graficar:
+        return ejecutar_graficas_lote(args.graficar, carpeta_salida=args.salida or 'graficas', formatos=tuple(args.formatos),
+                                      dpi=args.dpi, procesos=args.procesos, recursivo=args.recursivo, usar_cache=not args.sin_cache,
+                                      ventana=tuple(args.ventana), limites=tuple(args.limites), umbral=args.umbral)
+    if args.lote:
+        return ejecutar_lote(args.lote, salida=args.salida or '-', formato=args.formato, procesos=args.procesos,
+                             recursivo=args.recursivo, usar_cache=not args.sin_cache, ventana=tuple(args.ventana),
+                             limites=tuple(args.limites), umbral=args.umbral)
+    iniciar_interfaz(medir_inicio=args.medir_inicio)
+    return 0
+
+def inicializar_estado():
+    """Inicializa el estado de la gráfica, de los modos y del seguimiento, sin crear widgets."""
+    global canvas, fig, ax, lineas_series, lineas_limite, cuadricula, piramides_lod, indice_rango
+    global modo_zoom, modo_movimiento, modo_ventana, min_punteado, max_punteado, ventana_evaluacion
+    global zoom_start, zoom_rect, inicio_movimiento_px, imagen_ejes, arrastre_ventana, sombra_ventana
+    global tabla_rango, etiqueta_rango, cursor_activo, cursor_visible, imagen_cursor, linea_cursor, marcadores_cursor, texto_cursor
+    global evento_pendiente, cuadro_programado, redibujo_pendiente
+    global archivo_seguido, posicion_seguimiento, resto_seguimiento, id_seguimiento, conteos_rango, archivo_stm, cache_analisis
 
     # Inicializar variables
     modo_zoom = None
     modo_movimiento = None
+    modo_ventana = None
     zoom_start = None
     zoom_rect = None
+    inicio_movimiento_px = None  # Posición en píxeles donde empezó el arrastre de movimiento
+    imagen_ejes = None  # Imagen de los ejes guardada al empezar un arrastre
+    arrastre_ventana = None  # (parte arrastrada, hora presionada, ventana inicial) al arrastrar la ventana de evaluación
+    cursor_activo = True  # Mostrar el cursor con la lectura de las series al pasar el mouse
+    cursor_visible = False
+    imagen_cursor = None  # Imagen de los ejes del último dibujo completo, sin el cursor
+    linea_cursor = None
+    marcadores_cursor = None
+    texto_cursor = None
+    evento_pendiente = None  # Último evento de movimiento aún no dibujado
+    cuadro_programado = False
+    redibujo_pendiente = False
     min_punteado = 2  # Valor inicial para la línea punteada mínima
     max_punteado = 8  # Valor inicial para la línea punteada máxima
+    ventana_evaluacion = VENTANA_EVALUACION  # Horas de inicio y fin de la evaluación de estabilidad
+
+    canvas = None
+    fig = None
+    ax = None
+    lineas_series = {}  # Línea de cada columna graficada, indexada por columna
+    lineas_limite = {}  # Líneas punteadas de mínimo y máximo
+    cuadricula = None  # Colección con las líneas de la cuadrícula mayor y menor
+    piramides_lod = {}  # Pirámide min/max de nivel de detalle de cada columna graficada
+    indice_rango = None  # Sumas acumuladas por bloque para las estadísticas de un rango de filas
+    sombra_ventana = None  # Franja que marca la ventana de evaluación
+    tabla_rango = None  # Panel de estadísticas del rango visible; sin interfaz no existe
+    etiqueta_rango = None
+    archivo_stm = None  # Archivo .stm abierto, si los datos graficados vienen de uno
+    conteos_rango = None  # Muestras válidas y en rango por serie, acumuladas para el seguimiento en vivo
+    cache_analisis = collections.OrderedDict()  # Resultados de análisis recientes, del menos al más usado
+
+    # Estado del seguimiento en vivo de un archivo .txt
+    archivo_seguido = None
+    posicion_seguimiento = 0
+    resto_seguimiento = b''
+    id_seguimiento = None
+
+def iniciar_interfaz(medir_inicio=False):
+    """Construye la ventana principal y entra al ciclo de eventos de Tk."""
+    global root, frame_grafica, frame_toolbar, lista_columnas, frame_ingreso_datos
+    global boton_zoom_in, boton_zoom_out, boton_reset, boton_guardar, boton_mover, boton_ventana, boton_cursor
+    global ejecutor_tareas, tarea_en_curso, barra_progreso, etiqueta_progreso, boton_cancelar
+
+    root = ttk.Window(themename="cyborg")
+    root.title("Gráfico de Datos")
+
+    root.configure(bg="white")
+
+    inicializar_estado()
 
     # Crear frame para la barra de herramientas
     frame_toolbar = ttk.Frame(root, padding="10")
@@ -544,12 +3555,21 @@ def main():
     boton_mover = ttk.Button(frame_toolbar, text="Mover Gráfica", command=lambda: activar_mover() if modo_movimiento is None else desactivar_mover(), style='default.TButton')
     boton_mover.pack(side=tk.LEFT, padx=5)
 
+    boton_ventana = ttk.Button(frame_toolbar, text="Mover Ventana", command=lambda: activar_modo_ventana() if modo_ventana is None else desactivar_modo_ventana(), style='default.TButton')
+    boton_ventana.pack(side=tk.LEFT, padx=5)
+
+    boton_cursor = ttk.Button(frame_toolbar, text="Cursor", command=alternar_cursor, style='success.TButton')
+    boton_cursor.pack(side=tk.LEFT, padx=5)
+
     # Nuevo botón para mostrar/ocultar la sección de ingreso de datos
     boton_ingresar_datos = ttk.Button(frame_toolbar, text="Ingresar Datos", command=toggle_seccion_ingreso_datos, style='default.TButton')
     boton_ingresar_datos.pack(side=tk.LEFT, padx=5)
 
     menu_opciones = crear_menu_opciones()
 
+    # Panel de estadísticas del rango visible; se empaca antes que la gráfica para que siempre tenga lugar
+    crear_panel_rango()
+
     # Crear frame para la gráfica
     frame_grafica = ttk.Frame(root, padding="10")
     frame_grafica.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
@@ -558,11 +3578,24 @@ def main():
     lista_columnas = ttk.Combobox(frame_toolbar, state='readonly')
     lista_columnas.pack(side=tk.LEFT, padx=5)
 
-    canvas = None
+    # Progreso de la tarea en segundo plano; solo se muestra mientras hay una en curso
+    ejecutor_tareas = ThreadPoolExecutor(max_workers=1)
+    tarea_en_curso = None
+    boton_cancelar = ttk.Button(frame_toolbar, text="Cancelar", command=cancelar_tarea_en_curso, style='default.TButton')
+    barra_progreso = ttk.Progressbar(frame_toolbar, length=160, maximum=100)
+    etiqueta_progreso = ttk.Label(frame_toolbar)
+    root.protocol("WM_DELETE_WINDOW", cerrar_ventana)
+
+    if perfilado_activo:
+        crear_indicador_perfilado()
+
+    # La sección de ingreso manual se construye la primera vez que se muestra
+    frame_ingreso_datos = None
 
-    crear_seccion_ingreso_datos()  # Crear la sección de ingreso de datos manual
+    if medir_inicio:
+        root.after_idle(informar_primera_ventana)
 
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
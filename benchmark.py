@@ -0,0 +1,424 @@
+"""Mide tiempos y memoria de StableTempMonitor con datos sintéticos de registradores, sin pantalla.
+
+Cada fase (lectura, cálculo, dibujo con Agg, eventos del mouse y exportación) corre en un proceso
+aparte para medir su memoria pico y poder cortarla si tarda demasiado. Los resultados se guardan
+en un archivo JSON para comparar entre commits:
+
+    python benchmark.py --salida resultados.json
+    python benchmark.py --filas 1000 100000 --series 1 5 --fases lectura_txt dibujo_completo
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import StableTempMonitor as stm
+
+FILAS = [1000, 10000, 100000, 1000000, 10000000]
+SERIES = [1, 5, 20]
+FILAS_POR_BLOQUE_GENERACION = 262144
+EVENTOS_POR_ARRASTRE = 50
+EVENTOS_RUEDA = 20
+CONSULTAS_RANGO = 200
+CARPETA_DATOS = os.path.join(tempfile.gettempdir(), 'stm_benchmark')
+
+def generar_txt(ruta, filas, series, semilla=0):
+    """Escribe un .txt como el de un registrador: ciclo diario, deriva semanal, ruido y excursiones periódicas."""
+    rng = np.random.default_rng(semilla)
+    fase_diaria = rng.uniform(0, 2 * np.pi, series)
+    fase_semanal = rng.uniform(0, 2 * np.pi, series)
+    periodo_excursion = rng.integers(300, 3000, series)
+    desfase_excursion = rng.integers(0, 3000, series)
+
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w') as f:
+        for inicio in range(0, filas, FILAS_POR_BLOQUE_GENERACION):
+            fila = np.arange(inicio, min(inicio + FILAS_POR_BLOQUE_GENERACION, filas))[:, np.newaxis]
+            horas = fila * 0.08
+            valores = (5 + 1.5 * np.sin(2 * np.pi * horas / 24 + fase_diaria)
+                       + 0.7 * np.sin(2 * np.pi * horas / 168 + fase_semanal)
+                       + rng.normal(0, 0.3, (len(fila), series)))
+            # Excursiones de 20 muestras, alternando por encima de 8 °C y por debajo de 2 °C
+            ciclo = fila + desfase_excursion
+            en_excursion = ciclo % periodo_excursion < 20
+            signo = np.where((ciclo // periodo_excursion) % 2 == 0, 1.0, -1.0)
+            valores += np.where(en_excursion, 5 * signo, 0)
+            np.savetxt(f, valores, delimiter='\t', fmt='%0.1f')
+    os.replace(temporal, ruta)
+
+def preparar_datos(carpeta, filas, series, regenerar=False):
+    """Genera, si hace falta, el .txt y el .stm de un caso y devuelve sus rutas."""
+    os.makedirs(carpeta, exist_ok=True)
+    ruta_txt = os.path.join(carpeta, f'datos_{filas}x{series}.txt')
+    ruta_stm = os.path.join(carpeta, f'datos_{filas}x{series}.stm')
+    if regenerar or not os.path.exists(ruta_txt):
+        generar_txt(ruta_txt, filas, series)
+        if os.path.exists(ruta_stm):
+            os.remove(ruta_stm)
+    if not os.path.exists(ruta_stm):
+        stm.convertir_archivo_datos(ruta_txt, ruta_stm)
+    return ruta_txt, ruta_stm
+
+def memoria_pico_mb():
+    """Devuelve la memoria residente máxima del proceso hasta ahora, en MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def cronometrar(funcion, repeticiones):
+    """Ejecuta la función varias veces y devuelve la duración de cada ejecución en segundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+# Dibujo sin pantalla: el lienzo Agg imita lo poco que la aplicación usa del widget de Tk, y los
+# cuadros agendados con after se atienden a mano justo después de cada evento.
+class LienzoSinPantalla(FigureCanvasAgg):
+    """Lienzo Agg con los métodos del widget de Tk que usan los manejadores del mouse."""
+
+    def __init__(self, figura):
+        super().__init__(figura)
+        self.agendados = []
+
+    def get_tk_widget(self):
+        return self
+
+    def after(self, ms, funcion):
+        self.agendados.append(funcion)
+
+    def focus_set(self):
+        pass
+
+    def atender_agendados(self):
+        while self.agendados:
+            self.agendados.pop(0)()
+
+def preparar_grafica(conjunto, archivo_stm=None):
+    """Deja la aplicación lista para dibujar los datos en una figura Agg, como lo haría cargar_datos."""
+    stm.inicializar_estado()
+    stm.fig = Figure(figsize=stm.TAMANO_FIGURA)
+    stm.ax = stm.fig.add_subplot()
+    stm.canvas = LienzoSinPantalla(stm.fig)
+    stm.configurar_ejes()
+    stm.canvas.mpl_connect('draw_event', stm.guardar_fondo_cursor)
+    stm.archivo_stm = archivo_stm
+    stm.conjunto_datos = conjunto
+    stm.num_columnas = conjunto.series.shape[1]
+    stm.seleccion_columnas = list(range(stm.num_columnas))
+    stm.nombres_columnas = [f"Serie {i+1}" for i in range(stm.num_columnas)]
+
+def evento_mouse(nombre, x, y, **kwargs):
+    """Crea un evento del mouse en la posición (x, y) en píxeles del lienzo."""
+    return MouseEvent(nombre, stm.canvas, x, y, **kwargs)
+
+def centro_ejes():
+    """Devuelve el centro de los ejes en píxeles."""
+    x0, y0, ancho, alto = stm.ax.bbox.bounds
+    return x0 + ancho / 2, y0 + alto / 2
+
+def despachar(manejador, evento):
+    """Llama al manejador y atiende el cuadro que haya agendado, como lo haría Tk."""
+    manejador(evento)
+    stm.canvas.atender_agendados()
+
+# Fases: cada una recibe las rutas del caso y las repeticiones, prepara lo que necesita y
+# devuelve, por métrica, la lista de duraciones medidas.
+def fase_lectura_txt(ruta_txt, ruta_stm, repeticiones):
+    return {'lectura_txt': cronometrar(lambda: stm.leer_datos_txt(ruta_txt, usar_cache=False), repeticiones)}
+
+def fase_cache_primera_carga(ruta_txt, ruta_stm, repeticiones):
+    def cargar_sin_cache():
+        ruta_cache = stm.ruta_cache_datos(ruta_txt)
+        if os.path.exists(ruta_cache):
+            os.remove(ruta_cache)
+        stm.leer_datos_txt(ruta_txt)
+    return {'cache_primera_carga': cronometrar(cargar_sin_cache, repeticiones)}
+
+def fase_cache_reabrir(ruta_txt, ruta_stm, repeticiones):
+    stm.leer_datos_txt(ruta_txt)
+    return {'cache_reabrir': cronometrar(lambda: stm.leer_datos_txt(ruta_txt), repeticiones)}
+
+def fase_stm_abrir(ruta_txt, ruta_stm, repeticiones):
+    return {'stm_abrir': cronometrar(lambda: stm.abrir_archivo_stm(ruta_stm), repeticiones)}
+
+def fase_porcentaje_en_rango(ruta_txt, ruta_stm, repeticiones):
+    conjunto = stm.leer_datos_txt(ruta_txt)
+    return {'porcentaje_en_rango': cronometrar(lambda: stm.calcular_porcentaje_en_rango(conjunto.tiempo, conjunto.series), repeticiones)}
+
+def fase_conteo_stm(ruta_txt, ruta_stm, repeticiones):
+    archivo = stm.abrir_archivo_stm(ruta_stm)
+    return {'conteo_stm': cronometrar(lambda: stm.contar_en_rango_archivo(archivo), repeticiones)}
+
+def fase_metricas_excursion(ruta_txt, ruta_stm, repeticiones):
+    conjunto = stm.leer_datos_txt(ruta_txt)
+    return {'metricas_excursion': cronometrar(
+        lambda: stm.calcular_metricas_excursion(conjunto.tiempo, conjunto.series, stm.VENTANA_EVALUACION, stm.LIMITES_TEMPERATURA), repeticiones)}
+
+def fase_dibujo_completo(ruta_txt, ruta_stm, repeticiones):
+    preparar_grafica(stm.leer_datos_txt(ruta_txt))
+    def dibujar():
+        stm.actualizar_grafica()
+        stm.canvas.draw()
+    tiempos = cronometrar(dibujar, repeticiones)
+    ruta_png = os.path.join(tempfile.gettempdir(), f'stm_benchmark_{os.getpid()}.png')
+    try:
+        tiempos_png = cronometrar(lambda: stm.fig.savefig(ruta_png), repeticiones)
+    finally:
+        if os.path.exists(ruta_png):
+            os.remove(ruta_png)
+    return {'dibujo_completo': tiempos, 'guardar_png': tiempos_png}
+
+def fase_dibujo_stm(ruta_txt, ruta_stm, repeticiones):
+    archivo = stm.abrir_archivo_stm(ruta_stm)
+    preparar_grafica(stm.conjunto_de_archivo_stm(archivo), archivo)
+    def dibujar():
+        stm.actualizar_grafica()
+        stm.canvas.draw()
+    return {'dibujo_stm': cronometrar(dibujar, repeticiones)}
+
+def fase_grafica_lote(ruta_txt, ruta_stm, repeticiones):
+    # La figura del proceso se crea en la primera llamada y las siguientes la reutilizan, como en un lote
+    carpeta_salida = tempfile.mkdtemp(prefix='stm_benchmark_')
+    try:
+        metricas = {}
+        for nombre, ruta in (('grafica_lote_txt', ruta_txt), ('grafica_lote_stm', ruta_stm)):
+            stm.graficar_archivo(ruta, os.path.dirname(ruta), carpeta_salida)
+            metricas[nombre] = cronometrar(lambda: stm.graficar_archivo(ruta, os.path.dirname(ruta), carpeta_salida), repeticiones)
+        return metricas
+    finally:
+        shutil.rmtree(carpeta_salida, ignore_errors=True)
+
+def fase_interaccion(ruta_txt, ruta_stm, repeticiones):
+    preparar_grafica(stm.leer_datos_txt(ruta_txt))
+    stm.actualizar_grafica()
+    stm.canvas.draw()
+    x, y = centro_ejes()
+    metricas = {nombre: [] for nombre in ('arrastre_movimiento', 'arrastre_soltar', 'zoom_rectangulo', 'zoom_soltar', 'zoom_rueda',
+                                          'arrastre_ventana', 'ventana_soltar', 'cursor')}
+
+    for _ in range(repeticiones):
+        # Arrastre para mover: cada evento de movimiento desplaza la imagen guardada
+        stm.modo_movimiento = True
+        despachar(stm.on_mouse_press, evento_mouse('button_press_event', x, y, button=1))
+        for paso in range(1, EVENTOS_POR_ARRASTRE + 1):
+            evento = evento_mouse('motion_notify_event', x + 2 * paso, y + paso)
+            metricas['arrastre_movimiento'] += cronometrar(lambda: despachar(stm.on_mouse_move, evento), 1)
+        evento = evento_mouse('button_release_event', x + 2 * EVENTOS_POR_ARRASTRE, y + EVENTOS_POR_ARRASTRE, button=1)
+        metricas['arrastre_soltar'] += cronometrar(lambda: despachar(stm.on_mouse_release, evento), 1)
+
+        # Zoom con rectángulo: cada evento de movimiento redibuja solo el rectángulo
+        stm.modo_zoom = 'in'
+        despachar(stm.on_mouse_press, evento_mouse('button_press_event', x - 100, y - 60, button=1))
+        for paso in range(1, EVENTOS_POR_ARRASTRE + 1):
+            evento = evento_mouse('motion_notify_event', x - 100 + 4 * paso, y - 60 + 2 * paso)
+            metricas['zoom_rectangulo'] += cronometrar(lambda: despachar(stm.on_mouse_move, evento), 1)
+        evento = evento_mouse('button_release_event', x + 100, y + 40, button=1)
+        metricas['zoom_soltar'] += cronometrar(lambda: despachar(stm.on_mouse_release, evento), 1)
+
+        # Rueda del mouse, alternando acercar y alejar para no terminar en una vista degenerada
+        for paso in range(EVENTOS_RUEDA):
+            evento = evento_mouse('scroll_event', x, y, button='up' if paso % 2 == 0 else 'down', step=1)
+            metricas['zoom_rueda'] += cronometrar(lambda: despachar(stm.on_mouse_scroll, evento), 1)
+
+        # Arrastre de la ventana de evaluación: cada evento recuenta con el índice y recolorea las series
+        stm.actualizar_grafica()
+        stm.canvas.draw()
+        stm.modo_ventana = True
+        xv, _ = stm.ax.transData.transform((sum(stm.ventana_evaluacion) / 2, 0))
+        despachar(stm.on_mouse_press, evento_mouse('button_press_event', xv, y, button=1))
+        for paso in range(1, EVENTOS_POR_ARRASTRE + 1):
+            evento = evento_mouse('motion_notify_event', xv + 2 * paso, y)
+            metricas['arrastre_ventana'] += cronometrar(lambda: despachar(stm.on_mouse_move, evento), 1)
+        evento = evento_mouse('button_release_event', xv + 2 * EVENTOS_POR_ARRASTRE, y, button=1)
+        metricas['ventana_soltar'] += cronometrar(lambda: despachar(stm.on_mouse_release, evento), 1)
+        stm.modo_ventana = None
+        stm.ventana_evaluacion = stm.VENTANA_EVALUACION
+
+        # Cursor en cruz: sin arrastre, cada evento busca la muestra más cercana y pinta la lectura
+        stm.canvas.draw()
+        for paso in range(EVENTOS_POR_ARRASTRE):
+            evento = evento_mouse('motion_notify_event', x - 200 + 8 * paso, y)
+            metricas['cursor'] += cronometrar(lambda: despachar(stm.on_mouse_move, evento), 1)
+        # Volver a la vista completa para la siguiente repetición
+        stm.actualizar_grafica()
+    return metricas
+
+def fase_estadisticas_rango(ruta_txt, ruta_stm, repeticiones):
+    # Consultas sobre tramos al azar, como las que hace el panel del rango visible durante un arrastre
+    preparar_grafica(stm.leer_datos_txt(ruta_txt))
+    stm.actualizar_grafica()
+    fin = float(stm.conjunto_datos.tiempo[-1])
+    tramos = np.sort(np.random.default_rng(0).uniform(0, fin, (CONSULTAS_RANGO, 2)), axis=1)
+    metricas = {'indice_rango': cronometrar(lambda: stm.construir_indice_rango(stm.conjunto_datos.series, stm.limites_actuales()), repeticiones),
+                'consulta_rango': []}
+    for x0, x1 in tramos:
+        metricas['consulta_rango'] += cronometrar(lambda: stm.estadisticas_rango(x0, x1), 1)
+    archivo = stm.abrir_archivo_stm(ruta_stm)
+    preparar_grafica(stm.conjunto_de_archivo_stm(archivo), archivo)
+    stm.actualizar_grafica()
+    metricas['consulta_rango_stm'] = []
+    for x0, x1 in tramos:
+        metricas['consulta_rango_stm'] += cronometrar(lambda: stm.estadisticas_rango(x0, x1), 1)
+    return metricas
+
+def fase_arranque(ruta_txt, ruta_stm, repeticiones):
+    # Importación del programa en un intérprete nuevo, medida como con python -X importtime
+    def importacion_s():
+        return next(acumulado for nombre, _, acumulado in stm.medir_importacion() if nombre.strip() == stm.__name__) / 1e6
+    return {'importacion': [importacion_s() for _ in range(repeticiones)]}
+
+def fase_exportacion(extension):
+    """Devuelve la fase que mide la exportación de las series al formato de la extensión."""
+    def fase(ruta_txt, ruta_stm, repeticiones):
+        conjunto = stm.leer_datos_txt(ruta_txt)
+        destino = os.path.join(tempfile.gettempdir(), f'stm_benchmark_{os.getpid()}{extension}')
+        try:
+            return {'exportacion' + extension.replace('.', '_'): cronometrar(lambda: stm.escribir_matriz_por_bloques(destino, conjunto.series), repeticiones)}
+        finally:
+            if os.path.exists(destino):
+                os.remove(destino)
+    return fase
+
+def fase_exportacion_stm(ruta_txt, ruta_stm, repeticiones):
+    conjunto = stm.leer_datos_txt(ruta_txt)
+    destino = os.path.join(tempfile.gettempdir(), f'stm_benchmark_{os.getpid()}.stm')
+    try:
+        return {'exportacion_stm': cronometrar(lambda: stm.escribir_archivo_stm(destino, conjunto.tiempo, conjunto.series), repeticiones)}
+    finally:
+        if os.path.exists(destino):
+            os.remove(destino)
+
+FASES = {
+    'arranque': fase_arranque,
+    'lectura_txt': fase_lectura_txt,
+    'cache_primera_carga': fase_cache_primera_carga,
+    'cache_reabrir': fase_cache_reabrir,
+    'stm_abrir': fase_stm_abrir,
+    'porcentaje_en_rango': fase_porcentaje_en_rango,
+    'conteo_stm': fase_conteo_stm,
+    'metricas_excursion': fase_metricas_excursion,
+    'dibujo_completo': fase_dibujo_completo,
+    'dibujo_stm': fase_dibujo_stm,
+    'grafica_lote': fase_grafica_lote,
+    'interaccion': fase_interaccion,
+    'estadisticas_rango': fase_estadisticas_rango,
+    'exportacion_txt': fase_exportacion('.txt'),
+    'exportacion_txt_gz': fase_exportacion('.txt.gz'),
+    'exportacion_npy': fase_exportacion('.npy'),
+    'exportacion_npz': fase_exportacion('.npz'),
+    'exportacion_stm': fase_exportacion_stm,
+}
+
+def ejecutar_fase(fase, ruta_txt, ruta_stm, repeticiones):
+    """Corre una fase en este proceso y escribe en la salida estándar sus tiempos y su memoria pico."""
+    funcion = FASES[fase]
+    memoria_inicial = memoria_pico_mb()
+    metricas = funcion(ruta_txt, ruta_stm, repeticiones)
+    json.dump({'metricas': metricas, 'memoria_inicial_mb': memoria_inicial, 'memoria_pico_mb': memoria_pico_mb()}, sys.stdout)
+
+def resumir_tiempos(tiempos):
+    """Devuelve el mínimo, la mediana y el percentil 95 de una lista de duraciones."""
+    return {'repeticiones': len(tiempos), 'tiempo_min_s': float(np.min(tiempos)),
+            'tiempo_mediana_s': float(np.median(tiempos)), 'tiempo_p95_s': float(np.percentile(tiempos, 95))}
+
+def medir_fase(fase, filas, series, ruta_txt, ruta_stm, repeticiones, tiempo_limite):
+    """Corre una fase en un proceso nuevo y devuelve una fila de resultado por métrica."""
+    base = {'filas': filas, 'series': series, 'fase': fase}
+    comando = [sys.executable, os.path.abspath(__file__), '--fase', fase, '--txt', ruta_txt, '--stm', ruta_stm,
+               '--repeticiones', str(repeticiones)]
+    try:
+        proceso = subprocess.run(comando, capture_output=True, text=True, timeout=tiempo_limite)
+    except subprocess.TimeoutExpired:
+        return [dict(base, metrica=fase, error=f"tiempo agotado ({tiempo_limite:g} s)")]
+    if proceso.returncode != 0:
+        ultima_linea = (proceso.stderr.strip().splitlines() or ["sin detalle"])[-1]
+        return [dict(base, metrica=fase, error=ultima_linea)]
+
+    salida = json.loads(proceso.stdout)
+    return [dict(base, metrica=metrica, **resumir_tiempos(tiempos), memoria_inicial_mb=round(salida['memoria_inicial_mb'], 1),
+                 memoria_pico_mb=round(salida['memoria_pico_mb'], 1), error='')
+            for metrica, tiempos in salida['metricas'].items()]
+
+def describir_entorno():
+    """Devuelve el commit, las versiones y la máquina en que se midió."""
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=carpeta, capture_output=True, text=True).stdout.strip()
+        modificado = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=carpeta,
+                                         capture_output=True, text=True).stdout.strip())
+    except OSError:
+        commit, modificado = '', False
+    return {'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit, 'cambios_sin_commit': modificado,
+            'python': platform.python_version(), 'numpy': np.__version__, 'matplotlib': matplotlib.__version__,
+            'plataforma': platform.platform(), 'procesadores': os.cpu_count()}
+
+def ejecutar_benchmark(filas, series, fases, repeticiones, salida, carpeta, tiempo_limite, regenerar):
+    """Mide todas las fases para cada combinación de filas y series y guarda los resultados en JSON."""
+    resultados = []
+    agotadas = {}  # Fase -> casos (filas, series) que agotaron el tiempo
+    for num_series in series:
+        for num_filas in filas:
+            print(f"Preparando {num_filas} filas x {num_series} series...", file=sys.stderr)
+            ruta_txt, ruta_stm = preparar_datos(carpeta, num_filas, num_series, regenerar)
+            for fase in fases:
+                # Si un caso más chico ya agotó el tiempo, uno más grande también lo hará
+                if any(num_filas >= f and num_series >= s for f, s in agotadas.get(fase, [])):
+                    resultados.append({'filas': num_filas, 'series': num_series, 'fase': fase, 'metrica': fase,
+                                       'error': "omitido: un caso más chico agotó el tiempo"})
+                    print(f"  {fase}: omitido, un caso más chico agotó el tiempo", file=sys.stderr)
+                    continue
+                filas_resultado = medir_fase(fase, num_filas, num_series, ruta_txt, ruta_stm, repeticiones, tiempo_limite)
+                if filas_resultado[0]['error'].startswith("tiempo agotado"):
+                    agotadas.setdefault(fase, []).append((num_filas, num_series))
+                for fila in filas_resultado:
+                    detalle = fila['error'] or f"{fila['tiempo_mediana_s'] * 1000:.2f} ms, pico {fila['memoria_pico_mb']} MiB"
+                    print(f"  {fila['metrica']}: {detalle}", file=sys.stderr)
+                resultados.extend(filas_resultado)
+
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump({'entorno': describir_entorno(), 'resultados': resultados}, f, ensure_ascii=False, indent=1)
+    print(f"Resultados guardados en {salida}", file=sys.stderr)
+
+def analizar_argumentos(argv=None):
+    """Interpreta los argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Benchmark de carga, análisis, dibujo, interacción y exportación de StableTempMonitor.")
+    parser.add_argument('--filas', nargs='+', type=int, default=FILAS, help="cantidades de filas de los datos sintéticos")
+    parser.add_argument('--series', nargs='+', type=int, default=SERIES, help="cantidades de series de los datos sintéticos")
+    parser.add_argument('--fases', nargs='+', choices=list(FASES), default=list(FASES), help="fases a medir")
+    parser.add_argument('--repeticiones', type=int, default=3, help="repeticiones de cada medición")
+    parser.add_argument('--salida', default='resultados_benchmark.json', help="archivo JSON de resultados")
+    parser.add_argument('--carpeta-datos', default=CARPETA_DATOS, help="carpeta donde se generan y reutilizan los datos sintéticos")
+    parser.add_argument('--tiempo-limite', type=float, default=300, help="segundos máximos por fase y caso")
+    parser.add_argument('--regenerar', action='store_true', help="vuelve a generar los datos sintéticos")
+    # Uso interno: correr una sola fase en el proceso hijo
+    parser.add_argument('--fase', choices=list(FASES), help=argparse.SUPPRESS)
+    parser.add_argument('--txt', help=argparse.SUPPRESS)
+    parser.add_argument('--stm', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Mide todas las fases pedidas, o una sola si se llamó desde el proceso principal del benchmark."""
+    args = analizar_argumentos(argv)
+    if args.fase:
+        ejecutar_fase(args.fase, args.txt, args.stm, args.repeticiones)
+        return 0
+    ejecutar_benchmark(sorted(args.filas), sorted(args.series), args.fases, args.repeticiones, args.salida,
+                       args.carpeta_datos, args.tiempo_limite, args.regenerar)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())